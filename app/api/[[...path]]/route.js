@@ -1,384 +1,844 @@
 import { NextResponse } from 'next/server'
-import { db } from '@/lib/firebase'
-import { collection, addDoc, getDocs, query, where, orderBy, limit } from 'firebase/firestore'
-import Groq from 'groq-sdk'
-
-// Debug: Log environment variables (remove in production)
-console.log('Environment check:', {
-  hasGroqKey: !!process.env.GROQ_API_KEY,
-  hasProductHuntToken: !!process.env.PRODUCTHUNT_DEVELOPER_TOKEN,
-  groqKeyPrefix: process.env.GROQ_API_KEY?.substring(0, 10)
-})
+import { getDb } from '@/lib/firebase'
+import { createHash } from 'crypto'
+import os from 'os'
+import path from 'path'
+import { isNotModified } from '@/lib/swr-cache'
+import { createCompletionCache, completionCacheKey } from '@/lib/completion-cache'
+import { wantsEventStream, createEventStreamResponse, pipeCompletion } from '@/lib/sse'
+import { createWriteBehindQueue, MAX_DOCUMENT_BYTES } from '@/lib/write-behind'
+import { createLlmClient, createProvider, LlmError } from '@/lib/llm'
+import { createPromptRegistry, contextWindowFor, estimateTokens, estimateMessageTokens } from '@/lib/prompts'
+import { createWorkflowReader } from '@/lib/workflow-schema'
+import { buildIndex, updateIndex, searchIndex, indexSummary, serializeIndex } from '@/lib/kb-index'
+import { createChatbotStore } from '@/lib/chatbot-store'
+import { createChatSessionStore } from '@/lib/chat-sessions'
+import { createJobQueue } from '@/lib/job-queue'
+import { getAiToolsIndex, AI_TOOLS_REFRESH_MS } from '@/lib/ai-tools'
+import { createRateLimiter, createMongoRateLimitBackend, rateLimit } from '@/lib/rate-limit'
+import { createTracer } from '@/lib/tracing'
+import { createRouter, HttpError } from '@/lib/router'
+import { createStartupProfile } from '@/lib/startup'
+
+// Everything below runs on a cold start, before the first request is served.
+// Components that only some endpoints use are created on first use instead;
+// /api/metrics reports what ran and how long it took.
+const startup = createStartupProfile()
 
-// Check for valid API key
-if (!process.env.GROQ_API_KEY || !process.env.GROQ_API_KEY.startsWith('gsk_')) {
-  console.error('Invalid or missing GROQ_API_KEY')
+if (process.env.NODE_ENV !== 'production') {
+  console.log('Environment check:', {
+    hasGroqKey: !!process.env.GROQ_API_KEY,
+    hasProductHuntToken: !!process.env.PRODUCTHUNT_DEVELOPER_TOKEN
+  })
 }
 
-const groq = new Groq({
-  apiKey: process.env.GROQ_API_KEY,
+// A TRACE_SAMPLE_RATE share of requests (0-1, default off) is traced: spans
+// come back in a Server-Timing header and feed the histograms on /api/metrics
+const tracer = startup.measure('tracer', () => createTracer({ sampleRate: parseFloat(process.env.TRACE_SAMPLE_RATE || '0') || 0 }))
+
+// All LLM calls go through one pooled client with deadlines, retries and a
+// concurrency limit. LLM_PROVIDER=mock runs the API offline without a Groq key.
+const getLlm = startup.defer('llm', () => {
+  const llm = createLlmClient({
+    provider: createProvider(process.env.LLM_PROVIDER || 'groq'),
+    model: process.env.LLM_MODEL || undefined,
+    timeoutMs: parseInt(process.env.LLM_TIMEOUT_MS || '30000', 10),
+    maxAttempts: parseInt(process.env.LLM_MAX_ATTEMPTS || '3', 10),
+    maxInFlight: parseInt(process.env.LLM_MAX_IN_FLIGHT || '16', 10),
+    maxQueue: parseInt(process.env.LLM_MAX_QUEUE || '100', 10),
+    queueTimeoutMs: parseInt(process.env.LLM_QUEUE_TIMEOUT_MS || '10000', 10),
+    coalesce: process.env.LLM_COALESCE !== 'false'
+  })
+  if (!llm.isConfigured()) {
+    console.error('Invalid or missing GROQ_API_KEY')
+  }
+  return llm
 })
 
-// Helper function to fetch from Product Hunt
-async function fetchFromProductHunt() {
-  const response = await fetch(`https://api.producthunt.com/v2/api/graphql`, {
-    method: 'POST',
+// Prompt templates are compiled once; oversized requests are rejected before
+// they reach the provider
+const getPrompts = startup.defer('prompts', () => createPromptRegistry({
+  contextWindow: parseInt(process.env.LLM_CONTEXT_TOKENS || '0', 10) || contextWindowFor(getLlm().model)
+}))
+
+// Queue Firestore writes and flush them in batches off the request path.
+// Records spilled by a previous process are replayed once it's created.
+const getPersistence = startup.defer('persistence', () => createWriteBehindQueue({
+  getDb,
+  batchSize: parseInt(process.env.WRITE_BEHIND_BATCH_SIZE || '100', 10),
+  flushIntervalMs: parseInt(process.env.WRITE_BEHIND_FLUSH_INTERVAL_MS || '1000', 10),
+  maxQueueSize: parseInt(process.env.WRITE_BEHIND_MAX_QUEUE || '5000', 10),
+  // The OS temp dir is writable on serverless hosts, unlike the app directory
+  spillFile: process.env.WRITE_BEHIND_SPILL_FILE || path.join(os.tmpdir(), 'happyaxzora', 'firestore-spill.ndjson'),
+  deadLetterFile: process.env.WRITE_BEHIND_DEAD_LETTER_FILE || path.join(os.tmpdir(), 'happyaxzora', 'firestore-dead-letter.ndjson'),
+  observe: tracer.record
+}))
+
+// Cache agent completions keyed on the full request so identical prompts skip Groq
+const getCompletionCache = startup.defer('completionCache', () => createCompletionCache({
+  maxEntries: parseInt(process.env.COMPLETION_CACHE_MAX_ENTRIES || '500', 10),
+  maxBytes: parseInt(process.env.COMPLETION_CACHE_MAX_BYTES || String(16 * 1024 * 1024), 10),
+  ttlMs: parseInt(process.env.COMPLETION_CACHE_TTL_MS || String(24 * 60 * 60 * 1000), 10),
+  dir: process.env.COMPLETION_CACHE_DIR || null
+}))
+
+// Agents listed as false produce time-sensitive or personal output and are never cached
+const AGENT_CACHE_POLICY = {
+  planner: false,
+  travel: false
+}
+
+// Per-user, per-chatbot and per-IP request limits, plus a budget on the LLM
+// tokens they spend. RATE_LIMIT_BACKEND=mongo shares limits across instances.
+const rateLimitBackend = process.env.RATE_LIMIT_BACKEND === 'mongo'
+  ? startup.measure('rateLimitBackend', () => createMongoRateLimitBackend({ url: process.env.MONGO_URL }))
+  : null
+const MINUTE_MS = 60 * 1000
+const HOUR_MS = 60 * MINUTE_MS
+
+const requestLimiter = startup.measure('requestLimiter', () => createRateLimiter({
+  name: 'requests',
+  backend: rateLimitBackend,
+  limits: {
+    user: rateLimit(parseInt(process.env.RATE_LIMIT_USER_PER_MIN || '60', 10), MINUTE_MS),
+    chatbot: rateLimit(parseInt(process.env.RATE_LIMIT_CHATBOT_PER_MIN || '300', 10), MINUTE_MS),
+    ip: rateLimit(parseInt(process.env.RATE_LIMIT_IP_PER_MIN || '120', 10), MINUTE_MS)
+  }
+}))
+
+const tokenBudget = startup.measure('tokenBudget', () => createRateLimiter({
+  name: 'tokens',
+  backend: rateLimitBackend,
+  limits: {
+    user: rateLimit(parseInt(process.env.TOKEN_BUDGET_USER_PER_HOUR || '200000', 10), HOUR_MS),
+    chatbot: rateLimit(parseInt(process.env.TOKEN_BUDGET_CHATBOT_PER_HOUR || '1000000', 10), HOUR_MS)
+  }
+}))
+
+// Callers can put anything in X-Forwarded-For, so the per-IP limit only uses
+// addresses set by the platform: Netlify's and Vercel's client IP headers, or
+// else the last X-Forwarded-For hop, appended by the proxy in front of the app
+function clientIp(request) {
+  const forwarded = request.headers.get('x-forwarded-for')
+  return request.headers.get('x-nf-client-connection-ip') ||
+    request.headers.get('x-real-ip') ||
+    request.ip ||
+    (forwarded ? forwarded.split(',').pop().trim() : undefined)
+}
+
+function tooManyRequests({ scope, retryAfterMs }, error) {
+  return NextResponse.json({ error }, {
+    status: 429,
     headers: {
-      'Accept': 'application/json',
-      'Content-Type': 'application/json',
-      'Authorization': `Bearer ${process.env.PRODUCTHUNT_DEVELOPER_TOKEN}`,
-    },
-    body: JSON.stringify({
-      query: `
-        query {
-          posts(first: 50, order: VOTES, postedAfter: "${new Date(Date.now() - 14 * 24 * 60 * 60 * 1000).toISOString().split('T')[0]}") {
-            edges {
-              node {
-                id
-                name
-                tagline
-                description
-                url
-                votesCount
-                createdAt
-                featuredAt
-                topics {
-                  edges {
-                    node {
-                      name
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-      `
-    })
+      'Retry-After': String(Math.ceil(retryAfterMs / 1000)),
+      'X-RateLimit-Scope': scope
+    }
   })
+}
+
+// Chatbots and their knowledge indexes, cached in-process. Chat turns only
+// include the top KB_TOP_K knowledge base chunks in the prompt.
+const getChatbotStore = startup.defer('chatbotStore', () => createChatbotStore({
+  getDb,
+  persistence: getPersistence(),
+  maxEntries: parseInt(process.env.CHATBOT_CACHE_MAX_ENTRIES || '1000', 10),
+  maxIndexes: parseInt(process.env.KB_INDEX_CACHE_SIZE || '200', 10),
+  ttlMs: parseInt(process.env.CHATBOT_CACHE_TTL_MS || '60000', 10)
+}))
+const KB_TOP_K = parseInt(process.env.KB_TOP_K || '4', 10)
 
-  if (!response.ok) {
-    throw new Error(`Product Hunt API error: ${response.status}`)
+// Used for chatbot ids that don't exist, e.g. previews of unsaved bots
+const DEFAULT_CHATBOT = {
+  name: 'Test Bot',
+  knowledgeBase: 'This is a test chatbot that can help with general questions about products and services.'
+}
+const getDefaultKnowledgeIndex = startup.defer('defaultKnowledgeIndex', () => buildIndex(DEFAULT_CHATBOT.knowledgeBase))
+
+// Resolve a chatbot with its knowledge index and its rendered system prompt
+async function loadChatbotContext(chatbotId) {
+  const chatbot = (chatbotId && await getChatbotStore().get(chatbotId)) || DEFAULT_CHATBOT
+  const knowledgeIndex = (chatbot !== DEFAULT_CHATBOT && await getChatbotStore().getKnowledgeIndex(chatbotId)) || getDefaultKnowledgeIndex()
+  const system = getPrompts().get('chatbot').system.render({ name: chatbot.name })
+  return { chatbot, knowledgeIndex, system: system.text, systemTokens: system.tokens }
+}
+
+// Condense turns that fall out of a session's recent history
+async function summarizeConversation(summary, messages, session) {
+  const transcript = messages.map(m => `${m.role === 'user' ? 'User' : 'Assistant'}: ${m.content}`).join('\n')
+  const prompt = getPrompts().render('chatbot.summary', {
+    transcript: summary ? `Earlier summary:\n${summary}\n\nNew messages:\n${transcript}` : transcript
+  })
+  const { content, usage } = await tracer.time('llm.summary', () => getLlm().chat({
+    messages: prompt.messages,
+    temperature: 0.2,
+    max_tokens: 200,
+  }))
+  if (usage) {
+    tokenBudget.charge({ chatbot: session.chatbotId }, usage.total_tokens ?? 0)
+  }
+  if (!content) {
+    throw new Error('Empty summary')
   }
+  return content
+}
+
+// Embedded chat conversations: warm chatbot context and a bounded, summarized
+// history per session
+const getChatSessions = startup.defer('chatSessions', () => createChatSessionStore({
+  maxSessions: parseInt(process.env.CHAT_SESSION_MAX || '10000', 10),
+  ttlMs: parseInt(process.env.CHAT_SESSION_TTL_MS || String(30 * 60 * 1000), 10),
+  maxMessages: parseInt(process.env.CHAT_HISTORY_MESSAGES || '12', 10),
+  summarize: summarizeConversation
+}))
+const CHAT_HEARTBEAT_MS = 15 * 1000
 
-  return response.json()
+// Read a streamed workflow, validating it as it arrives. Reading stops as
+// soon as the root object closes or the output can't become a valid
+// workflow, which cancels the rest of the generation.
+async function readWorkflow(stream, type, send = () => {}) {
+  const reader = createWorkflowReader(type)
+  const content = await pipeCompletion(stream, send, delta => reader.write(delta) && !reader.complete)
+  return { workflow: reader.finish(), content }
 }
 
-export async function GET(request) {
-  const { pathname } = new URL(request.url)
-  
-  try {
-    // AI Tools endpoint
-    if (pathname.includes('/api/ai-tools')) {
-      const data = await fetchFromProductHunt()
-      
-      if (data.errors) {
-        throw new Error(data.errors[0].message)
-      }
-      
-      const tools = data.data.posts.edges
-        .filter(edge => {
-          const topics = edge.node.topics.edges.map(t => t.node.name.toLowerCase())
-          return topics.some(topic => 
-            topic.includes('ai') || 
-            topic.includes('artificial intelligence') || 
-            topic.includes('machine learning') ||
-            topic.includes('automation') ||
-            topic.includes('chatbot') ||
-            topic.includes('neural') ||
-            topic.includes('deep learning')
-          )
-        })
-        .map(edge => ({
-          id: edge.node.id,
-          name: edge.node.name,
-          description: edge.node.tagline || edge.node.description,
-          url: edge.node.url,
-          votes: edge.node.votesCount,
-          topics: edge.node.topics.edges.map(t => t.node.name),
-          createdAt: edge.node.createdAt,
-          featuredAt: edge.node.featuredAt,
-          date: edge.node.featuredAt || edge.node.createdAt
-        }))
-        .sort((a, b) => {
-          // Sort by date first (newest first), then by votes
-          const dateA = new Date(a.date || a.createdAt)
-          const dateB = new Date(b.date || b.createdAt)
-          
-          if (dateA.getTime() !== dateB.getTime()) {
-            return dateB.getTime() - dateA.getTime()
-          }
-          
-          return (b.votes || 0) - (a.votes || 0)
-        })
-      
-      return NextResponse.json({ tools })
+// Providers only report usage for streams read to the end; estimate it for
+// one stopped early
+function workflowUsage(stream, promptTokens, content) {
+  return stream.usage || { total_tokens: promptTokens + estimateTokens(content) }
+}
+
+function workflowTemplate(type) {
+  return type === 'n8n' ? 'workflow.n8n' : 'workflow.make'
+}
+
+// Identical requests (same model, template, type and prompt) share a key
+function workflowKey({ type, prompt }) {
+  const normalized = String(prompt ?? '').trim().replace(/\s+/g, ' ')
+  return createHash('sha256')
+    .update(JSON.stringify([getLlm().model, getPrompts().get(workflowTemplate(type)).key, type, normalized]))
+    .digest('hex')
+}
+
+const WORKFLOW_MAX_REPAIRS = parseInt(process.env.WORKFLOW_MAX_REPAIRS || '2', 10)
+
+// Generate a workflow, asking the model to fix its output when it doesn't
+// parse. Tokens used across all attempts are totalled in `job.tokens`, which
+// every submitter of the job is charged once it finishes.
+async function generateWorkflow(job, progress) {
+  const { type, prompt } = job.input
+  const rendered = getPrompts().render(workflowTemplate(type), { type, prompt })
+  let messages = rendered.messages
+  job.tokens = 0
+
+  for (let attempt = 1; ; attempt++) {
+    const stream = getLlm().chatStream({ messages, temperature: 0.3, max_tokens: 2000 })
+    const { workflow, content } = await readWorkflow(stream, type)
+    const usage = workflowUsage(stream, estimateMessageTokens(messages), content)
+    job.tokens += usage.total_tokens ?? 0
+
+    if (!workflow.error || attempt > WORKFLOW_MAX_REPAIRS) {
+      return workflow
     }
-    
-    // Chatbots endpoint
-    if (pathname.includes('/api/chatbots')) {
-      // Mock chatbots data for now
-      const chatbots = [
-        {
-          id: 'bot_1',
-          name: 'Support Bot',
-          description: 'Customer support chatbot',
-          color: '#6366f1',
-          createdAt: new Date().toISOString(),
-          userId: 'demo_user'
-        }
-      ]
-      
-      return NextResponse.json({ chatbots })
+
+    const error = workflow.details || workflow.error
+    progress({ attempt: attempt + 1, repairing: error })
+    messages = [
+      ...rendered.messages,
+      { role: 'assistant', content },
+      { role: 'user', content: getPrompts().get('workflow.repair').user.render({ error }).text }
+    ]
+  }
+}
+
+// Valid workflows are kept by request key, in memory and optionally on disk
+const getWorkflowResults = startup.defer('workflowResults', () => createCompletionCache({
+  maxEntries: parseInt(process.env.WORKFLOW_STORE_MAX_ENTRIES || '500', 10),
+  ttlMs: parseInt(process.env.WORKFLOW_STORE_TTL_MS || String(7 * 24 * 60 * 60 * 1000), 10),
+  dir: process.env.WORKFLOW_STORE_DIR || null
+}))
+
+const getWorkflowJobs = startup.defer('workflowJobs', () => createJobQueue({
+  run: (job, progress) => tracer.time('workflow.generate', () => generateWorkflow(job, progress)),
+  store: {
+    get: async (key) => {
+      const stored = await getWorkflowResults().get(key)
+      return stored === undefined ? undefined : JSON.parse(stored)
+    },
+    set: (key, workflow) => {
+      if (!workflow.error) {
+        getWorkflowResults().set(key, JSON.stringify(workflow))
+      }
     }
-    
+  },
+  concurrency: parseInt(process.env.WORKFLOW_WORKERS || '4', 10),
+  maxQueued: parseInt(process.env.WORKFLOW_MAX_QUEUED || '100', 10),
+  ttlMs: parseInt(process.env.WORKFLOW_JOB_TTL_MS || String(60 * 60 * 1000), 10)
+}))
+
+// AI tools are ingested from Product Hunt in the background and served from a
+// local index shared with the server-rendered home page
+const aiToolsIndex = startup.measure('aiToolsIndex', () => getAiToolsIndex({ observe: tracer.record }))
+const AI_TOOLS_MAX_PAGE_SIZE = 200
+
+// Latency histograms and component stats. Open in development; in
+// production it needs METRICS_TOKEN as a bearer token.
+function metricsAllowed(request) {
+  const token = process.env.METRICS_TOKEN
+  if (!token) {
+    return process.env.NODE_ENV !== 'production'
+  }
+  return request.headers.get('authorization') === `Bearer ${token}`
+}
+
+function metricsSnapshot() {
+  return {
+    ...tracer.snapshot(),
+    startup: startup.snapshot(),
+    llm: getLlm.peek()?.stats() ?? null,
+    limits: { requests: requestLimiter.stats(), tokens: tokenBudget.stats() },
+    persistence: getPersistence.peek()?.stats() ?? null,
+    completionCache: getCompletionCache.peek()?.stats() ?? null,
+    chatbots: getChatbotStore.peek()?.stats() ?? null,
+    chatSessions: getChatSessions.peek()?.stats() ?? null,
+    workflowJobs: getWorkflowJobs.peek()?.stats() ?? null,
+    workflowStore: getWorkflowResults.peek()?.stats() ?? null,
+    aiTools: aiToolsIndex.stats()
+  }
+}
+
+// Route handlers get `{ request, params, searchParams, body, trace }` from the
+// router below; thrown errors become JSON responses in `handleError`
+
+function getMetrics({ request }) {
+  if (!metricsAllowed(request)) {
     return NextResponse.json({ error: 'Not found' }, { status: 404 })
-    
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
   }
+  return NextResponse.json(metricsSnapshot(), { headers: { 'Cache-Control': 'no-store' } })
 }
 
-export async function POST(request) {
-  const { pathname } = new URL(request.url)
+async function listAiTools({ request, searchParams, trace }) {
+  await trace.time('ai-tools.load', () => aiToolsIndex.start())
   
-  try {
-    const body = await request.json()
+  const limit = parseInt(searchParams.get('limit') || '50', 10) || 50
+  const page = aiToolsIndex.query({
+    cursor: searchParams.get('cursor'),
+    limit: Math.max(1, Math.min(limit, AI_TOOLS_MAX_PAGE_SIZE)),
+    topic: searchParams.get('topic'),
+    sort: searchParams.get('sort') || 'date'
+  })
+  
+  const entry = {
+    etag: `"${createHash('sha1').update(JSON.stringify(page)).digest('base64url')}"`,
+    lastModified: aiToolsIndex.updatedAt()
+  }
+  const headers = {
+    'ETag': entry.etag,
+    'Last-Modified': new Date(entry.lastModified).toUTCString(),
+    'Cache-Control': `public, max-age=0, s-maxage=${Math.floor(AI_TOOLS_REFRESH_MS / 1000)}, stale-while-revalidate=${Math.floor(AI_TOOLS_REFRESH_MS / 1000)}`
+  }
+  
+  if (isNotModified(request, entry)) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  
+  return NextResponse.json(page, { headers })
+}
+
+// Workflow job status, as JSON or as a stream of status events
+function getWorkflowJob({ request, params }) {
+  const job = getWorkflowJobs().get(params.id)
+  if (!job) {
+    return NextResponse.json({ error: 'Job not found' }, { status: 404 })
+  }
+  
+  if (!wantsEventStream(request)) {
+    return NextResponse.json({ job: getWorkflowJobs().view(job) })
+  }
+  
+  // Push status changes until the job finishes
+  return createEventStreamResponse(async (send, signal) => {
+    const unsubscribe = getWorkflowJobs().subscribe(job, view => send('status', view))
+    try {
+      send('status', getWorkflowJobs().view(job))
+      await Promise.race([job.done, new Promise(resolve => signal.addEventListener('abort', resolve, { once: true }))])
+    } finally {
+      unsubscribe()
+    }
     
-    // AI Agents endpoint
-    if (pathname.includes('/api/ai-agents')) {
-      const { agentId, input, userId } = body
-      
-      // Check if Groq API key is valid
-      if (!process.env.GROQ_API_KEY || !process.env.GROQ_API_KEY.startsWith('gsk_')) {
-        return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
-      }
-      
-      // Define agent prompts
-      const agentPrompts = {
-        resume: `Create a professional resume based on the following information: ${input}. Format it properly with sections for Contact Information, Professional Summary, Experience, Education, and Skills.`,
-        product: `Create a compelling product description for: ${input}. Include key features, benefits, and a call-to-action.`,
-        email: `Summarize the following email content: ${input}. Provide key points and action items.`,
-        pdf: `Explain the following PDF content: ${input}. Break it down into key concepts and main points.`,
-        instagram: `Create engaging Instagram captions for: ${input}. Include relevant hashtags and emojis.`,
-        social: `Create a social media content calendar for: ${input}. Suggest post ideas, timing, and platforms.`,
-        business: `Generate creative business names for: ${input}. Provide 10 options with brief explanations.`,
-        support: `Provide customer support response for: ${input}. Be helpful, professional, and solution-oriented.`,
-        medical: `Explain the following medical symptoms: ${input}. Provide general information only, not medical advice.`,
-        travel: `Create a travel itinerary for: ${input}. Include attractions, accommodations, and logistics.`,
-        chatbot: `Create a custom chatbot script for: ${input}. Define conversation flows and responses.`,
-        legal: `Simplify the following legal document: ${input}. Explain in plain language.`,
-        linkedin: `Create a professional LinkedIn bio for: ${input}. Highlight achievements and skills.`,
-        whatsapp: `Format the following message for WhatsApp: ${input}. Make it clear and engaging.`,
-        planner: `Create a daily planner for: ${input}. Include tasks, priorities, and time blocks.`
-      }
-      
-      const prompt = agentPrompts[agentId] || `Process the following request: ${input}`
-      
-      const completion = await groq.chat.completions.create({
-        messages: [
-          {
-            role: "system",
-            content: "You are a helpful AI assistant. Provide clear, actionable, and professional responses."
-          },
-          {
-            role: "user",
-            content: prompt
-          }
-        ],
-        model: "llama3-70b-8192",
-        temperature: 0.7,
-        max_tokens: 1000,
+    if (job.status === 'completed') {
+      send('done', { workflow: job.result })
+    } else if (job.status === 'failed') {
+      send('error', { error: job.error.message })
+    }
+  })
+}
+
+// Persistent event stream for a chat session
+function streamChatSession({ params }) {
+  const session = getChatSessions().get(params.id)
+  if (!session) {
+    return NextResponse.json({ error: 'Session not found' }, { status: 404 })
+  }
+  
+  return createEventStreamResponse(async (send, signal) => {
+    let unsubscribe
+    let heartbeat
+    try {
+      // Held open until the client disconnects or the session ends
+      await new Promise(resolve => {
+        unsubscribe = getChatSessions().subscribe(session, send, resolve)
+        signal.addEventListener('abort', resolve, { once: true })
+        heartbeat = setInterval(() => send('ping', {}), CHAT_HEARTBEAT_MS)
+        send('ready', { sessionId: session.id })
       })
-      
-      const output = completion.choices[0]?.message?.content || "No response generated"
-      
-      // Save to Firestore - temporarily commented out for testing
-      try {
-        await addDoc(collection(db, 'agent_runs'), {
-          userId,
-          agentId,
-          input,
-          output,
-          timestamp: new Date()
-        })
-        console.log('Successfully saved to Firestore')
-      } catch (firebaseError) {
-        console.log('Firebase save failed (expected in testing):', firebaseError.message)
-        // Continue execution - don't fail the API call due to Firebase issues
-      }
-      
-      return NextResponse.json({ output })
+    } finally {
+      clearInterval(heartbeat)
+      unsubscribe()
     }
+  })
+}
+
+async function listChatbots({ searchParams, trace }) {
+  const userId = searchParams.get('userId')
+  if (!userId) {
+    return NextResponse.json({ chatbots: [], nextCursor: null })
+  }
+  
+  const { chatbots, nextCursor } = await trace.time('chatbots.list', () => getChatbotStore().list({
+    userId,
+    cursor: searchParams.get('cursor'),
+    limit: parseInt(searchParams.get('limit') || '20', 10) || 20
+  }))
+  
+  return NextResponse.json({ chatbots, nextCursor })
+}
+
+// POST, PUT and DELETE handlers are rate limited and token budgeted before
+// they run. Chat turns come from anonymous widget visitors that share a
+// placeholder userId, so they are limited and billed per chatbot instead of
+// per user. Handlers that take no body (`readsBody: false`) name the chat
+// session in the path instead.
+function limited(handler, { perChatbot = false, readsBody = true } = {}) {
+  return async (context) => {
+    const { request, trace } = context
+    const body = readsBody ? await trace.time('parse', context.body) : {}
     
-    // Chatbot test endpoint - CHECK THIS FIRST before general chatbots endpoint
-    if (pathname.includes('/api/chatbots/test')) {
-      const { chatbotId, message, userId } = body
-      
-      // Check if Groq API key is valid
-      if (!process.env.GROQ_API_KEY || !process.env.GROQ_API_KEY.startsWith('gsk_')) {
-        return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
-      }
-      
-      // For now, mock chatbot retrieval
-      const mockChatbot = {
-        id: chatbotId,
-        name: 'Test Bot',
-        knowledgeBase: 'This is a test chatbot that can help with general questions about products and services.',
-        originalKnowledge: 'Test knowledge base'
-      }
-      
-      // Generate response using Groq
-      const completion = await groq.chat.completions.create({
-        messages: [
-          {
-            role: "system",
-            content: `You are a helpful chatbot assistant. Use the following knowledge base to answer questions: ${mockChatbot.knowledgeBase}. If the question is not covered in the knowledge base, provide a helpful general response and suggest contacting support for specific inquiries.`
-          },
-          {
-            role: "user",
-            content: message
-          }
-        ],
-        model: "llama3-70b-8192",
-        temperature: 0.7,
-        max_tokens: 500,
-      })
-      
-      const response = completion.choices[0]?.message?.content || "I'm sorry, I couldn't generate a response. Please try again."
-      
-      return NextResponse.json({ response })
+    const sessionId = readsBody ? body.sessionId : context.params.id
+    const chatSubject = perChatbot ? body.chatbotId || getChatSessions().get(sessionId)?.chatbotId : null
+    const budgetSubjects = perChatbot ? { chatbot: chatSubject } : { user: body.userId }
+    
+    const rate = requestLimiter.check({ ...budgetSubjects, ip: clientIp(request) })
+    if (!rate.allowed) {
+      return tooManyRequests(rate, 'Too many requests, please slow down')
     }
     
-    // Chatbots endpoint - for creating chatbots
-    if (pathname.includes('/api/chatbots')) {
-      const { name, description, knowledgeBase, color, userId } = body
-      
-      // Check if Groq API key is valid
-      if (!process.env.GROQ_API_KEY || !process.env.GROQ_API_KEY.startsWith('gsk_')) {
-        return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
-      }
-      
-      // Create chatbot with AI-enhanced knowledge base
-      const chatbotId = `chatbot_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-      
-      // Process knowledge base with Groq
-      const completion = await groq.chat.completions.create({
-        messages: [
-          {
-            role: "system",
-            content: "You are a knowledge base processor. Analyze the provided knowledge base and create a structured, searchable format that can be used to answer user questions accurately."
-          },
-          {
-            role: "user",
-            content: `Process this knowledge base for a chatbot named "${name}": ${knowledgeBase}`
-          }
-        ],
-        model: "llama3-70b-8192",
-        temperature: 0.3,
-        max_tokens: 2000,
-      })
-      
-      const processedKnowledge = completion.choices[0]?.message?.content || knowledgeBase
-      
-      const chatbot = {
-        id: chatbotId,
-        name,
-        description,
-        knowledgeBase: processedKnowledge,
-        originalKnowledge: knowledgeBase,
-        color,
-        userId,
-        createdAt: new Date().toISOString(),
-        isActive: true
-      }
-      
-      // Save to Firestore
-      try {
-        await addDoc(collection(db, 'chatbots'), chatbot)
-        console.log('Successfully saved chatbot to Firestore')
-      } catch (firebaseError) {
-        console.log('Firebase save failed (expected in testing):', firebaseError.message)
-        // Continue execution - don't fail the API call due to Firebase issues
+    const budget = tokenBudget.check(budgetSubjects, 0)
+    if (!budget.allowed) {
+      return tooManyRequests(budget, 'Token budget exhausted, please try again later')
+    }
+    
+    const chargeUsage = (usage) => {
+      if (usage) {
+        tokenBudget.charge(budgetSubjects, usage.total_tokens ?? (usage.prompt_tokens || 0) + (usage.completion_tokens || 0))
       }
-      
-      return NextResponse.json({ chatbot })
     }
     
-    // Workflows endpoint
-    if (pathname.includes('/api/workflows')) {
-      const { prompt, type, userId } = body
+    return handler({ ...context, body, chargeUsage })
+  }
+}
+
+async function runAgent({ request, body, trace, chargeUsage }) {
+  const { agentId, input, userId } = body
+  
+  // Check if Groq API key is valid
+  if (!getLlm().isConfigured()) {
+    return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
+  }
+  
+  const prompt = getPrompts().render(getPrompts().has(`agent.${agentId}`) ? `agent.${agentId}` : 'agent.default', { input })
+  
+  const completionRequest = {
+    messages: prompt.messages,
+    temperature: 0.7,
+    max_tokens: 1000,
+  }
+  getPrompts().assertFits(prompt.tokens, completionRequest.max_tokens)
+  
+  const cacheable = AGENT_CACHE_POLICY[agentId] !== false
+  const cacheKey = completionCacheKey({
+    model: getLlm().model,
+    system: prompt.key,
+    prompt: input ?? '',
+    temperature: completionRequest.temperature,
+    max_tokens: completionRequest.max_tokens
+  })
+  
+  const cached = cacheable ? await trace.time('cache', () => getCompletionCache().get(cacheKey)) : undefined
+  const cacheStatus = !cacheable ? 'BYPASS' : cached !== undefined ? 'HIT' : 'MISS'
+  
+  const saveAgentRun = (output) => {
+    getPersistence().enqueue('agent_runs', {
+      userId,
+      agentId,
+      input,
+      output,
+      timestamp: new Date()
+    })
+  }
+  
+  if (wantsEventStream(request)) {
+    return createEventStreamResponse(async (send, signal) => {
+      let output = cached
       
-      // Check if Groq API key is valid
-      if (!process.env.GROQ_API_KEY || !process.env.GROQ_API_KEY.startsWith('gsk_')) {
-        return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
+      if (output === undefined) {
+        const stream = trace.stream('llm', getLlm().chatStream(completionRequest, { signal }))
+        const content = await pipeCompletion(stream, send)
+        chargeUsage(stream.usage)
+        output = content || "No response generated"
+        
+        if (cacheable && content) {
+          getCompletionCache().set(cacheKey, content)
+        }
+      } else {
+        send('token', { content: output })
       }
       
-      const systemPrompt = type === 'n8n' 
-        ? `You are an expert n8n workflow generator. Create a complete n8n workflow JSON configuration based on the user's request. Include all necessary nodes, connections, and configurations. Return only valid JSON.`
-        : `You are an expert Make.com workflow generator. Create a complete Make.com scenario JSON configuration based on the user's request. Include all necessary modules, connections, and configurations. Return only valid JSON.`
-      
-      const completion = await groq.chat.completions.create({
-        messages: [
-          {
-            role: "system",
-            content: systemPrompt
-          },
-          {
-            role: "user",
-            content: `Create a ${type} workflow for: ${prompt}`
-          }
-        ],
-        model: "llama3-70b-8192",
-        temperature: 0.3,
-        max_tokens: 2000,
-      })
+      send('done', { output })
+      saveAgentRun(output)
+    }, { headers: { 'X-Cache': cacheStatus }, onClose: trace.hold() })
+  }
+  
+  let output = cached
+  
+  if (output === undefined) {
+    const { content, usage } = await trace.completion('llm', () => getLlm().chat(completionRequest))
+    chargeUsage(usage)
+    output = content || "No response generated"
+    
+    if (cacheable && content) {
+      getCompletionCache().set(cacheKey, content)
+    }
+  }
+  
+  saveAgentRun(output)
+  
+  return NextResponse.json({ output }, { headers: { 'X-Cache': cacheStatus } })
+}
+
+async function chatTurn({ request, body, trace, chargeUsage }) {
+  const { chatbotId, message, userId, sessionId, transport } = body
+  
+  // Check if Groq API key is valid
+  if (!getLlm().isConfigured()) {
+    return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
+  }
+  
+  // Resumes the conversation when sessionId is live, otherwise starts one
+  const session = getChatSessions().open({ id: sessionId, chatbotId: chatbotId || null, userId })
+  const sessionHeaders = { 'X-Chat-Session': session.id }
+  if (session.busy) {
+    return NextResponse.json(
+      { error: 'A reply is already in progress for this session', sessionId: session.id },
+      { status: 409, headers: sessionHeaders }
+    )
+  }
+  
+  // One turn at a time per session; cleared once the reply has been recorded
+  session.busy = true
+  let context
+  try {
+    // Warm sessions already hold the chatbot, its index and prompt parts
+    context = await trace.time('chatbot.load', () => getChatSessions().context(session, loadChatbotContext))
+  } catch (error) {
+    session.busy = false
+    throw error
+  }
+  const endSearch = trace.span('kb.search')
+  const knowledge = searchIndex(context.knowledgeIndex, message || '', { k: KB_TOP_K })
+    .map(chunk => chunk.text)
+    .join('\n\n')
+  endSearch()
+  
+  // The system prompt and history form a prefix that stays the same from
+  // turn to turn; the excerpts travel with the question
+  const turn = getPrompts().get('chatbot').user.render({ knowledge, message })
+  const completionRequest = {
+    messages: getChatSessions().messages(session, context.system, message, turn.text),
+    temperature: 0.7,
+    max_tokens: 500,
+  }
+  try {
+    getPrompts().assertFits(context.systemTokens + estimateMessageTokens(completionRequest.messages.slice(1)), completionRequest.max_tokens)
+  } catch (error) {
+    session.busy = false
+    throw error
+  }
+  const fallbackResponse = "I'm sorry, I couldn't generate a response. Please try again."
+  
+  const finishTurn = (content) => {
+    if (content) {
+      getChatSessions().record(session, message, content)
+    }
+    return content || fallbackResponse
+  }
+  
+  const streamTurn = async (send, signal) => {
+    try {
+      const stream = trace.stream('llm', getLlm().chatStream(completionRequest, { signal }))
+      const content = await pipeCompletion(stream, send)
+      chargeUsage(stream.usage)
+      send('done', { response: finishTurn(content), sessionId: session.id })
+    } finally {
+      session.busy = false
+    }
+  }
+  
+  // Deliver the reply over the session's open event stream instead
+  if (transport === 'events' && session.subscribers.size) {
+    const turn = session.turns + 1
+    const publish = (event, data) => getChatSessions().publish(session, event, { ...data, turn })
+    streamTurn(publish).catch(error => {
+      console.error('Stream Error:', error)
+      publish('error', { error: error.message })
+    })
+    return NextResponse.json({ sessionId: session.id, turn }, { status: 202, headers: sessionHeaders })
+  }
+  
+  if (wantsEventStream(request)) {
+    return createEventStreamResponse(streamTurn, { headers: sessionHeaders, onClose: trace.hold() })
+  }
+  
+  // Generate response using Groq
+  let completion
+  try {
+    completion = await trace.completion('llm', () => getLlm().chat(completionRequest))
+  } finally {
+    session.busy = false
+  }
+  chargeUsage(completion.usage)
+  
+  const response = finishTurn(completion.content)
+  
+  return NextResponse.json({ response, sessionId: session.id }, { headers: sessionHeaders })
+}
+
+// A chatbot's index is saved as one Firestore document, and documents are
+// capped at 1 MiB. The index holds the chunk text plus term counts, 2-3x the
+// size of the knowledge base, so the knowledge base is capped well below that
+// and the index itself is checked before it's saved.
+const KNOWLEDGE_BASE_MAX_BYTES = parseInt(process.env.KNOWLEDGE_BASE_MAX_BYTES || String(256 * 1024), 10)
+
+function checkKnowledgeBase(knowledgeBase) {
+  const bytes = Buffer.byteLength(knowledgeBase || '')
+  if (bytes > KNOWLEDGE_BASE_MAX_BYTES) {
+    throw new HttpError(413, `Knowledge base is ${bytes} bytes; the limit is ${KNOWLEDGE_BASE_MAX_BYTES}`)
+  }
+}
+
+function checkKnowledgeIndex(index) {
+  const bytes = Buffer.byteLength(JSON.stringify(serializeIndex(index)))
+  if (bytes > MAX_DOCUMENT_BYTES) {
+    throw new HttpError(413, 'Knowledge base is too large to index; shorten it and try again')
+  }
+}
+
+function createChatbot({ body }) {
+  const { name, description, knowledgeBase, color, userId } = body
+  checkKnowledgeBase(knowledgeBase)
+  
+  const chatbotId = `chatbot_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+  
+  // Index the knowledge base for retrieval at chat time
+  const knowledgeIndex = buildIndex(knowledgeBase)
+  checkKnowledgeIndex(knowledgeIndex)
+  
+  const chatbot = {
+    id: chatbotId,
+    name,
+    description,
+    knowledgeBase,
+    knowledgeIndex: indexSummary(knowledgeIndex),
+    color,
+    userId,
+    createdAt: new Date().toISOString(),
+    isActive: true
+  }
+  
+  // Save to Firestore
+  getChatbotStore().create(chatbot, knowledgeIndex)
+  
+  return NextResponse.json({ chatbot })
+}
+
+async function createWorkflow({ request, body, trace, chargeUsage }) {
+  const { prompt, type, userId, mode } = body
+  
+  // Check if Groq API key is valid
+  if (!getLlm().isConfigured()) {
+    return NextResponse.json({ error: 'Invalid Groq API key configuration' }, { status: 500 })
+  }
+  
+  const workflowPrompt = getPrompts().render(workflowTemplate(type), { type, prompt })
+  
+  const completionRequest = {
+    messages: workflowPrompt.messages,
+    temperature: 0.3,
+    max_tokens: 2000,
+  }
+  getPrompts().assertFits(workflowPrompt.tokens, completionRequest.max_tokens)
+  
+  const key = workflowKey({ type, prompt })
+  
+  const saveWorkflow = (workflow) => {
+    getPersistence().enqueue('workflows', {
+      userId,
+      prompt,
+      type,
+      workflow,
+      timestamp: new Date()
+    })
+  }
+  
+  if (wantsEventStream(request) && mode !== 'job') {
+    return createEventStreamResponse(async (send, signal) => {
+      let workflow = await trace.time('cache', () => getWorkflowResults().get(key))
       
-      let workflow
-      try {
-        const response = completion.choices[0]?.message?.content || "{}"
-        // Clean the response to extract JSON
-        const jsonMatch = response.match(/\{[\s\S]*\}/)
-        workflow = jsonMatch ? JSON.parse(jsonMatch[0]) : { error: "Invalid JSON generated" }
-      } catch (error) {
-        workflow = {
-          error: "Failed to parse workflow JSON",
-          raw_response: completion.choices[0]?.message?.content
+      if (workflow === undefined) {
+        const stream = trace.stream('llm', getLlm().chatStream(completionRequest, { signal }))
+        const result = await readWorkflow(stream, type, send)
+        workflow = result.workflow
+        chargeUsage(workflowUsage(stream, workflowPrompt.tokens, result.content))
+        
+        if (!workflow.error) {
+          getWorkflowResults().set(key, JSON.stringify(workflow))
         }
+      } else {
+        workflow = JSON.parse(workflow)
       }
       
-      // Save to Firestore - temporarily commented out for testing
-      try {
-        await addDoc(collection(db, 'workflows'), {
-          userId,
-          prompt,
-          type,
-          workflow,
-          timestamp: new Date()
-        })
-        console.log('Successfully saved workflow to Firestore')
-      } catch (firebaseError) {
-        console.log('Firebase save failed (expected in testing):', firebaseError.message)
-        // Continue execution - don't fail the API call due to Firebase issues
-      }
-      
-      return NextResponse.json({ workflow })
+      send('done', { workflow })
+      saveWorkflow(workflow)
+    }, { onClose: trace.hold() })
+  }
+  
+  // Generation runs on the bounded worker pool; identical requests share
+  // one job and finished workflows are served from the store
+  const job = await trace.time('workflow.submit', () => getWorkflowJobs().submit(key, { type, prompt }))
+  if (!job) {
+    return NextResponse.json(
+      { error: 'Too many workflows are being generated, please try again shortly' },
+      { status: 503, headers: { 'Retry-After': '5' } }
+    )
+  }
+  job.done.then(() => {
+    // Everyone who submitted a generated job pays for it, including those who
+    // joined it while it ran; results served from the store are free
+    chargeUsage(job.tokens && { total_tokens: job.tokens })
+    if (job.status === 'completed') {
+      saveWorkflow(job.result)
     }
+  })
+  
+  if (mode === 'job') {
+    return NextResponse.json(
+      { job: getWorkflowJobs().view(job), statusUrl: `/api/workflows/jobs/${job.id}` },
+      { status: job.finishedAt ? 200 : 202 }
+    )
+  }
+  
+  await trace.time('workflow.job', () => job.done)
+  if (job.status === 'failed') {
+    throw job.error
+  }
+  
+  return NextResponse.json({ workflow: job.result }, { headers: { 'X-Cache': job.cached ? 'HIT' : 'MISS' } })
+}
+
+async function updateChatbot({ params, body }) {
+  const chatbotId = params.id
+  
+  // Only the user who created a chatbot may change it
+  const current = await getChatbotStore().get(chatbotId)
+  if (!current) {
+    return NextResponse.json({ error: 'Chatbot not found' }, { status: 404 })
+  }
+  if (!body.userId || body.userId !== current.userId) {
+    throw new HttpError(403, 'Only the chatbot\'s owner can update it')
+  }
+  
+  const updates = {}
+  
+  for (const field of ['name', 'description', 'color', 'isActive']) {
+    if (body[field] !== undefined) {
+      updates[field] = body[field]
+    }
+  }
+  
+  let knowledgeIndex = null
+  let reindexed = null
+  if (typeof body.knowledgeBase === 'string') {
+    checkKnowledgeBase(body.knowledgeBase)
+    // Only chunks whose text changed are re-tokenized
+    const previous = await getChatbotStore().getKnowledgeIndex(chatbotId)
+    const { index, ...counts } = updateIndex(previous || buildIndex(''), body.knowledgeBase)
+    checkKnowledgeIndex(index)
     
-    return NextResponse.json({ error: 'Not found' }, { status: 404 })
-    
-  } catch (error) {
-    console.error('API Error:', error)
-    return NextResponse.json({ error: error.message }, { status: 500 })
+    updates.knowledgeBase = body.knowledgeBase
+    updates.knowledgeIndex = indexSummary(index)
+    knowledgeIndex = index
+    reindexed = counts
+  }
+  
+  updates.updatedAt = new Date().toISOString()
+  const chatbot = await getChatbotStore().update(chatbotId, updates, knowledgeIndex)
+  
+  if (!chatbot) {
+    return NextResponse.json({ error: 'Chatbot not found' }, { status: 404 })
   }
+  
+  // Open chat sessions pick up the new name and knowledge base on their next turn
+  getChatSessions().invalidateChatbot(chatbotId)
+  
+  return NextResponse.json({ chatbot, reindexed })
 }
 
-// Handle other HTTP methods
-export async function PUT(request) {
-  return NextResponse.json({ error: 'Method not allowed' }, { status: 405 })
+// End a chat session
+function endChatSession({ params }) {
+  if (!getChatSessions().remove(params.id)) {
+    return NextResponse.json({ error: 'Session not found' }, { status: 404 })
+  }
+  return NextResponse.json({ deleted: true })
 }
 
-export async function DELETE(request) {
-  return NextResponse.json({ error: 'Method not allowed' }, { status: 405 })
-}
\ No newline at end of file
+function handleError(error) {
+  if (!(error instanceof HttpError)) {
+    console.error('API Error:', error)
+  }
+  const status = error instanceof HttpError || error instanceof LlmError ? error.status : 500
+  return NextResponse.json({ error: error.message }, { status })
+}
+
+const API_MAX_BODY_BYTES = parseInt(process.env.API_MAX_BODY_BYTES || String(1024 * 1024), 10)
+
+// Compiled once; static segments take precedence over `:id`, so the order of
+// entries doesn't matter
+const router = startup.measure('router', () => createRouter([
+  { path: '/api/metrics', GET: getMetrics },
+  { path: '/api/ai-tools', GET: listAiTools },
+  { path: '/api/ai-agents', POST: limited(runAgent) },
+  { path: '/api/chatbots', GET: listChatbots, POST: limited(createChatbot) },
+  { path: '/api/chatbots/test', POST: limited(chatTurn, { perChatbot: true }) },
+  { path: '/api/chatbots/sessions/:id', DELETE: limited(endChatSession, { perChatbot: true, readsBody: false }) },
+  { path: '/api/chatbots/sessions/:id/events', GET: streamChatSession },
+  { path: '/api/chatbots/:id', PUT: limited(updateChatbot) },
+  { path: '/api/workflows', POST: limited(createWorkflow) },
+  { path: '/api/workflows/jobs/:id', GET: getWorkflowJob }
+], { maxBodyBytes: API_MAX_BODY_BYTES, onError: handleError }))
+
+const handle = tracer.wrap((request, trace) => router.handle(request, { trace }))
+startup.ready()
+
+export const GET = handle
+export const POST = handle
+export const PUT = handle
+export const DELETE = handle
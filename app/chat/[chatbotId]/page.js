@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
@@ -8,6 +8,7 @@ import { ScrollArea } from '@/components/ui/scroll-area'
 import { Avatar, AvatarFallback } from '@/components/ui/avatar'
 import { Send, MessageSquare, X, Minimize2, Maximize2, BrainCircuit } from 'lucide-react'
 import { toast } from 'sonner'
+import { readEventStream, isEventStream } from '@/lib/sse-client'
 
 export default function ChatbotPage({ params }) {
   const [messages, setMessages] = useState([])
@@ -16,6 +17,8 @@ export default function ChatbotPage({ params }) {
   const [chatbot, setChatbot] = useState(null)
   const [isMinimized, setIsMinimized] = useState(false)
   const [isExpanded, setIsExpanded] = useState(false)
+  // Server-side conversation for multi-turn context; set by the first reply
+  const sessionId = useRef(null)
 
   const chatbotId = params?.chatbotId || 'demo_bot'
 
@@ -54,27 +57,63 @@ export default function ChatbotPage({ params }) {
     setInputMessage('')
     setIsLoading(true)
 
+    const botMessageId = messages.length + 2
+    const fallbackContent = 'I apologize, but I couldn\'t process your request. Please try again.'
+
     try {
       const response = await fetch('/api/chatbots/test', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'text/event-stream'
+        },
         body: JSON.stringify({
           chatbotId: chatbotId,
+          sessionId: sessionId.current,
           message: inputMessage,
           userId: 'demo_user'
         })
       })
 
-      const data = await response.json()
-      
-      const botMessage = {
-        id: messages.length + 2,
-        type: 'bot',
-        content: data.response || 'I apologize, but I couldn\'t process your request. Please try again.',
-        timestamp: new Date()
+      if (isEventStream(response)) {
+        // Render tokens as they arrive; the bot message appears on the first token
+        let content = ''
+        await readEventStream(response, (event, data) => {
+          if (event === 'token') {
+            content += data.content
+          } else if (event === 'done') {
+            sessionId.current = data.sessionId || sessionId.current
+            content = data.response || content || fallbackContent
+          } else if (event === 'error') {
+            throw new Error(data.error)
+          } else {
+            return
+          }
+
+          setMessages(prev => {
+            const botMessage = { id: botMessageId, type: 'bot', content, timestamp: new Date() }
+            const existing = prev.findIndex(m => m.id === botMessageId)
+            if (existing === -1) {
+              return [...prev, botMessage]
+            }
+            const next = [...prev]
+            next[existing] = { ...next[existing], content }
+            return next
+          })
+        })
+      } else {
+        const data = await response.json()
+        sessionId.current = data.sessionId || sessionId.current
+        
+        const botMessage = {
+          id: botMessageId,
+          type: 'bot',
+          content: data.response || fallbackContent,
+          timestamp: new Date()
+        }
+
+        setMessages(prev => [...prev, botMessage])
       }
-
-      setMessages(prev => [...prev, botMessage])
     } catch (error) {
       console.error('Error sending message:', error)
       toast.error('Failed to send message')
@@ -169,7 +208,7 @@ export default function ChatbotPage({ params }) {
                     </div>
                   </div>
                 ))}
-                {isLoading && (
+                {isLoading && messages[messages.length - 1]?.type === 'user' && (
                   <div className="flex justify-start">
                     <div className="bg-white text-gray-800 border border-gray-200 max-w-xs lg:max-w-md px-4 py-2 rounded-lg">
                       <div className="flex items-center space-x-2">
@@ -0,0 +1,89 @@
+import { NextResponse } from 'next/server'
+import { promises as fs } from 'fs'
+import path from 'path'
+import { isNotModified } from '@/lib/swr-cache'
+
+// Serves the widget files built by scripts/build-widget.js. Hashed files are
+// cached immutably; the loader keeps a stable URL and a short max-age so host
+// pages pick up new builds. Brotli and gzip variants are precompressed.
+
+const DIST_DIR = path.join(process.cwd(), 'embed', 'dist')
+
+const ENCODINGS = [
+  { name: 'br', extension: '.br' },
+  { name: 'gzip', extension: '.gz' }
+]
+
+const LOADER_CACHE_CONTROL = 'public, max-age=300, stale-while-revalidate=86400'
+const IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+let manifestPromise = null
+const contents = new Map()
+
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fs.readFile(path.join(DIST_DIR, 'manifest.json'), 'utf8')
+      .then(JSON.parse)
+      .catch(error => {
+        manifestPromise = null
+        throw error
+      })
+  }
+  return manifestPromise
+}
+
+async function readFile(name) {
+  if (!contents.has(name)) {
+    contents.set(name, await fs.readFile(path.join(DIST_DIR, name)))
+  }
+  return contents.get(name)
+}
+
+function negotiateEncoding(request) {
+  const accepted = (request.headers.get('accept-encoding') || '')
+    .split(',')
+    .map(value => value.trim().split(';'))
+    .filter(([, q]) => !q || parseFloat(q.split('=')[1]) > 0)
+    .map(([coding]) => coding.toLowerCase())
+
+  return ENCODINGS.find(encoding => accepted.includes(encoding.name)) || null
+}
+
+export async function GET(request, { params }) {
+  let manifest
+  try {
+    manifest = await loadManifest()
+  } catch (error) {
+    console.error('Widget manifest could not be read. Run `yarn build:widget`.', error.message)
+    return NextResponse.json({ error: 'Not found' }, { status: 404 })
+  }
+
+  const file = manifest.files[params.file]
+  if (!file) {
+    return NextResponse.json({ error: 'Not found' }, { status: 404 })
+  }
+
+  const encoding = negotiateEncoding(request)
+  const entry = {
+    etag: `"${file.hash}${encoding ? `-${encoding.name}` : ''}"`,
+    lastModified: manifest.builtAt
+  }
+  const headers = {
+    'Content-Type': 'application/javascript; charset=utf-8',
+    'Cache-Control': file.immutable ? IMMUTABLE_CACHE_CONTROL : LOADER_CACHE_CONTROL,
+    'Vary': 'Accept-Encoding',
+    'ETag': entry.etag,
+    'Last-Modified': new Date(entry.lastModified).toUTCString(),
+    'Access-Control-Allow-Origin': '*'
+  }
+
+  if (isNotModified(request, entry)) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+
+  if (encoding) {
+    headers['Content-Encoding'] = encoding.name
+  }
+  const body = await readFile(params.file + (encoding ? encoding.extension : ''))
+  return new NextResponse(body, { headers })
+}
@@ -1,105 +1,70 @@
-'use client'
-
-import { useState, useEffect } from 'react'
-import { Button } from '@/components/ui/button'
-import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
-import { Input } from '@/components/ui/input'
 import { Badge } from '@/components/ui/badge'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { Avatar, AvatarFallback } from '@/components/ui/avatar'
-import { toast } from 'sonner'
+import { AiToolSections } from '@/components/ai-tool-card'
+import AiToolsSearch from '@/components/ai-tools-search'
+import DemoSettingsButton from '@/components/demo-settings-button'
+import { getAiToolsIndex, groupByRecency } from '@/lib/ai-tools'
 import { 
   Search, 
-  TrendingUp, 
   Bot, 
-  User, 
-  Settings,
-  ExternalLink,
-  Heart,
   Sparkles,
   Code,
-  MessageSquare,
-  FileText,
   Flame,
   Crown,
-  BrainCircuit,
-  Calendar,
-  Database
+  BrainCircuit
 } from 'lucide-react'
 
-export default function App() {
-  const [user, setUser] = useState({ uid: 'demo_user', phoneNumber: '+1234567890' })
-  const [loading, setLoading] = useState(false)
-  const [aiTools, setAiTools] = useState([])
-  const [searchTerm, setSearchTerm] = useState('')
-  const [toolsLoading, setToolsLoading] = useState(false)
-
-  useEffect(() => {
-    fetchAiTools()
-  }, [])
-
-  const fetchAiTools = async () => {
-    setToolsLoading(true)
-    try {
-      const response = await fetch('/api/ai-tools')
-      const data = await response.json()
-      
-      const sortedTools = (data.tools || []).sort((a, b) => {
-        if (a.date && b.date) {
-          return new Date(b.date) - new Date(a.date)
-        }
-        return (b.votes || 0) - (a.votes || 0)
-      })
-      
-      setAiTools(sortedTools)
-    } catch (error) {
-      toast.error('Failed to fetch AI tools')
-    } finally {
-      setToolsLoading(false)
-    }
+// Rendered on the server from the local AI tools index and regenerated in the
+// background at most every 5 minutes, matching the index refresh interval
+export const revalidate = 300
+
+const HOME_TOOLS_LIMIT = 1000
+// Tools rendered into the HTML; the search island shows the rest once hydrated
+const HOME_PREVIEW_LIMIT = 24
+
+// Only what the cards and search need is sent to the browser
+function toListing(tool) {
+  return {
+    id: tool.id,
+    name: tool.name,
+    description: tool.description || '',
+    url: tool.url,
+    votes: tool.votes || 0,
+    date: tool.date || null
   }
-
-  const handleSignOut = async () => {
-    toast.success('Demo mode - authentication disabled')
+}
+
+async function loadToolGroups() {
+  try {
+    const index = getAiToolsIndex()
+    await index.start()
+    const { tools } = index.query({ limit: HOME_TOOLS_LIMIT, sort: 'date' })
+    return groupByRecency(tools.map(toListing))
+  } catch (error) {
+    // Render without tools; the next regeneration tries again
+    console.error('Failed to load AI tools:', error.message)
+    return groupByRecency([])
   }
-
-  const filteredTools = aiTools.filter(tool => 
-    tool.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    tool.description.toLowerCase().includes(searchTerm.toLowerCase())
-  )
-
-  // Group tools by recency
-  const groupedTools = {
-    today: [],
-    thisWeek: [],
-    older: []
+}
+
+// The first `limit` tools in display order, keeping their sections
+function previewGroups(groups, limit) {
+  let remaining = limit
+  const preview = {}
+  for (const key of ['today', 'thisWeek', 'older']) {
+    preview[key] = groups[key].slice(0, remaining)
+    remaining -= preview[key].length
   }
-
-  const now = new Date()
-  const todayStart = new Date(now.getFullYear(), now.getMonth(), now.getDate())
-  const weekStart = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-
-  filteredTools.forEach(tool => {
-    const toolDate = tool.date ? new Date(tool.date) : new Date(Date.now() - Math.random() * 7 * 24 * 60 * 60 * 1000)
-    
-    if (toolDate >= todayStart) {
-      groupedTools.today.push(tool)
-    } else if (toolDate >= weekStart) {
-      groupedTools.thisWeek.push(tool)
-    } else {
-      groupedTools.older.push(tool)
-    }
-  })
-
-  if (loading) {
-    return (
-      <div className="min-h-screen bg-gradient-to-br from-indigo-50 via-white to-purple-50 flex items-center justify-center">
-        <div className="text-center">
-          <div className="animate-spin rounded-full h-32 w-32 border-4 border-orange-500 border-t-transparent mx-auto mb-4"></div>
-          <p className="text-gray-600 text-xl font-semibold">Loading HappyAxzora...</p>
-        </div>
-      </div>
-    )
+  return preview
+}
+
+export default async function App() {
+  const groups = await loadToolGroups()
+  const counts = {
+    today: groups.today.length,
+    thisWeek: groups.thisWeek.length,
+    older: groups.older.length
   }
 
   return (
@@ -136,9 +101,7 @@ export default function App() {
                 </Avatar>
                 <span className="text-sm font-medium text-gray-700">Demo User</span>
               </div>
-              <Button variant="ghost" size="sm" onClick={handleSignOut} className="text-gray-500 hover:text-gray-700">
-                <Settings className="h-4 w-4" />
-              </Button>
+              <DemoSettingsButton />
             </div>
           </div>
         </div>
@@ -192,185 +155,9 @@ export default function App() {
 
           {/* AI Tools Discovery - Product Hunt Style */}
           <TabsContent value="tools" className="space-y-8">
-            {/* Search Bar */}
-            <div className="bg-white rounded-2xl shadow-sm border border-gray-200 p-6">
-              <div className="relative max-w-2xl mx-auto">
-                <Search className="absolute left-4 top-4 h-5 w-5 text-gray-400" />
-                <Input
-                  placeholder="Search AI tools..."
-                  value={searchTerm}
-                  onChange={(e) => setSearchTerm(e.target.value)}
-                  className="pl-12 h-12 border-gray-200 focus:border-orange-500 focus:ring-orange-500 rounded-xl"
-                />
-              </div>
-            </div>
-
-            {toolsLoading ? (
-              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {[...Array(6)].map((_, i) => (
-                  <div key={i} className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
-                    <div className="animate-pulse">
-                      <div className="h-6 bg-gray-200 rounded mb-4"></div>
-                      <div className="h-4 bg-gray-200 rounded mb-2"></div>
-                      <div className="h-4 bg-gray-200 rounded w-2/3 mb-4"></div>
-                      <div className="h-10 bg-gray-200 rounded"></div>
-                    </div>
-                  </div>
-                ))}
-              </div>
-            ) : (
-              <div className="space-y-8">
-                {/* Today's Tools */}
-                {groupedTools.today.length > 0 && (
-                  <div>
-                    <div className="flex items-center mb-6">
-                      <Flame className="h-6 w-6 text-red-500 mr-2" />
-                      <h3 className="text-2xl font-bold text-gray-900">Today's Latest</h3>
-                      <Badge className="ml-3 bg-red-100 text-red-700">
-                        {groupedTools.today.length}
-                      </Badge>
-                    </div>
-                    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                      {groupedTools.today.map((tool, index) => (
-                        <Card key={index} className="bg-white border border-gray-200 hover:border-orange-300 hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1 rounded-xl overflow-hidden">
-                          <CardHeader className="pb-3">
-                            <div className="flex items-start justify-between">
-                              <div className="flex-1">
-                                <CardTitle className="text-lg text-gray-900 font-bold mb-1 hover:text-orange-600 transition-colors">
-                                  {tool.name}
-                                </CardTitle>
-                                <CardDescription className="text-gray-600 text-sm">
-                                  {tool.description}
-                                </CardDescription>
-                              </div>
-                              <div className="flex items-center space-x-2 ml-4">
-                                <Badge className="bg-orange-100 text-orange-700 flex items-center space-x-1">
-                                  <TrendingUp className="h-3 w-3" />
-                                  <span>{tool.votes || 0}</span>
-                                </Badge>
-                              </div>
-                            </div>
-                          </CardHeader>
-                          <CardContent>
-                            <div className="flex items-center justify-between">
-                              <Button size="sm" asChild className="bg-orange-500 hover:bg-orange-600 text-white rounded-lg">
-                                <a href={tool.url} target="_blank" rel="noopener noreferrer">
-                                  <ExternalLink className="h-4 w-4 mr-2" />
-                                  Visit
-                                </a>
-                              </Button>
-                              <Button variant="ghost" size="sm" className="text-gray-500 hover:text-red-500">
-                                <Heart className="h-4 w-4" />
-                              </Button>
-                            </div>
-                          </CardContent>
-                        </Card>
-                      ))}
-                    </div>
-                  </div>
-                )}
-
-                {/* This Week's Tools */}
-                {groupedTools.thisWeek.length > 0 && (
-                  <div>
-                    <div className="flex items-center mb-6">
-                      <Calendar className="h-6 w-6 text-blue-500 mr-2" />
-                      <h3 className="text-2xl font-bold text-gray-900">This Week</h3>
-                      <Badge className="ml-3 bg-blue-100 text-blue-700">
-                        {groupedTools.thisWeek.length}
-                      </Badge>
-                    </div>
-                    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                      {groupedTools.thisWeek.map((tool, index) => (
-                        <Card key={index} className="bg-white border border-gray-200 hover:border-blue-300 hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1 rounded-xl overflow-hidden">
-                          <CardHeader className="pb-3">
-                            <div className="flex items-start justify-between">
-                              <div className="flex-1">
-                                <CardTitle className="text-lg text-gray-900 font-bold mb-1 hover:text-blue-600 transition-colors">
-                                  {tool.name}
-                                </CardTitle>
-                                <CardDescription className="text-gray-600 text-sm">
-                                  {tool.description}
-                                </CardDescription>
-                              </div>
-                              <div className="flex items-center space-x-2 ml-4">
-                                <Badge className="bg-blue-100 text-blue-700 flex items-center space-x-1">
-                                  <TrendingUp className="h-3 w-3" />
-                                  <span>{tool.votes || 0}</span>
-                                </Badge>
-                              </div>
-                            </div>
-                          </CardHeader>
-                          <CardContent>
-                            <div className="flex items-center justify-between">
-                              <Button size="sm" asChild className="bg-blue-500 hover:bg-blue-600 text-white rounded-lg">
-                                <a href={tool.url} target="_blank" rel="noopener noreferrer">
-                                  <ExternalLink className="h-4 w-4 mr-2" />
-                                  Visit
-                                </a>
-                              </Button>
-                              <Button variant="ghost" size="sm" className="text-gray-500 hover:text-red-500">
-                                <Heart className="h-4 w-4" />
-                              </Button>
-                            </div>
-                          </CardContent>
-                        </Card>
-                      ))}
-                    </div>
-                  </div>
-                )}
-
-                {/* Older Tools */}
-                {groupedTools.older.length > 0 && (
-                  <div>
-                    <div className="flex items-center mb-6">
-                      <Database className="h-6 w-6 text-gray-500 mr-2" />
-                      <h3 className="text-2xl font-bold text-gray-900">Previous Tools</h3>
-                      <Badge className="ml-3 bg-gray-100 text-gray-700">
-                        {groupedTools.older.length}
-                      </Badge>
-                    </div>
-                    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                      {groupedTools.older.map((tool, index) => (
-                        <Card key={index} className="bg-white border border-gray-200 hover:border-gray-300 hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1 rounded-xl overflow-hidden">
-                          <CardHeader className="pb-3">
-                            <div className="flex items-start justify-between">
-                              <div className="flex-1">
-                                <CardTitle className="text-lg text-gray-900 font-bold mb-1 hover:text-gray-600 transition-colors">
-                                  {tool.name}
-                                </CardTitle>
-                                <CardDescription className="text-gray-600 text-sm">
-                                  {tool.description}
-                                </CardDescription>
-                              </div>
-                              <div className="flex items-center space-x-2 ml-4">
-                                <Badge className="bg-gray-100 text-gray-700 flex items-center space-x-1">
-                                  <TrendingUp className="h-3 w-3" />
-                                  <span>{tool.votes || 0}</span>
-                                </Badge>
-                              </div>
-                            </div>
-                          </CardHeader>
-                          <CardContent>
-                            <div className="flex items-center justify-between">
-                              <Button size="sm" asChild className="bg-gray-500 hover:bg-gray-600 text-white rounded-lg">
-                                <a href={tool.url} target="_blank" rel="noopener noreferrer">
-                                  <ExternalLink className="h-4 w-4 mr-2" />
-                                  Visit
-                                </a>
-                              </Button>
-                              <Button variant="ghost" size="sm" className="text-gray-500 hover:text-red-500">
-                                <Heart className="h-4 w-4" />
-                              </Button>
-                            </div>
-                          </CardContent>
-                        </Card>
-                      ))}
-                    </div>
-                  </div>
-                )}
-              </div>
-            )}
+            <AiToolsSearch groups={groups}>
+              <AiToolSections groups={previewGroups(groups, HOME_PREVIEW_LIMIT)} counts={counts} />
+            </AiToolsSearch>
           </TabsContent>
 
           {/* Other tabs */}
@@ -2,20 +2,154 @@
 """
 HappyAxzora Backend API Testing Suite
 Tests all backend endpoints including AI Tools, AI Agents, and Workflows
+
+Independent test categories run concurrently on a thread pool and share one
+keep-alive HTTP session. Output is buffered per category group and printed in
+a fixed order, so logs read the same as a sequential run.
+
+Usage:
+    python backend_test.py                  # run the suite
+    python backend_test.py --workers 1      # run sequentially
+    python backend_test.py --diagnostics    # also run the env and core API diagnostics
+    python backend_test.py --replay         # offline, against replay_server.py
 """
 
+import argparse
+import io
 import requests
 import json
 import os
 import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from requests.adapters import HTTPAdapter
+
+import replay_server
+
 # Get base URL from environment
 BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')
 API_BASE = f"{BASE_URL}/api"
+ENV_FILE = '/app/.env'
+GROQ_API_URL = 'https://api.groq.com/openai/v1/chat/completions'
+DEFAULT_WORKERS = 8
+
+# Request payloads shared by the functional tests and benchmark.py
+CHATBOT_CREATE_REQUEST = {
+    'name': 'Customer Support Bot',
+    'description': 'AI-powered customer support chatbot for e-commerce',
+    'knowledgeBase': 'Our company offers premium software solutions for businesses. We provide 24/7 support, have a 30-day money-back guarantee, and offer enterprise-level security. Our main products include CRM software, project management tools, and analytics dashboards.',
+    'color': '#3B82F6',
+    'userId': 'test_user_chatbot_123'
+}
+
+CHATBOT_TEST_REQUESTS = [
+    {
+        'chatbotId': 'test_bot_123',
+        'message': 'What are your business hours?',
+        'userId': 'test_user_123'
+    },
+    {
+        'chatbotId': 'test_bot_123', 
+        'message': 'Do you offer refunds?',
+        'userId': 'test_user_123'
+    },
+    {
+        'chatbotId': 'test_bot_123',
+        'message': 'Tell me about your products',
+        'userId': 'test_user_123'
+    }
+]
+
+AGENT_REQUESTS = [
+    {
+        'agentId': 'resume',
+        'input': 'Senior Software Engineer with 5 years experience in Python, React, and cloud technologies. Led teams of 3-5 developers.',
+        'userId': 'test_user_123'
+    },
+    {
+        'agentId': 'product',
+        'input': 'AI-powered task management app for remote teams with real-time collaboration features',
+        'userId': 'test_user_123'
+    },
+    {
+        'agentId': 'business',
+        'input': 'AI automation platform for small businesses to streamline operations',
+        'userId': 'test_user_123'
+    }
+]
+
+WORKFLOW_REQUESTS = [
+    {
+        'prompt': 'Create a workflow that sends a Slack notification when a new email arrives in Gmail, then creates a task in Asana',
+        'type': 'n8n',
+        'userId': 'test_user_123'
+    },
+    {
+        'prompt': 'Build an automation that creates a Trello card when a form is submitted on a website, then sends a welcome email',
+        'type': 'make',
+        'userId': 'test_user_123'
+    }
+]
+
+# Firestore isn't replayed, so with --replay these checks are skipped and chat
+# turns go to the built-in default chatbot, which needs no lookup. Writes go
+# through the write-behind queue, off the request path, and don't need it.
+FIRESTORE_CHECKS = {
+    'chatbot_list': 'lists chatbots with a Firestore query',
+    'write_behind': 'watches queued writes reach Firestore'
+}
+
+# Endpoint definitions: category -> (method, path relative to API_BASE, payloads)
+ENDPOINTS = {
+    'ai_tools': ('GET', '/ai-tools', [None]),
+    'ai_agents': ('POST', '/ai-agents', AGENT_REQUESTS),
+    'workflows': ('POST', '/workflows', WORKFLOW_REQUESTS),
+    'chatbot_create': ('POST', '/chatbots', [CHATBOT_CREATE_REQUEST]),
+    'chatbot_list': ('GET', f"/chatbots?userId={CHATBOT_CREATE_REQUEST['userId']}", [None]),
+    'chatbot_test': ('POST', '/chatbots/test', CHATBOT_TEST_REQUESTS),
+}
+
+class ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that collects each worker thread's output separately"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def capture(self, fn, *args):
+        """Run fn in this thread and return everything it printed"""
+        self.local.buffer = io.StringIO()
+        try:
+            fn(*args)
+        except Exception:
+            traceback.print_exc(file=self.local.buffer)
+        finally:
+            output = self.local.buffer.getvalue()
+            self.local.buffer = None
+        return output
+
 
 class BackendTester:
-    def __init__(self):
+    def __init__(self, workers=DEFAULT_WORKERS, offline=False):
+        self.workers = workers
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.results = {
             'ai_tools': {'status': 'pending', 'details': []},
             'ai_agents': {'status': 'pending', 'details': []},
@@ -36,23 +170,55 @@ class BackendTester:
             'message': message,
             'details': details or {}
         }
-        self.results[category]['details'].append(result)
-        
-        if not success and self.results[category]['status'] != 'failed':
-            self.results[category]['status'] = 'failed'
-        elif success and self.results[category]['status'] == 'pending':
-            self.results[category]['status'] = 'success'
+        with self.lock:
+            self.results[category]['details'].append(result)
+            
+            if not success and self.results[category]['status'] != 'failed':
+                self.results[category]['status'] = 'failed'
+            elif success and self.results[category]['status'] == 'pending':
+                self.results[category]['status'] = 'success'
             
         print(f"[{status.upper()}] {category}: {message}")
         if details:
             print(f"  Details: {details}")
+
+    def skip_offline(self, check, category=None):
+        """Return True, and mark `category` skipped, when `check` needs Firestore and we're offline"""
+        if not self.offline:
+            return False
+        print(f"Skipped: {check} {FIRESTORE_CHECKS[check]}, which --replay doesn't stand in for")
+        if category:
+            with self.lock:
+                if self.results[category]['status'] == 'pending':
+                    self.results[category]['status'] = 'skipped'
+        return True
+
+    def chat_request(self, payload):
+        """Chat turn payload; offline, without the chatbotId so no Firestore lookup happens"""
+        if not self.offline:
+            return payload
+        return {key: value for key, value in payload.items() if key != 'chatbotId'}
     
+    def read_event_stream(self, response):
+        """Collect (event, data) pairs from a Server-Sent Events response"""
+        events = []
+        event, data = 'message', ''
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith('event:'):
+                event = line[6:].strip()
+            elif line.startswith('data:'):
+                data += line[5:].strip()
+            elif not line and data:
+                events.append((event, json.loads(data)))
+                event, data = 'message', ''
+        return events
+
     def test_environment_variables(self):
         """Test if required environment variables are accessible"""
         print("\n=== Testing Environment Variables ===")
         
         # Test if .env file exists
-        env_file = '/app/.env'
+        env_file = ENV_FILE
         if os.path.exists(env_file):
             self.log_result('environment', True, ".env file exists")
             
@@ -80,7 +246,7 @@ class BackendTester:
         
         try:
             # Test GET request to ai-tools endpoint
-            response = requests.get(f"{API_BASE}/ai-tools", timeout=30)
+            response = self.session.get(f"{API_BASE}/ai-tools", timeout=30)
             
             self.log_result('ai_tools', True, f"API responded with status {response.status_code}")
             
@@ -131,7 +297,24 @@ class BackendTester:
                                 self.log_result('ai_tools', False, "Enhanced date sorting fields missing")
                         else:
                             self.log_result('ai_tools', False, f"Missing fields in tool: {missing_fields}")
-                    
+
+                    # Test conditional revalidation against the cached feed
+                    etag = response.headers.get('ETag')
+                    if etag:
+                        revalidate = self.session.get(
+                            f"{API_BASE}/ai-tools",
+                            headers={'If-None-Match': etag},
+                            timeout=30
+                        )
+                        if revalidate.status_code == 304:
+                            self.log_result('ai_tools', True, "ETag revalidation returned 304", {
+                                'x_cache': revalidate.headers.get('X-Cache')
+                            })
+                        else:
+                            self.log_result('ai_tools', False, f"Expected 304 for matching ETag, got {revalidate.status_code}")
+                    else:
+                        self.log_result('ai_tools', False, "Response missing ETag header")
+
                 else:
                     self.log_result('ai_tools', False, "Response missing 'tools' field", {'response': data})
             
@@ -154,16 +337,10 @@ class BackendTester:
         print("\n=== Testing Chatbot Creation Endpoint ===")
         
         # Test chatbot creation with knowledge base processing
-        test_chatbot = {
-            'name': 'Customer Support Bot',
-            'description': 'AI-powered customer support chatbot for e-commerce',
-            'knowledgeBase': 'Our company offers premium software solutions for businesses. We provide 24/7 support, have a 30-day money-back guarantee, and offer enterprise-level security. Our main products include CRM software, project management tools, and analytics dashboards.',
-            'color': '#3B82F6',
-            'userId': 'test_user_chatbot_123'
-        }
+        test_chatbot = CHATBOT_CREATE_REQUEST
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/chatbots",
                 json=test_chatbot,
                 headers={'Content-Type': 'application/json'},
@@ -184,15 +361,15 @@ class BackendTester:
                         self.log_result('chatbot_create', True, "Chatbot created successfully", {
                             'chatbot_id': chatbot['id'],
                             'name': chatbot['name'],
-                            'has_processed_knowledge': len(chatbot.get('knowledgeBase', '')) > len(test_chatbot['knowledgeBase']),
-                            'original_knowledge_preserved': 'originalKnowledge' in chatbot
+                            'knowledge_index': chatbot.get('knowledgeIndex'),
+                            'knowledge_preserved': chatbot.get('knowledgeBase') == test_chatbot['knowledgeBase']
                         })
                         
-                        # Check if knowledge base was processed by Groq
-                        if chatbot.get('knowledgeBase') != test_chatbot['knowledgeBase']:
-                            self.log_result('chatbot_create', True, "Knowledge base processed with AI enhancement")
+                        # Check the knowledge base was indexed for retrieval
+                        if chatbot.get('knowledgeIndex', {}).get('chunks', 0) > 0:
+                            self.log_result('chatbot_create', True, "Knowledge base indexed for retrieval")
                         else:
-                            self.log_result('chatbot_create', False, "Knowledge base not processed by AI")
+                            self.log_result('chatbot_create', False, "Knowledge base not indexed")
                             
                         # Store chatbot ID for testing
                         self.test_chatbot_id = chatbot['id']
@@ -236,7 +413,7 @@ class BackendTester:
                 'userId': 'test_user'
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/chatbots",
                 json=invalid_chatbot,
                 headers={'Content-Type': 'application/json'},
@@ -262,9 +439,15 @@ class BackendTester:
     def test_chatbot_list_endpoint(self):
         """Test the Chatbot listing endpoint"""
         print("\n=== Testing Chatbot List Endpoint ===")
+        if self.skip_offline('chatbot_list', 'chatbot_list'):
+            return
         
         try:
-            response = requests.get(f"{API_BASE}/chatbots", timeout=30)
+            response = self.session.get(
+                f"{API_BASE}/chatbots",
+                params={'userId': CHATBOT_CREATE_REQUEST['userId']},
+                timeout=30
+            )
             
             if response.status_code == 200:
                 data = response.json()
@@ -305,29 +488,13 @@ class BackendTester:
         print("\n=== Testing Chatbot Test Endpoint ===")
         
         # Test chatbot response generation
-        test_messages = [
-            {
-                'chatbotId': 'test_bot_123',
-                'message': 'What are your business hours?',
-                'userId': 'test_user_123'
-            },
-            {
-                'chatbotId': 'test_bot_123', 
-                'message': 'Do you offer refunds?',
-                'userId': 'test_user_123'
-            },
-            {
-                'chatbotId': 'test_bot_123',
-                'message': 'Tell me about your products',
-                'userId': 'test_user_123'
-            }
-        ]
+        test_messages = CHATBOT_TEST_REQUESTS
         
         for test_message in test_messages:
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{API_BASE}/chatbots/test",
-                    json=test_message,
+                    json=self.chat_request(test_message),
                     headers={'Content-Type': 'application/json'},
                     timeout=45
                 )
@@ -369,9 +536,9 @@ class BackendTester:
         try:
             incomplete_request = {'chatbotId': 'test_bot'}  # Missing message and userId
             
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/chatbots/test",
-                json=incomplete_request,
+                json=self.chat_request(incomplete_request),
                 headers={'Content-Type': 'application/json'},
                 timeout=30
             )
@@ -390,33 +557,47 @@ class BackendTester:
                 
         except Exception as e:
             self.log_result('chatbot_test', False, f"Error testing missing fields: {str(e)}")
+
+        # Test streaming mode - tokens arrive as SSE events followed by a done event
+        print("\n--- Testing Streaming Responses ---")
+        try:
+            response = self.session.post(
+                f"{API_BASE}/chatbots/test",
+                json=self.chat_request(test_messages[0]),
+                headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'},
+                stream=True,
+                timeout=45
+            )
+
+            if response.status_code == 200 and 'text/event-stream' in response.headers.get('Content-Type', ''):
+                events = self.read_event_stream(response)
+                token_count = sum(1 for event, _ in events if event == 'token')
+                done = [data for event, data in events if event == 'done']
+
+                if token_count and done and done[0].get('response'):
+                    self.log_result('chatbot_test', True, "Streaming response delivered tokens and done event", {
+                        'token_events': token_count
+                    })
+                else:
+                    self.log_result('chatbot_test', False, "Streaming response missing tokens or done event", {
+                        'events': [event for event, _ in events]
+                    })
+            else:
+                self.log_result('chatbot_test', False, f"Streaming request returned {response.status_code} ({response.headers.get('Content-Type')})")
+
+        except Exception as e:
+            self.log_result('chatbot_test', False, f"Error testing streaming response: {str(e)}")
     
     def test_ai_agents_endpoint(self):
         """Test the AI Agents endpoint with improved error handling"""
         print("\n=== Testing Enhanced AI Agents Endpoint ===")
         
         # Test different agent types
-        test_agents = [
-            {
-                'agentId': 'resume',
-                'input': 'Senior Software Engineer with 5 years experience in Python, React, and cloud technologies. Led teams of 3-5 developers.',
-                'userId': 'test_user_123'
-            },
-            {
-                'agentId': 'product',
-                'input': 'AI-powered task management app for remote teams with real-time collaboration features',
-                'userId': 'test_user_123'
-            },
-            {
-                'agentId': 'business',
-                'input': 'AI automation platform for small businesses to streamline operations',
-                'userId': 'test_user_123'
-            }
-        ]
+        test_agents = AGENT_REQUESTS
         
         for agent_test in test_agents:
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{API_BASE}/ai-agents",
                     json=agent_test,
                     headers={'Content-Type': 'application/json'},
@@ -458,14 +639,116 @@ class BackendTester:
                 self.log_result('ai_agents', False, f"Agent '{agent_id}' request timed out")
             except Exception as e:
                 self.log_result('ai_agents', False, f"Agent '{agent_id}' error: {str(e)}")
-        
+
+        # Test completion cache - repeating a cacheable request should be a hit
+        print("\n--- Testing Completion Cache ---")
+        try:
+            responses = [
+                self.session.post(
+                    f"{API_BASE}/ai-agents",
+                    json=test_agents[2],
+                    headers={'Content-Type': 'application/json'},
+                    timeout=45
+                )
+                for _ in range(2)
+            ]
+
+            if all(r.status_code == 200 for r in responses):
+                cache_statuses = [r.headers.get('X-Cache') for r in responses]
+                if cache_statuses[1] == 'HIT' and responses[0].json() == responses[1].json():
+                    self.log_result('ai_agents', True, "Repeated agent request served from cache", {
+                        'x_cache': cache_statuses
+                    })
+                else:
+                    self.log_result('ai_agents', False, "Repeated agent request was not a cache hit", {
+                        'x_cache': cache_statuses
+                    })
+
+            uncached = self.session.post(
+                f"{API_BASE}/ai-agents",
+                json={'agentId': 'planner', 'input': 'Prepare for a product launch', 'userId': 'test_user_123'},
+                headers={'Content-Type': 'application/json'},
+                timeout=45
+            )
+            if uncached.status_code == 200:
+                if uncached.headers.get('X-Cache') == 'BYPASS':
+                    self.log_result('ai_agents', True, "Non-cacheable agent bypasses the cache")
+                else:
+                    self.log_result('ai_agents', False, f"Planner agent should bypass cache, got {uncached.headers.get('X-Cache')}")
+
+        except Exception as e:
+            self.log_result('ai_agents', False, f"Error testing completion cache: {str(e)}")
+
+        # Test tracing - traced requests report their spans in Server-Timing
+        print("\n--- Testing Server-Timing ---")
+        try:
+            response = self.session.post(
+                f"{API_BASE}/ai-agents",
+                json={'agentId': 'planner', 'input': 'Plan a team offsite', 'userId': 'test_user_123'},
+                headers={'Content-Type': 'application/json'},
+                timeout=45
+            )
+            timing = response.headers.get('Server-Timing')
+            spans = [entry.split(';')[0].strip() for entry in (timing or '').split(',') if entry.strip()]
+
+            if timing is None:
+                print("Skipped: no Server-Timing header; start the app with TRACE_SAMPLE_RATE=1 to check it")
+            elif response.status_code == 200 and 'total' in spans and 'llm' in spans:
+                self.log_result('ai_agents', True, "Server-Timing reports the request's spans", {'spans': spans})
+            else:
+                self.log_result('ai_agents', False, "Server-Timing lacks the llm or total span", {
+                    'status': response.status_code,
+                    'server_timing': timing
+                })
+
+        except Exception as e:
+            self.log_result('ai_agents', False, f"Error testing Server-Timing: {str(e)}")
+
+        # Test single-flight - identical requests in flight together share one LLM call
+        print("\n--- Testing LLM Call Coalescing ---")
+        try:
+            before = self.get_metrics()
+            if not before or not before.get('llm'):
+                print("Skipped: /api/metrics has no LLM stats; set METRICS_TOKEN to the app's token to check coalescing")
+            else:
+                concurrent = 4
+                request = {'agentId': 'planner', 'input': f"Plan a hackathon (run {int(time.time())})", 'userId': 'test_user_123'}
+                with ThreadPoolExecutor(max_workers=concurrent) as pool:
+                    responses = list(pool.map(
+                        lambda _: self.session.post(
+                            f"{API_BASE}/ai-agents",
+                            json=request,
+                            headers={'Content-Type': 'application/json'},
+                            timeout=45
+                        ),
+                        range(concurrent)
+                    ))
+                after = self.get_metrics()
+                coalesced = after['llm']['coalescedCalls'] - before['llm']['coalescedCalls']
+                outputs = {r.text for r in responses if r.status_code == 200}
+
+                if all(r.status_code == 200 for r in responses) and len(outputs) == 1 and coalesced > 0:
+                    self.log_result('ai_agents', True, "Concurrent identical requests shared an LLM call", {
+                        'requests': concurrent,
+                        'coalesced_calls': coalesced
+                    })
+                else:
+                    self.log_result('ai_agents', False, "Concurrent identical requests were not coalesced", {
+                        'statuses': [r.status_code for r in responses],
+                        'distinct_outputs': len(outputs),
+                        'coalesced_calls': coalesced
+                    })
+
+        except Exception as e:
+            self.log_result('ai_agents', False, f"Error testing LLM call coalescing: {str(e)}")
+
         # Test improved error handling with invalid API key scenario
         print("\n--- Testing Improved Error Handling ---")
         try:
             # Test with missing fields to check error handling
             incomplete_request = {'agentId': 'resume'}  # Missing input and userId
             
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/ai-agents",
                 json=incomplete_request,
                 headers={'Content-Type': 'application/json'},
@@ -490,28 +773,66 @@ class BackendTester:
                 
         except Exception as e:
             self.log_result('ai_agents', False, f"Error testing improved error handling: {str(e)}")
-    
+
+        # Test write-behind - a run without userId must not hold back the batch it lands in
+        print("\n--- Testing Write-behind With Missing userId ---")
+        if self.skip_offline('write_behind'):
+            return
+        try:
+            before = self.get_metrics()
+            if before is None or before.get('persistence') is None:
+                print("Skipped: /api/metrics is not available (set METRICS_TOKEN)")
+                return
+
+            responses = [
+                self.session.post(
+                    f"{API_BASE}/ai-agents",
+                    json=payload,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=45
+                )
+                for payload in ({'agentId': 'resume', 'input': 'Poison batch check'}, AGENT_REQUESTS[0])
+            ]
+            persisted = sum(1 for r in responses if r.status_code == 200)
+
+            # The queue flushes every second by default
+            for _ in range(20):
+                time.sleep(0.5)
+                after = self.get_metrics()['persistence']
+                if after['queued'] == 0 and after['enqueued'] >= before['persistence']['enqueued'] + persisted:
+                    break
+
+            details = {key: after[key] for key in ('queued', 'written', 'failedBatches', 'deadLettered')}
+            if after['deadLettered'] > before['persistence']['deadLettered']:
+                self.log_result('ai_agents', False, "Agent run without userId was dead-lettered", details)
+            elif after['queued'] > 0:
+                self.log_result('ai_agents', False, "Write-behind queue did not drain", details)
+            else:
+                self.log_result('ai_agents', True, "Agent run without userId persisted with its batch", details)
+
+        except Exception as e:
+            self.log_result('ai_agents', False, f"Error testing write-behind: {str(e)}")
+
+    def get_metrics(self):
+        """Return /api/metrics, or None when the app doesn't expose it"""
+        token = os.getenv('METRICS_TOKEN')
+        response = self.session.get(
+            f"{API_BASE}/metrics",
+            headers={'Authorization': f"Bearer {token}"} if token else {},
+            timeout=10
+        )
+        return response.json() if response.status_code == 200 else None
+
     def test_workflows_endpoint(self):
         """Test the Workflows endpoint with better JSON parsing"""
         print("\n=== Testing Enhanced Workflows Endpoint ===")
         
         # Test both workflow types with more complex scenarios
-        test_workflows = [
-            {
-                'prompt': 'Create a workflow that sends a Slack notification when a new email arrives in Gmail, then creates a task in Asana',
-                'type': 'n8n',
-                'userId': 'test_user_123'
-            },
-            {
-                'prompt': 'Build an automation that creates a Trello card when a form is submitted on a website, then sends a welcome email',
-                'type': 'make',
-                'userId': 'test_user_123'
-            }
-        ]
+        test_workflows = WORKFLOW_REQUESTS
         
         for workflow_test in test_workflows:
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{API_BASE}/workflows",
                     json=workflow_test,
                     headers={'Content-Type': 'application/json'},
@@ -550,7 +871,7 @@ class BackendTester:
                                     expected_keys = ['name', 'nodes', 'connections']
                                     has_expected_structure = any(key in workflow for key in expected_keys)
                                 elif workflow_type == 'make':
-                                    expected_keys = ['name', 'modules', 'connections', 'routes']
+                                    expected_keys = ['name', 'flow', 'metadata']
                                     has_expected_structure = any(key in workflow for key in expected_keys)
                                 else:
                                     has_expected_structure = True
@@ -596,7 +917,7 @@ class BackendTester:
                 'userId': 'test_user_123'
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/workflows",
                 json=edge_case_test,
                 headers={'Content-Type': 'application/json'},
@@ -621,6 +942,98 @@ class BackendTester:
                 
         except Exception as e:
             self.log_result('workflows', False, f"Error testing better JSON parsing: {str(e)}")
+
+        # Test job mode - submit returns a job at once, polling follows it to completion
+        print("\n--- Testing Workflow Jobs ---")
+        try:
+            # A fresh prompt, so the job is generated rather than served from the store
+            job_request = {
+                'prompt': f"Post a Discord message for each new Stripe payment (run {int(time.time())})",
+                'type': 'n8n',
+                'userId': 'test_user_123',
+                'mode': 'job'
+            }
+            response = self.session.post(
+                f"{API_BASE}/workflows",
+                json=job_request,
+                headers={'Content-Type': 'application/json'},
+                timeout=30
+            )
+            data = response.json()
+
+            if response.status_code == 202 and data.get('job', {}).get('status') in ('queued', 'running'):
+                self.log_result('workflows', True, "Job submitted with 202", {'job_id': data['job']['id']})
+                job, statuses = self.poll_job(data['statusUrl'])
+                if job.get('status') == 'completed' and isinstance(job.get('result'), dict):
+                    self.log_result('workflows', True, "Polled job completed with a workflow", {'statuses': statuses})
+                else:
+                    self.log_result('workflows', False, "Polled job did not complete", {'statuses': statuses, 'job': job})
+            else:
+                self.log_result('workflows', False, f"Job submit returned {response.status_code}", {'response': data})
+
+        except Exception as e:
+            self.log_result('workflows', False, f"Error testing workflow jobs: {str(e)}")
+
+        # Test invalid output - the streaming parser rejects a bad node as soon as it
+        # closes, and job mode asks the model to repair it. Only the mock and replay
+        # providers act on the marker; other providers are skipped below.
+        print("\n--- Testing Invalid Workflow Output ---")
+        try:
+            invalid_request = {
+                'prompt': f"Sync new Airtable rows to Notion {replay_server.INVALID_WORKFLOW_MARKER} (run {int(time.time())})",
+                'type': 'n8n',
+                'userId': 'test_user_123'
+            }
+            response = self.session.post(
+                f"{API_BASE}/workflows",
+                json=invalid_request,
+                headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'},
+                stream=True,
+                timeout=60
+            )
+            events = self.read_event_stream(response)
+            done = [data['workflow'] for event, data in events if event == 'done']
+            workflow = done[0] if done else {}
+
+            if done and 'error' not in workflow:
+                print("Skipped: the LLM provider ignores the invalid-workflow marker (use LLM_PROVIDER=mock or --replay)")
+            elif workflow.get('details') and 'Unreached' not in workflow.get('raw_response', 'Unreached'):
+                self.log_result('workflows', True, "Invalid workflow rejected before the output ended", {
+                    'details': workflow['details'],
+                    'chars_read': len(workflow['raw_response'])
+                })
+
+                response = self.session.post(
+                    f"{API_BASE}/workflows",
+                    json={**invalid_request, 'mode': 'job'},
+                    headers={'Content-Type': 'application/json'},
+                    timeout=30
+                )
+                job, statuses = self.poll_job(response.json()['statusUrl'])
+                if job.get('status') == 'completed' and job.get('progress', {}).get('attempt') == 2:
+                    self.log_result('workflows', True, "Job repaired the invalid workflow on the second attempt")
+                else:
+                    self.log_result('workflows', False, "Job did not repair the invalid workflow", {'statuses': statuses, 'job': job})
+            else:
+                self.log_result('workflows', False, "Invalid workflow was not rejected early", {
+                    'events': [event for event, _ in events],
+                    'workflow': workflow
+                })
+
+        except Exception as e:
+            self.log_result('workflows', False, f"Error testing invalid workflow output: {str(e)}")
+
+    def poll_job(self, status_url, timeout_s=90):
+        """Poll a workflow job until it finishes; return the last job view and the statuses seen"""
+        statuses = []
+        deadline = time.time() + timeout_s
+        while True:
+            job = self.session.get(f"{BASE_URL}{status_url}", timeout=10).json().get('job', {})
+            if not statuses or statuses[-1] != job.get('status'):
+                statuses.append(job.get('status'))
+            if job.get('status') in ('completed', 'failed') or time.time() > deadline:
+                return job, statuses
+            time.sleep(0.5)
     
     def test_error_handling(self):
         """Test error handling for various scenarios"""
@@ -628,7 +1041,7 @@ class BackendTester:
         
         # Test invalid endpoints
         try:
-            response = requests.get(f"{API_BASE}/invalid-endpoint")
+            response = self.session.get(f"{API_BASE}/invalid-endpoint")
             if response.status_code == 404:
                 self.log_result('error_handling', True, "Invalid endpoint returns 404")
             else:
@@ -636,19 +1049,23 @@ class BackendTester:
         except Exception as e:
             self.log_result('error_handling', False, f"Error testing invalid endpoint: {str(e)}")
         
-        # Test invalid HTTP methods
-        try:
-            response = requests.put(f"{API_BASE}/ai-tools")
-            if response.status_code == 405:
-                self.log_result('error_handling', True, "PUT method returns 405 Method Not Allowed")
-            else:
-                self.log_result('error_handling', False, f"PUT method returned {response.status_code} instead of 405")
-        except Exception as e:
-            self.log_result('error_handling', False, f"Error testing PUT method: {str(e)}")
+        # Test invalid HTTP methods - the router answers 405 with the methods the path supports
+        for method, path, allowed in [('PUT', '/ai-tools', 'GET'), ('GET', '/workflows', 'POST'), ('DELETE', '/chatbots/test', 'POST')]:
+            try:
+                response = self.session.request(method, f"{API_BASE}{path}", timeout=10)
+                allow = response.headers.get('Allow', '')
+                if response.status_code == 405 and allowed in [m.strip() for m in allow.split(',')]:
+                    self.log_result('error_handling', True, f"{method} {path} returns 405 with Allow: {allow}")
+                elif response.status_code == 405:
+                    self.log_result('error_handling', False, f"{method} {path} returned 405 without {allowed} in Allow", {'allow': allow})
+                else:
+                    self.log_result('error_handling', False, f"{method} {path} returned {response.status_code} instead of 405")
+            except Exception as e:
+                self.log_result('error_handling', False, f"Error testing {method} {path}: {str(e)}")
         
         # Test malformed JSON for POST endpoints
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/ai-agents",
                 data="invalid json",
                 headers={'Content-Type': 'application/json'}
@@ -662,7 +1079,7 @@ class BackendTester:
         
         # Test missing required fields
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{API_BASE}/ai-agents",
                 json={'agentId': 'resume'},  # Missing input and userId
                 headers={'Content-Type': 'application/json'}
@@ -681,25 +1098,169 @@ class BackendTester:
         except Exception as e:
             self.log_result('error_handling', False, f"Error testing missing fields: {str(e)}")
     
-    def run_all_tests(self):
+    def diagnose_env_loading(self):
+        """Check the API route picks up the Groq key from the environment"""
+        print("=== Testing Environment Variable Loading ===")
+        
+        test_payload = {
+            'agentId': 'resume',
+            'input': 'test input',
+            'userId': 'debug_user'
+        }
+        
+        try:
+            response = self.session.post(
+                f"{API_BASE}/ai-agents",
+                json=test_payload,
+                headers={'Content-Type': 'application/json'},
+                timeout=30
+            )
+            
+            print(f"Status Code: {response.status_code}")
+            print(f"Response: {response.text}")
+            
+            if response.status_code == 500:
+                error_msg = response.json().get('error', '')
+                
+                if 'Invalid API Key' in error_msg:
+                    print("❌ Groq API key is not being loaded correctly in the API route")
+                elif 'PERMISSION_DENIED' in error_msg:
+                    print("❌ Firebase permissions issue")
+                else:
+                    print(f"❌ Other error: {error_msg}")
+            
+        except Exception as e:
+            print(f"Error: {e}")
+    
+    def diagnose_direct_groq(self):
+        """Call Groq directly with the key from .env"""
+        print("\n=== Testing Direct Groq API Call ===")
+        
+        api_key = os.environ.get('GROQ_API_KEY')
+        if not api_key:
+            try:
+                with open(ENV_FILE, 'r') as f:
+                    env_content = f.read()
+            except OSError:
+                print(f"❌ {ENV_FILE} not found")
+                return
+            
+            for line in env_content.split('\n'):
+                if line.startswith('GROQ_API_KEY='):
+                    api_key = line.split('=', 1)[1]
+                    break
+        
+        if not api_key:
+            print("❌ GROQ_API_KEY not found in .env")
+            return
+        
+        print(f"Using API key: {api_key[:20]}...")
+        
+        try:
+            response = self.session.post(
+                GROQ_API_URL,
+                headers={
+                    'Authorization': f'Bearer {api_key}',
+                    'Content-Type': 'application/json'
+                },
+                json={
+                    'messages': [{'role': 'user', 'content': 'Hello, test message'}],
+                    'model': 'llama3-70b-8192',
+                    'max_tokens': 50
+                },
+                timeout=30
+            )
+            
+            print(f"Direct Groq API Status: {response.status_code}")
+            if response.status_code == 200:
+                print("✅ Direct Groq API call successful")
+            else:
+                print(f"❌ Direct Groq API failed: {response.text}")
+                
+        except Exception as e:
+            print(f"❌ Direct Groq API error: {e}")
+    
+    def diagnose_core_apis(self):
+        """Call the agent and workflow endpoints and explain any 500s"""
+        checks = [
+            ('AI Agents', '/ai-agents', AGENT_REQUESTS[0], 45),
+            ('Workflows', '/workflows', WORKFLOW_REQUESTS[0], 60)
+        ]
+        
+        for name, path, payload, timeout in checks:
+            print(f"\n=== Testing {name} Core Functionality ===")
+            try:
+                response = self.session.post(
+                    f"{API_BASE}{path}",
+                    json=payload,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=timeout
+                )
+                
+                print(f"Status: {response.status_code}")
+                print(f"Response: {response.text}")
+                
+                if response.status_code == 500:
+                    error_msg = response.json().get('error', '')
+                    
+                    if 'PERMISSION_DENIED' in error_msg:
+                        print("❌ Firebase permission issue - this is expected")
+                        print("✅ But Groq API integration appears to be working (no API key errors)")
+                    elif 'Invalid API Key' in error_msg:
+                        print("❌ Groq API key issue")
+                    else:
+                        print(f"❌ Other error: {error_msg}")
+                
+            except Exception as e:
+                print(f"Error: {e}")
+    
+    def run_groups(self, groups):
+        """Run each group of test methods in order, groups concurrently.
+
+        Output is printed group by group in the order given, whatever order the
+        groups finish in.
+        """
+        output = ThreadOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as pool:
+                futures = [
+                    pool.submit(output.capture, lambda group=group: [test() for test in group])
+                    for group in groups
+                ]
+                for future in futures:
+                    output.stream.write(future.result())
+                    output.stream.flush()
+        finally:
+            sys.stdout = output.stream
+    
+    def run_all_tests(self, diagnostics=False):
         """Run all backend tests"""
         print(f"Starting Enhanced HappyAxzora Backend API Tests")
         print(f"Base URL: {BASE_URL}")
         print(f"API Base: {API_BASE}")
         print("=" * 60)
         
-        # Run all test categories
-        self.test_environment_variables()
-        self.test_ai_tools_endpoint()
-        self.test_ai_agents_endpoint()
-        self.test_workflows_endpoint()
-        self.test_chatbot_create_endpoint()
-        self.test_chatbot_list_endpoint()
-        self.test_chatbot_test_endpoint()
-        self.test_error_handling()
+        # Categories are independent except the chatbot ones, which list and
+        # chat with the bot created first
+        groups = [
+            [self.test_environment_variables],
+            [self.test_ai_tools_endpoint],
+            [self.test_ai_agents_endpoint],
+            [self.test_workflows_endpoint],
+            [self.test_chatbot_create_endpoint, self.test_chatbot_list_endpoint, self.test_chatbot_test_endpoint],
+            [self.test_error_handling]
+        ]
+        if diagnostics:
+            groups.append([self.diagnose_env_loading, self.diagnose_direct_groq])
+            groups.append([self.diagnose_core_apis])
+        
+        start = time.perf_counter()
+        self.run_groups(groups)
+        print(f"\nCompleted in {time.perf_counter() - start:.1f}s with {self.workers} workers")
         
         # Print summary
-        self.print_summary()
+        return self.print_summary()
     
     def print_summary(self):
         """Print test summary"""
@@ -712,7 +1273,7 @@ class BackendTester:
         failed_categories = sum(1 for result in self.results.values() if result['status'] == 'failed')
         
         for category, result in self.results.items():
-            status_icon = "✅" if result['status'] == 'success' else "❌" if result['status'] == 'failed' else "⏳"
+            status_icon = {'success': "✅", 'failed': "❌", 'skipped': "⏭️ "}.get(result['status'], "⏳")
             print(f"{status_icon} {category.upper()}: {result['status']}")
             
             # Show failed tests
@@ -721,7 +1282,9 @@ class BackendTester:
                 for failed_test in failed_tests[:3]:  # Show first 3 failures
                     print(f"    - {failed_test['message']}")
         
-        print(f"\nOverall: {passed_categories}/{total_categories} categories passed")
+        skipped_categories = sum(1 for result in self.results.values() if result['status'] == 'skipped')
+        skipped = f" ({skipped_categories} skipped)" if skipped_categories else ''
+        print(f"\nOverall: {passed_categories}/{total_categories} categories passed{skipped}")
         
         # Determine overall status
         if failed_categories == 0:
@@ -731,10 +1294,58 @@ class BackendTester:
             print(f"⚠️  {failed_categories} categories FAILED")
             return False
 
+def use_replay(args):
+    """Start the upstream stand-in and an app pointed at it; return the app process"""
+    global BASE_URL, API_BASE, GROQ_API_URL
+    
+    server = replay_server.start_server(
+        latency_ms=replay_server.parse_latency(args.latency),
+        chunk_delay_ms=args.chunk_delay_ms
+    )
+    GROQ_API_URL = f"{server.url}/groq/openai/v1/chat/completions"
+    os.environ['GROQ_API_KEY'] = replay_server.app_environment(server)['GROQ_API_KEY']
+    print(f"Replaying upstream APIs from {server.url}")
+    
+    if args.base_url:
+        print("Make sure the app was started with:")
+        for name, value in replay_server.app_environment(server).items():
+            print(f"    {name}={value}")
+        BASE_URL = args.base_url
+        app = None
+    else:
+        print(f"Starting app: {args.app_command}")
+        # One client IP sends every request, so rate limits would only get in the way.
+        # Every request is traced so the Server-Timing check runs.
+        app, BASE_URL = replay_server.launch_app(server, args.app_command, extra_env={
+            'RATE_LIMIT_USER_PER_MIN': '0',
+            'RATE_LIMIT_CHATBOT_PER_MIN': '0',
+            'RATE_LIMIT_IP_PER_MIN': '0',
+            'TRACE_SAMPLE_RATE': '1'
+        })
+    
+    API_BASE = f"{BASE_URL}/api"
+    return app
+
 def main():
     """Main test execution"""
-    tester = BackendTester()
-    success = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Test groups to run at once (1 = sequential)')
+    parser.add_argument('--diagnostics', action='store_true', help='Also run the environment and core API diagnostics')
+    parser.add_argument('--replay', action='store_true', help='Serve Groq and Product Hunt from replay_server.py fixtures')
+    parser.add_argument('--app-command', default=os.getenv('REPLAY_APP_COMMAND', replay_server.DEFAULT_APP_COMMAND),
+                        help='Command that starts the app in --replay mode ({port} is filled in)')
+    parser.add_argument('--base-url', help='With --replay, use an app that is already running here instead of starting one')
+    parser.add_argument('--latency', action='append', metavar='SERVICE=MS', help='With --replay, upstream delay before the first byte')
+    parser.add_argument('--chunk-delay-ms', type=float, default=0, help='With --replay, delay between streamed chunks')
+    args = parser.parse_args()
+    
+    app = use_replay(args) if args.replay else None
+    try:
+        tester = BackendTester(workers=args.workers, offline=args.replay)
+        success = tester.run_all_tests(diagnostics=args.diagnostics)
+    finally:
+        if app:
+            replay_server.stop_app(app)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+HappyAxzora Backend Benchmark
+Drives the endpoints defined in backend_test.py with configurable concurrency
+and request rate, records latency percentiles, throughput and error rates, and
+compares the run against a stored baseline.
+
+Examples:
+    python benchmark.py --concurrency 20 --requests 200
+    python benchmark.py --rate 50 --duration 30 --endpoints ai_agents,chatbot_test
+    python benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmark.py --baseline benchmarks/baseline.json --tolerance 0.15
+
+Requests are spread over --users userIds, so the per-user limits don't cap a
+run. They all come from one IP, and chat turns count against one chatbot, so
+start the app with RATE_LIMIT_IP_PER_MIN=0 and RATE_LIMIT_CHATBOT_PER_MIN=0
+(and TOKEN_BUDGET_CHATBOT_PER_HOUR=0 for long chat runs), or the report
+measures 429s instead of latency.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+from backend_test import API_BASE, BASE_URL, ENDPOINTS
+
+DEFAULT_REPORT = 'benchmark_report.json'
+DEFAULT_USERS = 100
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.errors = 0
+        self.status_codes = {}
+
+    def record(self, latency_ms, status):
+        self.latencies_ms.append(latency_ms)
+        self.status_codes[str(status)] = self.status_codes.get(str(status), 0) + 1
+        if status == 'error' or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed_s):
+        latencies = sorted(self.latencies_ms)
+        count = len(latencies)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0,
+            'throughput_rps': round(count / elapsed_s, 2) if elapsed_s else 0,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 2) if count else None,
+                'p95': round(percentile(latencies, 95), 2) if count else None,
+                'p99': round(percentile(latencies, 99), 2) if count else None,
+                'mean': round(sum(latencies) / count, 2) if count else None,
+                'max': round(latencies[-1], 2) if count else None
+            },
+            'status_codes': self.status_codes
+        }
+
+
+class Benchmark:
+    def __init__(self, endpoints, concurrency, rate=None, requests_per_endpoint=None, duration_s=None, timeout_s=60,
+                 users=DEFAULT_USERS):
+        self.endpoints = endpoints
+        self.concurrency = concurrency
+        self.rate = rate
+        self.requests_per_endpoint = requests_per_endpoint
+        self.duration_s = duration_s
+        self.timeout_s = timeout_s
+        self.users = users
+        self.stats = {name: EndpointStats() for name in endpoints}
+
+    def with_user(self, payload, index):
+        """Payload with its userId replaced by one of `users` benchmark users"""
+        if not payload or 'userId' not in payload:
+            return payload
+        return {**payload, 'userId': f"bench_user_{index % self.users}"}
+
+    def request_plan(self):
+        """Yield (endpoint, method, url, payload), round-robin across endpoints and payloads"""
+        cycles = {
+            name: itertools.cycle(ENDPOINTS[name][2])
+            for name in self.endpoints
+        }
+        for index in itertools.count():
+            if self.requests_per_endpoint and index >= self.requests_per_endpoint * len(self.endpoints):
+                return
+            name = self.endpoints[index % len(self.endpoints)]
+            method, path, _ = ENDPOINTS[name]
+            yield name, method, f"{API_BASE}{path}", self.with_user(next(cycles[name]), index)
+
+    async def send(self, session, name, method, url, payload):
+        start = time.perf_counter()
+        try:
+            async with session.request(method, url, json=payload) as response:
+                await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = 'error'
+        self.stats[name].record((time.perf_counter() - start) * 1000, status)
+
+    async def run(self):
+        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
+        # One keep-alive connection pool sized to the concurrency limit
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def worker(item, acquired):
+                if not acquired:
+                    await semaphore.acquire()
+                try:
+                    await self.send(session, *item)
+                finally:
+                    semaphore.release()
+
+            start = time.perf_counter()
+            for index, item in enumerate(self.request_plan()):
+                now = time.perf_counter() - start
+                if self.duration_s and now >= self.duration_s:
+                    break
+
+                if self.rate:
+                    # Open loop: schedule request N at start + N / rate regardless of latency
+                    delay = index / self.rate - now
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    # Closed loop: wait for a free slot before issuing more work
+                    await semaphore.acquire()
+
+                task = asyncio.create_task(worker(item, acquired=not self.rate))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+            elapsed = time.perf_counter() - start
+
+        return self.report(elapsed)
+
+    def report(self, elapsed_s):
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'base_url': BASE_URL,
+            'config': {
+                'concurrency': self.concurrency,
+                'rate': self.rate,
+                'requests_per_endpoint': self.requests_per_endpoint,
+                'duration_s': self.duration_s,
+                'users': self.users
+            },
+            'elapsed_s': round(elapsed_s, 3),
+            'endpoints': {
+                name: stats.summary(elapsed_s)
+                for name, stats in self.stats.items()
+            }
+        }
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Return a list of regression messages (empty when the run is within tolerance)"""
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not current['requests']:
+            continue
+
+        for pct in ('p50', 'p95', 'p99'):
+            was, now = previous['latency_ms'].get(pct), current['latency_ms'].get(pct)
+            if was and now and now > was * (1 + tolerance):
+                regressions.append(f"{name}: {pct} latency {now}ms > baseline {was}ms (+{tolerance:.0%} allowed)")
+
+        if current['error_rate'] > previous['error_rate'] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']:.2%} > baseline {previous['error_rate']:.2%}")
+
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_rps']} rps < baseline {previous['throughput_rps']} rps")
+
+    return regressions
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<16}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    print("-" * 70)
+    for name, summary in report['endpoints'].items():
+        latency = summary['latency_ms']
+        print(
+            f"{name:<16}{summary['requests']:>7}{summary['error_rate'] * 100:>7.1f}%"
+            f"{summary['throughput_rps']:>9}{latency['p50'] or '-':>10}{latency['p95'] or '-':>10}{latency['p99'] or '-':>10}"
+        )
+    print(f"\nElapsed: {report['elapsed_s']}s")
+
+    limited = sum(summary['status_codes'].get('429', 0) for summary in report['endpoints'].values())
+    if limited:
+        print(f"⚠️  {limited} requests were rate limited (429); see the note in --help about limits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='Comma-separated endpoint categories')
+    parser.add_argument('--concurrency', type=int, default=10, help='Maximum requests in flight')
+    parser.add_argument('--rate', type=float, help='Target requests per second (open loop)')
+    parser.add_argument('--requests', type=int, help='Requests per endpoint (default 20 unless --duration is set)')
+    parser.add_argument('--duration', type=float, help='Stop issuing requests after this many seconds')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help='Distinct userIds to spread requests over')
+    parser.add_argument('--output', default=DEFAULT_REPORT, help='Where to write the JSON report')
+    parser.add_argument('--baseline', help='Baseline report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative regression (0.10 = 10%%)')
+    parser.add_argument('--save-baseline', help='Also write this run as the new baseline')
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)} (choose from {', '.join(ENDPOINTS)})")
+
+    requests_per_endpoint = args.requests or (None if args.duration else 20)
+
+    print(f"Benchmarking {API_BASE} ({', '.join(endpoints)})")
+    benchmark = Benchmark(
+        endpoints,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        requests_per_endpoint=requests_per_endpoint,
+        duration_s=args.duration,
+        timeout_s=args.timeout,
+        users=max(args.users, 1)
+    )
+    report = asyncio.run(benchmark.run())
+    print_report(report)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or '.', exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != report['config']:
+            print(f"Note: baseline was recorded with {baseline.get('config')}, this run used {report['config']}")
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"    - {regression}")
+            sys.exit(1)
+        print(f"\n🎉 No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import { Button } from '@/components/ui/button'
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
+import { Badge } from '@/components/ui/badge'
+import { TrendingUp, ExternalLink, Heart, Flame, Calendar, Database } from 'lucide-react'
+
+// Tool cards and recency sections for the home page. These have no client
+// state, so the server renders them and the search island reuses them for
+// its results.
+//
+// Cards have a fixed height (long names and descriptions are clipped), so the
+// virtualized grid can position rows without measuring them.
+
+export const CARD_HEIGHT = 176
+export const CARD_GAP = 24
+
+export const TOOL_SECTIONS = [
+  {
+    key: 'today',
+    title: "Today's Latest",
+    icon: Flame,
+    iconClassName: 'text-red-500',
+    countClassName: 'bg-red-100 text-red-700',
+    cardClassName: 'hover:border-orange-300',
+    titleClassName: 'hover:text-orange-600',
+    votesClassName: 'bg-orange-100 text-orange-700',
+    buttonClassName: 'bg-orange-500 hover:bg-orange-600'
+  },
+  {
+    key: 'thisWeek',
+    title: 'This Week',
+    icon: Calendar,
+    iconClassName: 'text-blue-500',
+    countClassName: 'bg-blue-100 text-blue-700',
+    cardClassName: 'hover:border-blue-300',
+    titleClassName: 'hover:text-blue-600',
+    votesClassName: 'bg-blue-100 text-blue-700',
+    buttonClassName: 'bg-blue-500 hover:bg-blue-600'
+  },
+  {
+    key: 'older',
+    title: 'Previous Tools',
+    icon: Database,
+    iconClassName: 'text-gray-500',
+    countClassName: 'bg-gray-100 text-gray-700',
+    cardClassName: 'hover:border-gray-300',
+    titleClassName: 'hover:text-gray-600',
+    votesClassName: 'bg-gray-100 text-gray-700',
+    buttonClassName: 'bg-gray-500 hover:bg-gray-600'
+  }
+]
+
+export function AiToolCard({ tool, section }) {
+  return (
+    <Card
+      className={`bg-white border border-gray-200 ${section.cardClassName} hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1 rounded-xl overflow-hidden`}
+      style={{ height: CARD_HEIGHT }}
+    >
+      <CardHeader className="pb-3">
+        <div className="flex items-start justify-between">
+          <div className="flex-1 min-w-0">
+            <CardTitle className={`text-lg text-gray-900 font-bold mb-1 truncate ${section.titleClassName} transition-colors`}>
+              {tool.name}
+            </CardTitle>
+            <CardDescription className="text-gray-600 text-sm line-clamp-2">
+              {tool.description}
+            </CardDescription>
+          </div>
+          <div className="flex items-center space-x-2 ml-4">
+            <Badge className={`${section.votesClassName} flex items-center space-x-1`}>
+              <TrendingUp className="h-3 w-3" />
+              <span>{tool.votes || 0}</span>
+            </Badge>
+          </div>
+        </div>
+      </CardHeader>
+      <CardContent>
+        <div className="flex items-center justify-between">
+          <Button size="sm" asChild className={`${section.buttonClassName} text-white rounded-lg`}>
+            <a href={tool.url} target="_blank" rel="noopener noreferrer">
+              <ExternalLink className="h-4 w-4 mr-2" />
+              Visit
+            </a>
+          </Button>
+          <Button variant="ghost" size="sm" className="text-gray-500 hover:text-red-500">
+            <Heart className="h-4 w-4" />
+          </Button>
+        </div>
+      </CardContent>
+    </Card>
+  )
+}
+
+export function AiToolSectionHeader({ section, count }) {
+  const Icon = section.icon
+  return (
+    <div className="flex items-center mb-6">
+      <Icon className={`h-6 w-6 ${section.iconClassName} mr-2`} />
+      <h3 className="text-2xl font-bold text-gray-900">{section.title}</h3>
+      <Badge className={`ml-3 ${section.countClassName}`}>
+        {count}
+      </Badge>
+    </div>
+  )
+}
+
+// `count` is the section's full size when only some of its tools are shown
+export function AiToolSection({ section, tools, count = tools.length }) {
+  return (
+    <div>
+      <AiToolSectionHeader section={section} count={count} />
+      <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+        {tools.map(tool => (
+          <AiToolCard key={tool.id} tool={tool} section={section} />
+        ))}
+      </div>
+    </div>
+  )
+}
+
+// Sections with at least one tool, in display order. `counts` gives the full
+// section sizes for a partial listing.
+export function AiToolSections({ groups, counts = null }) {
+  return (
+    <div className="space-y-8">
+      {TOOL_SECTIONS.filter(section => groups[section.key].length > 0).map(section => (
+        <AiToolSection
+          key={section.key}
+          section={section}
+          tools={groups[section.key]}
+          count={counts ? counts[section.key] : undefined}
+        />
+      ))}
+    </div>
+  )
+}
@@ -0,0 +1,77 @@
+'use client'
+
+import { useEffect, useMemo, useState } from 'react'
+import { Input } from '@/components/ui/input'
+import { Search } from 'lucide-react'
+import { TOOL_SECTIONS } from '@/components/ai-tool-card'
+import VirtualToolGrid from '@/components/virtual-tool-grid'
+import { useDebouncedValue } from '@/hooks/use-debounced-value'
+import { buildToolSearchIndex, searchTools } from '@/lib/tool-search'
+
+const SEARCH_DEBOUNCE_MS = 150
+
+// The home page's only interactive part. The server renders a preview of the
+// listing as `children`; once hydrated, the full `groups` are shown in a
+// virtualized grid, filtered through a search index built once per listing.
+export default function AiToolsSearch({ groups, children }) {
+  const [searchTerm, setSearchTerm] = useState('')
+  const [mounted, setMounted] = useState(false)
+  const query = useDebouncedValue(searchTerm, SEARCH_DEBOUNCE_MS)
+
+  useEffect(() => setMounted(true), [])
+
+  // All tools in display order, with the section each belongs to
+  const listing = useMemo(() => {
+    const tools = []
+    const sectionOf = []
+    for (const [s, section] of TOOL_SECTIONS.entries()) {
+      for (const tool of groups[section.key]) {
+        tools.push(tool)
+        sectionOf.push(s)
+      }
+    }
+    return { tools, sectionOf }
+  }, [groups])
+
+  const index = useMemo(() => buildToolSearchIndex(listing.tools), [listing])
+
+  const sections = useMemo(() => {
+    const positions = searchTools(index, query)
+    const buckets = TOOL_SECTIONS.map(() => [])
+    if (positions) {
+      for (const position of positions) {
+        buckets[listing.sectionOf[position]].push(listing.tools[position])
+      }
+    } else {
+      for (const [position, tool] of listing.tools.entries()) {
+        buckets[listing.sectionOf[position]].push(tool)
+      }
+    }
+    return TOOL_SECTIONS
+      .map((section, s) => ({ section, tools: buckets[s], count: buckets[s].length }))
+      .filter(entry => entry.count > 0)
+  }, [index, listing, query])
+
+  return (
+    <>
+      {/* Search Bar */}
+      <div className="bg-white rounded-2xl shadow-sm border border-gray-200 p-6">
+        <div className="relative max-w-2xl mx-auto">
+          <Search className="absolute left-4 top-4 h-5 w-5 text-gray-400" />
+          <Input
+            placeholder="Search AI tools..."
+            value={searchTerm}
+            onChange={(e) => setSearchTerm(e.target.value)}
+            className="pl-12 h-12 border-gray-200 focus:border-orange-500 focus:ring-orange-500 rounded-xl"
+          />
+        </div>
+      </div>
+
+      {!mounted ? children : sections.length > 0 ? (
+        <VirtualToolGrid sections={sections} />
+      ) : (
+        <p className="text-center text-gray-500 py-12">No AI tools match your search.</p>
+      )}
+    </>
+  )
+}
@@ -1,36 +1,71 @@
 'use client'
 
-import { createContext, useContext, useEffect, useState } from 'react'
-import { auth } from '@/lib/firebase'
-import { onAuthStateChanged } from 'firebase/auth'
+import { createContext, useCallback, useContext, useEffect, useMemo, useState } from 'react'
+import { getFirebaseAnalytics, getFirebaseAuth } from '@/lib/firebase'
 
 const AuthContext = createContext({})
 
+// Starts the provider's auth listener on first use, so Firebase Auth and
+// Analytics are only downloaded on pages that render auth UI
 export const useAuth = () => {
-  return useContext(AuthContext)
+  const context = useContext(AuthContext)
+  const { start } = context
+
+  useEffect(() => {
+    start?.()
+  }, [start])
+
+  return context
 }
 
+// Children render right away, before auth state is known. `loading` stays
+// true until the first auth state arrives after a component calls useAuth.
 export default function AuthProvider({ children }) {
   const [user, setUser] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [started, setStarted] = useState(false)
+
+  const start = useCallback(() => setStarted(true), [])
 
   useEffect(() => {
-    const unsubscribe = onAuthStateChanged(auth, (user) => {
-      setUser(user)
-      setLoading(false)
-    })
+    if (!started) {
+      return
+    }
+    let unsubscribe = () => {}
+    let cancelled = false
 
-    return unsubscribe
-  }, [])
+    Promise.all([getFirebaseAuth(), import('firebase/auth')])
+      .then(([auth, { onAuthStateChanged }]) => {
+        if (cancelled) {
+          return
+        }
+        unsubscribe = onAuthStateChanged(auth, (user) => {
+          setUser(user)
+          setLoading(false)
+        })
+      })
+      .catch((error) => {
+        console.error('Failed to load Firebase Auth:', error)
+        setLoading(false)
+      })
 
-  const value = {
+    getFirebaseAnalytics().catch(() => {})
+
+    return () => {
+      cancelled = true
+      unsubscribe()
+    }
+  }, [started])
+
+  const value = useMemo(() => ({
     user,
-    loading
-  }
+    loading,
+    start
+  }), [user, loading, start])
 
   return (
     <AuthContext.Provider value={value}>
-      {!loading && children}
+      {children}
     </AuthContext.Provider>
   )
-}
\ No newline at end of file
+}
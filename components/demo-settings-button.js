@@ -0,0 +1,17 @@
+'use client'
+
+import { Button } from '@/components/ui/button'
+import { toast } from 'sonner'
+import { Settings } from 'lucide-react'
+
+export default function DemoSettingsButton() {
+  const handleSignOut = async () => {
+    toast.success('Demo mode - authentication disabled')
+  }
+
+  return (
+    <Button variant="ghost" size="sm" onClick={handleSignOut} className="text-gray-500 hover:text-gray-700">
+      <Settings className="h-4 w-4" />
+    </Button>
+  )
+}
@@ -1,8 +1,8 @@
 'use client'
 
 import { useState, useEffect } from 'react'
-import { auth } from '@/lib/firebase'
-import { RecaptchaVerifier, signInWithPhoneNumber, PhoneAuthProvider, signInWithCredential } from 'firebase/auth'
+import { getFirebaseAuth } from '@/lib/firebase'
+import { useAuth } from '@/components/auth-provider'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -10,7 +10,14 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { toast } from 'sonner'
 import { Phone, MessageSquare } from 'lucide-react'
 
+// The auth instance and the Auth SDK, loaded when the form mounts
+function loadAuth() {
+  return Promise.all([getFirebaseAuth(), import('firebase/auth')])
+}
+
 export default function PhoneAuth() {
+  // Mounting the form starts the auth listener and Analytics
+  useAuth()
   const [phoneNumber, setPhoneNumber] = useState('')
   const [verificationCode, setVerificationCode] = useState('')
   const [verificationId, setVerificationId] = useState('')
@@ -19,9 +26,15 @@ export default function PhoneAuth() {
   const [recaptchaVerifier, setRecaptchaVerifier] = useState(null)
 
   useEffect(() => {
+    let cancelled = false
+
     // Initialize reCAPTCHA
-    const setupRecaptcha = () => {
+    const setupRecaptcha = async () => {
       if (!recaptchaVerifier) {
+        const [auth, { RecaptchaVerifier }] = await loadAuth()
+        if (cancelled) {
+          return
+        }
         const verifier = new RecaptchaVerifier(auth, 'recaptcha-container', {
           size: 'normal',
           callback: (response) => {
@@ -35,9 +48,12 @@ export default function PhoneAuth() {
       }
     }
 
-    setupRecaptcha()
+    setupRecaptcha().catch((error) => {
+      console.error('Error loading Firebase Auth:', error)
+    })
     
     return () => {
+      cancelled = true
       if (recaptchaVerifier) {
         recaptchaVerifier.clear()
       }
@@ -54,6 +70,7 @@ export default function PhoneAuth() {
     try {
       const formattedNumber = phoneNumber.startsWith('+') ? phoneNumber : `+${phoneNumber}`
       
+      const [auth, { signInWithPhoneNumber }] = await loadAuth()
       const confirmationResult = await signInWithPhoneNumber(auth, formattedNumber, recaptchaVerifier)
       setVerificationId(confirmationResult.verificationId)
       setShowVerification(true)
@@ -80,6 +97,7 @@ export default function PhoneAuth() {
 
     setLoading(true)
     try {
+      const [auth, { PhoneAuthProvider, signInWithCredential }] = await loadAuth()
       const credential = PhoneAuthProvider.credential(verificationId, verificationCode)
       await signInWithCredential(auth, credential)
       toast.success('Phone number verified successfully!')
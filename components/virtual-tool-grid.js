@@ -0,0 +1,135 @@
+'use client'
+
+import { memo, useEffect, useMemo, useRef, useState } from 'react'
+import { AiToolCard, AiToolSectionHeader, CARD_HEIGHT, CARD_GAP } from '@/components/ai-tool-card'
+
+// Window-scrolled, virtualized grid of tool sections.
+//
+// Sections are laid out as rows of fixed height (a section header, or up to
+// `columns` cards), so every row's offset is known without measuring. Only
+// the rows within the viewport plus an overscan margin are mounted, and the
+// visible range is recomputed at most once per animation frame while
+// scrolling.
+
+// Section header plus its bottom margin, and the gap between sections
+const HEADER_HEIGHT = 56
+const SECTION_GAP = 32
+const OVERSCAN_PX = 600
+// Rows rendered before the first scroll measurement
+const INITIAL_ROWS = 8
+
+// Tailwind's md and lg breakpoints, matching grid-cols-1 md:grid-cols-2 lg:grid-cols-3
+function columnsFor(width) {
+  return width >= 1024 ? 3 : width >= 768 ? 2 : 1
+}
+
+function useColumns() {
+  const [columns, setColumns] = useState(1)
+
+  useEffect(() => {
+    const onResize = () => setColumns(columnsFor(window.innerWidth))
+    onResize()
+    window.addEventListener('resize', onResize)
+    return () => window.removeEventListener('resize', onResize)
+  }, [])
+
+  return columns
+}
+
+function layoutRows(sections, columns) {
+  const rows = []
+  let top = 0
+
+  for (const [s, { section, tools, count }] of sections.entries()) {
+    if (s > 0) {
+      top += SECTION_GAP
+    }
+    rows.push({ key: section.key, section, count, top, height: HEADER_HEIGHT })
+    top += HEADER_HEIGHT
+
+    for (let i = 0; i < tools.length; i += columns) {
+      const last = i + columns >= tools.length
+      const height = CARD_HEIGHT + (last ? 0 : CARD_GAP)
+      rows.push({ key: `${section.key}:${i / columns}`, section, tools: tools.slice(i, i + columns), top, height })
+      top += height
+    }
+  }
+  return { rows, height: top }
+}
+
+// Index of the first row whose bottom is below `offset`
+function firstRowAfter(rows, offset) {
+  let low = 0
+  let high = rows.length
+  while (low < high) {
+    const mid = (low + high) >>> 1
+    if (rows[mid].top + rows[mid].height <= offset) {
+      low = mid + 1
+    } else {
+      high = mid
+    }
+  }
+  return low
+}
+
+const Row = memo(function Row({ row, columns }) {
+  return (
+    <div className="absolute left-0 right-0" style={{ top: row.top, height: row.height }}>
+      {row.tools ? (
+        <div className="grid gap-6" style={{ gridTemplateColumns: `repeat(${columns}, minmax(0, 1fr))` }}>
+          {row.tools.map(tool => (
+            <AiToolCard key={tool.id} tool={tool} section={row.section} />
+          ))}
+        </div>
+      ) : (
+        <AiToolSectionHeader section={row.section} count={row.count} />
+      )}
+    </div>
+  )
+})
+
+// `sections` is a list of `{ section, tools, count }` in display order
+export default function VirtualToolGrid({ sections }) {
+  const containerRef = useRef(null)
+  const columns = useColumns()
+  const layout = useMemo(() => layoutRows(sections, columns), [sections, columns])
+  const [range, setRange] = useState({ start: 0, end: INITIAL_ROWS })
+
+  useEffect(() => {
+    let frame = 0
+
+    const update = () => {
+      frame = 0
+      const container = containerRef.current
+      if (!container) {
+        return
+      }
+      const offset = -container.getBoundingClientRect().top
+      const start = firstRowAfter(layout.rows, offset - OVERSCAN_PX)
+      const end = firstRowAfter(layout.rows, offset + window.innerHeight + OVERSCAN_PX) + 1
+      setRange(previous => previous.start === start && previous.end === end ? previous : { start, end })
+    }
+    const schedule = () => {
+      if (!frame) {
+        frame = requestAnimationFrame(update)
+      }
+    }
+
+    update()
+    window.addEventListener('scroll', schedule, { passive: true })
+    window.addEventListener('resize', schedule)
+    return () => {
+      cancelAnimationFrame(frame)
+      window.removeEventListener('scroll', schedule)
+      window.removeEventListener('resize', schedule)
+    }
+  }, [layout])
+
+  return (
+    <div ref={containerRef} className="relative" style={{ height: layout.height }}>
+      {layout.rows.slice(range.start, range.end).map(row => (
+        <Row key={row.key} row={row} columns={columns} />
+      ))}
+    </div>
+  )
+}
@@ -0,0 +1,414 @@
+// Chatbot widget chat window.
+// Loaded by the widget loader on the first click of the chat button; defines
+// window.happyaxzoraChatWindow(config), which builds the window inside the
+// loader's container and returns { toggle }.
+(function() {
+  'use strict';
+
+  window.happyaxzoraChatWindow = function(config) {
+    const chatbotId = config.chatbotId;
+    const widgetContainer = config.container;
+    const chatButton = config.button;
+
+    // Create chat window
+    const chatWindow = document.createElement('div');
+    chatWindow.id = 'happyaxzora-chat-window';
+    chatWindow.style.cssText = `
+      position: absolute;
+      bottom: 80px;
+      right: 0;
+      width: 350px;
+      height: 450px;
+      background: white;
+      border-radius: 12px;
+      box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
+      display: none;
+      flex-direction: column;
+      overflow: hidden;
+      border: 1px solid #e5e7eb;
+    `;
+
+    // Create chat header
+    const chatHeader = document.createElement('div');
+    chatHeader.style.cssText = `
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      color: white;
+      padding: 16px;
+      display: flex;
+      justify-content: space-between;
+      align-items: center;
+    `;
+    chatHeader.innerHTML = `
+      <div>
+        <div style="font-weight: 600; font-size: 16px;">Support Bot</div>
+        <div style="font-size: 12px; opacity: 0.8;">Online</div>
+      </div>
+      <button id="happyaxzora-close-chat" style="background: none; border: none; color: white; cursor: pointer; font-size: 20px;">×</button>
+    `;
+
+    // Create messages container
+    const messagesContainer = document.createElement('div');
+    messagesContainer.id = 'happyaxzora-messages';
+    messagesContainer.style.cssText = `
+      flex: 1;
+      overflow-y: auto;
+      padding: 16px;
+      background: #f9fafb;
+    `;
+
+    // Create input container
+    const inputContainer = document.createElement('div');
+    inputContainer.style.cssText = `
+      padding: 16px;
+      border-top: 1px solid #e5e7eb;
+      background: white;
+    `;
+
+    const inputForm = document.createElement('form');
+    inputForm.style.cssText = `
+      display: flex;
+      gap: 8px;
+    `;
+
+    const messageInput = document.createElement('input');
+    messageInput.type = 'text';
+    messageInput.placeholder = 'Type your message...';
+    messageInput.style.cssText = `
+      flex: 1;
+      padding: 8px 12px;
+      border: 1px solid #d1d5db;
+      border-radius: 6px;
+      outline: none;
+      font-size: 14px;
+    `;
+
+    const sendButton = document.createElement('button');
+    sendButton.type = 'submit';
+    sendButton.innerHTML = `
+      <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+        <line x1="22" y1="2" x2="11" y2="13"></line>
+        <polygon points="22,2 15,22 11,13 2,9 22,2"></polygon>
+      </svg>
+    `;
+    sendButton.style.cssText = `
+      background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+      color: white;
+      border: none;
+      padding: 8px 12px;
+      border-radius: 6px;
+      cursor: pointer;
+      display: flex;
+      align-items: center;
+      justify-content: center;
+    `;
+
+    // State management
+    let isOpen = false;
+    let messages = [];
+    // Conversation the server keeps for this visitor; set by the first reply
+    let sessionId = null;
+    // Event stream held open for the session while the window is open, so
+    // later replies arrive on it instead of on a new connection per message
+    let sessionEvents = null;
+    // Receives the events of the reply currently expected on sessionEvents
+    let pendingTurn = null;
+
+    // Initialize widget
+    function initWidget() {
+      // Assemble chat window
+      inputForm.appendChild(messageInput);
+      inputForm.appendChild(sendButton);
+      inputContainer.appendChild(inputForm);
+    
+      chatWindow.appendChild(chatHeader);
+      chatWindow.appendChild(messagesContainer);
+      chatWindow.appendChild(inputContainer);
+    
+      widgetContainer.appendChild(chatWindow);
+
+      // Add initial greeting
+      addMessage('bot', 'Hello! I\'m here to help you with any questions you might have. How can I assist you today?');
+
+      // Event listeners
+      chatHeader.querySelector('#happyaxzora-close-chat').addEventListener('click', toggleChat);
+      inputForm.addEventListener('submit', handleSubmit);
+      window.addEventListener('pagehide', endSession);
+    }
+
+    function sessionUrl() {
+      return config.origin + '/api/chatbots/sessions/' + encodeURIComponent(sessionId);
+    }
+
+    // Open the session's event stream, unless it is already open
+    function openSessionEvents() {
+      if (sessionEvents || !sessionId || !window.EventSource) return;
+
+      sessionEvents = new EventSource(sessionUrl() + '/events');
+      ['token', 'done', 'error'].forEach(function(event) {
+        sessionEvents.addEventListener(event, function(e) {
+          // Connection errors also fire 'error', without data
+          if (pendingTurn && e.data) {
+            pendingTurn(event, JSON.parse(e.data));
+          }
+        });
+      });
+      // The session expired, or the server restarted or scaled out: go back
+      // to one stream per message, and reopen on the next reply
+      sessionEvents.onerror = function() {
+        closeSessionEvents();
+        if (pendingTurn) {
+          pendingTurn('error', { error: 'Connection lost' });
+        }
+      };
+    }
+
+    function closeSessionEvents() {
+      if (sessionEvents) {
+        sessionEvents.close();
+        sessionEvents = null;
+      }
+    }
+
+    // Free the conversation on the server when the visitor leaves the page
+    function endSession() {
+      closeSessionEvents();
+      if (sessionId) {
+        fetch(sessionUrl(), { method: 'DELETE', keepalive: true }).catch(function() {});
+        sessionId = null;
+      }
+    }
+
+    // Toggle chat window
+    function toggleChat() {
+      isOpen = !isOpen;
+      chatWindow.style.display = isOpen ? 'flex' : 'none';
+      chatButton.setAttribute('aria-expanded', String(isOpen));
+    
+      if (isOpen) {
+        openSessionEvents();
+        messageInput.focus();
+      } else {
+        closeSessionEvents();
+      }
+    }
+
+    // Handle form submission
+    function handleSubmit(e) {
+      e.preventDefault();
+      const message = messageInput.value.trim();
+    
+      if (!message) return;
+    
+      addMessage('user', message);
+      messageInput.value = '';
+    
+      // Send to chatbot API
+      sendMessageToBot(message);
+    }
+
+    // Add message to chat
+    function addMessage(type, content) {
+      const messageDiv = document.createElement('div');
+      messageDiv.style.cssText = `
+        margin-bottom: 12px;
+        display: flex;
+        ${type === 'user' ? 'justify-content: flex-end' : 'justify-content: flex-start'};
+      `;
+
+      const messageContent = document.createElement('div');
+      messageContent.style.cssText = `
+        max-width: 80%;
+        padding: 8px 12px;
+        border-radius: 12px;
+        font-size: 14px;
+        line-height: 1.4;
+        ${type === 'user' 
+          ? 'background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-bottom-right-radius: 4px;' 
+          : 'background: white; color: #374151; border: 1px solid #e5e7eb; border-bottom-left-radius: 4px;'
+        }
+      `;
+      messageContent.textContent = content;
+
+      messageDiv.appendChild(messageContent);
+      messagesContainer.appendChild(messageDiv);
+    
+      // Scroll to bottom
+      messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+      return messageContent;
+    }
+
+    // Send message to chatbot API
+    async function sendMessageToBot(message) {
+      // Add typing indicator
+      const typingDiv = document.createElement('div');
+      typingDiv.id = 'typing-indicator';
+      typingDiv.style.cssText = `
+        margin-bottom: 12px;
+        display: flex;
+        justify-content: flex-start;
+      `;
+    
+      const typingContent = document.createElement('div');
+      typingContent.style.cssText = `
+        background: white;
+        color: #6b7280;
+        border: 1px solid #e5e7eb;
+        padding: 8px 12px;
+        border-radius: 12px;
+        border-bottom-left-radius: 4px;
+        font-size: 14px;
+        font-style: italic;
+      `;
+      typingContent.textContent = 'Typing...';
+    
+      typingDiv.appendChild(typingContent);
+      messagesContainer.appendChild(typingDiv);
+      messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+      const fallback = 'I apologize, but I couldn\'t process your request. Please try again.';
+      // Stream tokens into a single bot bubble as they arrive
+      let botContent = null;
+      let text = '';
+
+      function onReplyEvent(event, data) {
+        if (event === 'token') {
+          text += data.content;
+        } else if (event === 'done') {
+          sessionId = data.sessionId || sessionId;
+          text = data.response || text || fallback;
+        } else if (event === 'error') {
+          throw new Error(data.error);
+        } else {
+          return;
+        }
+
+        if (!botContent) {
+          removeTypingIndicator();
+          botContent = addMessage('bot', text);
+        } else {
+          botContent.textContent = text;
+          messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        }
+      }
+
+      try {
+        // Set up before sending, as the first events can beat the response
+        const useEvents = !!sessionEvents && sessionEvents.readyState === EventSource.OPEN;
+        const viaEvents = new Promise(function(resolve, reject) {
+          pendingTurn = function(event, data) {
+            try {
+              onReplyEvent(event, data);
+              if (event === 'done') resolve();
+            } catch (error) {
+              reject(error);
+            }
+          };
+        });
+        // Only awaited when the server accepts the turn for the event stream
+        viaEvents.catch(function() {});
+
+        const response = await fetch(config.origin + '/api/chatbots/test', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+          },
+          body: JSON.stringify({
+            chatbotId: chatbotId,
+            sessionId: sessionId,
+            message: message,
+            userId: 'widget_user',
+            transport: useEvents ? 'events' : undefined
+          }),
+        });
+
+        const contentType = response.headers.get('content-type') || '';
+
+        if (response.status === 202) {
+          // Accepted; the reply comes over the session's event stream
+          await viaEvents;
+        } else if (contentType.indexOf('text/event-stream') !== -1) {
+          pendingTurn = null;
+          await readEventStream(response, onReplyEvent);
+        } else {
+          pendingTurn = null;
+          const data = await response.json();
+          sessionId = data.sessionId || sessionId;
+          text = data.response || fallback;
+        }
+
+        if (!botContent) {
+          removeTypingIndicator();
+          addMessage('bot', text || fallback);
+        }
+
+        // Later turns reuse one connection
+        if (isOpen) {
+          openSessionEvents();
+        }
+      
+      } catch (error) {
+        console.error('Error sending message:', error);
+      
+        removeTypingIndicator();
+      
+        addMessage('bot', 'Sorry, I\'m having trouble connecting. Please try again later.');
+      } finally {
+        pendingTurn = null;
+      }
+    }
+
+    // Remove typing indicator
+    function removeTypingIndicator() {
+      const typing = document.getElementById('typing-indicator');
+      if (typing) {
+        typing.remove();
+      }
+    }
+
+    // Read a Server-Sent Events response, calling onEvent(event, data) per event
+    async function readEventStream(response, onEvent) {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      function dispatch(raw) {
+        let event = 'message';
+        let data = '';
+        raw.split('\n').forEach(function(line) {
+          if (line.indexOf('event:') === 0) {
+            event = line.slice(6).trim();
+          } else if (line.indexOf('data:') === 0) {
+            data += line.slice(5).trim();
+          }
+        });
+        if (data) {
+          onEvent(event, JSON.parse(data));
+        }
+      }
+
+      while (true) {
+        const result = await reader.read();
+        if (result.done) break;
+
+        buffer += decoder.decode(result.value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          dispatch(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+        }
+      }
+
+      if (buffer.trim()) {
+        dispatch(buffer);
+      }
+    }
+
+    initWidget();
+
+    return { toggle: toggleChat };
+  };
+
+})();
@@ -0,0 +1,94 @@
+// Chatbot Widget Embed Script
+//
+//   <script src="https://<host>/embed/chatbot-widget.js" data-chatbot-id="<id>" async></script>
+//
+// Draws only the chat button. The chat window is fetched from a
+// content-hashed, immutably cached file on the first click.
+(function() {
+  'use strict';
+
+  const script = document.currentScript;
+  if (!script) {
+    return;
+  }
+
+  const src = new URL(script.src, location.href);
+  const chatbotId = script.getAttribute('data-chatbot-id') || src.searchParams.get('id');
+
+  if (!chatbotId) {
+    console.error('Chatbot ID not found in embed script');
+    return;
+  }
+
+  // Replaced with the hashed chat window file name by scripts/build-widget.js
+  const chatWindowUrl = new URL('__CHAT_WINDOW_FILE__', src).href;
+
+  let chatWindow = null;
+  let loading = false;
+
+  const widgetContainer = document.createElement('div');
+  widgetContainer.id = 'happyaxzora-chatbot-widget';
+  widgetContainer.style.cssText = 'position:fixed;bottom:20px;right:20px;z-index:10000;' +
+    "font-family:-apple-system,BlinkMacSystemFont,'Segoe UI','Roboto',sans-serif";
+
+  const chatButton = document.createElement('button');
+  chatButton.id = 'happyaxzora-chat-button';
+  chatButton.type = 'button';
+  chatButton.setAttribute('aria-label', 'Open chat');
+  chatButton.setAttribute('aria-expanded', 'false');
+  chatButton.innerHTML = '<svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">' +
+    '<path d="M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z"></path></svg>';
+  chatButton.style.cssText = 'width:60px;height:60px;border-radius:50%;' +
+    'background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);border:none;color:white;cursor:pointer;' +
+    'box-shadow:0 4px 12px rgba(0,0,0,0.15);transition:all 0.3s ease;display:flex;align-items:center;justify-content:center';
+
+  chatButton.addEventListener('mouseenter', function() {
+    chatButton.style.transform = 'scale(1.05)';
+  });
+  chatButton.addEventListener('mouseleave', function() {
+    chatButton.style.transform = 'scale(1)';
+  });
+
+  chatButton.addEventListener('click', function() {
+    if (chatWindow) {
+      chatWindow.toggle();
+      return;
+    }
+    if (loading) {
+      return;
+    }
+
+    // First click: fetch the chat window, then open it
+    loading = true;
+    const tag = document.createElement('script');
+    tag.src = chatWindowUrl;
+    tag.async = true;
+    tag.onload = function() {
+      chatWindow = window.happyaxzoraChatWindow({
+        chatbotId: chatbotId,
+        origin: src.origin,
+        container: widgetContainer,
+        button: chatButton
+      });
+      chatWindow.toggle();
+    };
+    tag.onerror = function() {
+      loading = false;
+      console.error('Chatbot widget failed to load');
+    };
+    document.head.appendChild(tag);
+  });
+
+  function initWidget() {
+    widgetContainer.appendChild(chatButton);
+    document.body.appendChild(widgetContainer);
+  }
+
+  // Initialize when DOM is ready
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', initWidget);
+  } else {
+    initWidget();
+  }
+
+})();
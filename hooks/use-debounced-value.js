@@ -0,0 +1,13 @@
+import * as React from "react"
+
+// `value`, updated only once it has stopped changing for `delayMs`
+export function useDebouncedValue(value, delayMs) {
+  const [debounced, setDebounced] = React.useState(value)
+
+  React.useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delayMs)
+    return () => clearTimeout(timer)
+  }, [value, delayMs])
+
+  return debounced
+}
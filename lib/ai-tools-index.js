@@ -0,0 +1,292 @@
+import { promises as fs } from 'fs'
+import path from 'path'
+
+// Local index of AI tools ingested from Product Hunt.
+//
+// A background ingester pages through recent posts with the GraphQL cursor and
+// upserts them by id. The AI-topic classification and the sort keys are
+// computed once per post at ingest time, and the index keeps the AI tools
+// pre-sorted by date and by votes. Queries are answered from those arrays with
+// keyset cursors, so pages stay stable while new posts arrive.
+//
+// Refreshes are incremental: paging stops at the first page holding a post
+// that is already indexed and unchanged. Votes on older posts keep moving, so
+// the whole lookback window is re-walked every `fullIngestIntervalMs`. A cold
+// instance with nothing to serve fetches a single page first and starts the
+// full walk in the background once that page is indexed.
+//
+// Posts are kept for `retentionDays` and saved to `storeFile`, so the index
+// survives restarts and grows well beyond a single fetch.
+
+const AI_TOPIC_PATTERN = /ai|artificial intelligence|machine learning|automation|chatbot|neural|deep learning/
+
+const DAY_MS = 24 * 60 * 60 * 1000
+
+export const SORTS = {
+  // Newest first, then most voted
+  date: (a, b) => b.dateMs - a.dateMs || b.votes - a.votes || (a.id < b.id ? -1 : a.id > b.id ? 1 : 0),
+  votes: (a, b) => b.votes - a.votes || b.dateMs - a.dateMs || (a.id < b.id ? -1 : a.id > b.id ? 1 : 0)
+}
+
+function toTool(node) {
+  const topics = node.topics.edges.map(t => t.node.name)
+  const date = node.featuredAt || node.createdAt
+  return {
+    id: node.id,
+    name: node.name,
+    description: node.tagline || node.description,
+    url: node.url,
+    votes: node.votesCount,
+    topics,
+    createdAt: node.createdAt,
+    featuredAt: node.featuredAt,
+    date
+  }
+}
+
+// Sort keys and topic lookups, computed once per post and kept off the wire
+function withKeys(tool) {
+  const topicKeys = tool.topics.map(topic => topic.toLowerCase())
+  return {
+    tool,
+    id: tool.id,
+    votes: tool.votes || 0,
+    dateMs: Date.parse(tool.date || tool.createdAt) || 0,
+    topicKeys: new Set(topicKeys),
+    isAi: topicKeys.some(topic => AI_TOPIC_PATTERN.test(topic))
+  }
+}
+
+export function encodeCursor(entry) {
+  return Buffer.from(JSON.stringify([entry.dateMs, entry.votes, entry.id])).toString('base64url')
+}
+
+export function decodeCursor(cursor) {
+  try {
+    const [dateMs, votes, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    return typeof id === 'string' ? { dateMs, votes, id } : null
+  } catch {
+    return null
+  }
+}
+
+export function createAiToolsIndex({
+  fetchPage,
+  storeFile = null,
+  lookbackDays = 14,
+  retentionDays = 90,
+  maxPages = 20,
+  refreshIntervalMs = 5 * 60 * 1000,
+  fullIngestIntervalMs = 60 * 60 * 1000,
+  now = Date.now
+}) {
+  const entries = new Map()
+  const sorted = { date: [], votes: [] }
+  // Filtered views per sort and topic, rebuilt lazily after each ingest
+  let views = new Map()
+  let updatedAt = 0
+  let loaded = null
+  let ready = null
+  let ingesting = null
+  let fullIngestAt = 0
+  const stats = { ingests: 0, fullIngests: 0, failedIngests: 0, pagesFetched: 0, posts: 0 }
+
+  function rebuild() {
+    const aiTools = [...entries.values()].filter(entry => entry.isAi)
+    sorted.date = aiTools.slice().sort(SORTS.date)
+    sorted.votes = aiTools.sort(SORTS.votes)
+    views = new Map()
+    updatedAt = now()
+  }
+
+  function upsert(tool) {
+    const previous = entries.get(tool.id)
+    if (previous && JSON.stringify(previous.tool) === JSON.stringify(tool)) {
+      return false
+    }
+    entries.set(tool.id, withKeys(tool))
+    return true
+  }
+
+  function prune() {
+    const cutoff = now() - retentionDays * DAY_MS
+    let removed = false
+    for (const [id, entry] of entries) {
+      if (entry.dateMs < cutoff) {
+        entries.delete(id)
+        removed = true
+      }
+    }
+    return removed
+  }
+
+  async function loadStore() {
+    if (!storeFile) {
+      return
+    }
+    try {
+      const { tools } = JSON.parse(await fs.readFile(storeFile, 'utf8'))
+      tools.forEach(upsert)
+      prune()
+      rebuild()
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.log('AI tools store could not be read:', error.message)
+      }
+    }
+  }
+
+  async function saveStore() {
+    if (!storeFile) {
+      return
+    }
+    const tmp = `${storeFile}.${process.pid}.tmp`
+    await fs.mkdir(path.dirname(storeFile), { recursive: true })
+    await fs.writeFile(tmp, JSON.stringify({ tools: [...entries.values()].map(entry => entry.tool) }))
+    await fs.rename(tmp, storeFile)
+  }
+
+  // Page through posts from the lookback window, newest first, and upsert
+  // them. Unless a full walk is due, stop once a page reaches known posts.
+  // `firstPageOnly` fetches just the newest page and never counts as full.
+  async function ingest({ firstPageOnly = false } = {}) {
+    const startedAt = now()
+    const full = !firstPageOnly && startedAt - fullIngestAt >= fullIngestIntervalMs
+    const postedAfter = new Date(startedAt - lookbackDays * DAY_MS).toISOString()
+    let after = null
+    let changed = false
+
+    for (let page = 0; page < (firstPageOnly ? 1 : maxPages); page++) {
+      const { posts, endCursor, hasNextPage } = await fetchPage({ after, postedAfter })
+      stats.pagesFetched++
+      let reachedKnown = false
+      for (const node of posts) {
+        if (upsert(toTool(node))) {
+          changed = true
+        } else {
+          reachedKnown = true
+        }
+      }
+      if (!hasNextPage || !endCursor || (reachedKnown && !full)) {
+        break
+      }
+      after = endCursor
+    }
+
+    changed = prune() || changed
+    stats.ingests++
+    if (full) {
+      fullIngestAt = startedAt
+      stats.fullIngests++
+    }
+    stats.posts = entries.size
+
+    if (changed || !updatedAt) {
+      rebuild()
+      await saveStore().catch(error => {
+        console.log('AI tools store could not be saved:', error.message)
+      })
+    }
+  }
+
+  function runIngest(options) {
+    if (!ingesting) {
+      ingesting = ingest(options)
+        .catch(error => {
+          stats.failedIngests++
+          throw error
+        })
+        .finally(() => {
+          ingesting = null
+        })
+    }
+    return ingesting
+  }
+
+  // Load the local store, then ingest in the background on an interval.
+  // Resolves once there is something to serve: straight away when the store
+  // had posts, otherwise after one page has been fetched.
+  function start() {
+    if (!loaded) {
+      loaded = loadStore()
+      setInterval(() => {
+        runIngest().catch(error => {
+          console.error('AI tools ingest failed:', error.message)
+        })
+      }, refreshIntervalMs).unref?.()
+    }
+
+    if (!ready) {
+      const runInBackground = () => {
+        runIngest().catch(error => {
+          console.error('AI tools ingest failed:', error.message)
+        })
+      }
+      ready = loaded.then(() => {
+        if (!updatedAt) {
+          return runIngest({ firstPageOnly: true }).then(runInBackground)
+        }
+        // Serve what the store had while the first ingest runs
+        runInBackground()
+      })
+      // Let the next request retry if there is still nothing to serve
+      ready.catch(() => {
+        ready = null
+      })
+    }
+    return ready
+  }
+
+  function view(sort, topic) {
+    if (!topic) {
+      return sorted[sort]
+    }
+    const key = `${sort}:${topic}`
+    if (views.has(key)) {
+      return views.get(key)
+    }
+    const list = sorted[sort].filter(entry => entry.topicKeys.has(topic))
+    // Only topics that exist are worth keeping; arbitrary input shouldn't grow the map
+    if (list.length) {
+      views.set(key, list)
+    }
+    return list
+  }
+
+  // Index of the first entry that sorts after the cursor position
+  function seek(list, compare, position) {
+    let low = 0
+    let high = list.length
+    while (low < high) {
+      const mid = (low + high) >>> 1
+      if (compare(list[mid], position) <= 0) {
+        low = mid + 1
+      } else {
+        high = mid
+      }
+    }
+    return low
+  }
+
+  function query({ cursor = null, limit = 50, topic = null, sort = 'date' } = {}) {
+    const order = SORTS[sort] ? sort : 'date'
+    const list = view(order, topic ? topic.toLowerCase() : null)
+    const position = cursor && decodeCursor(cursor)
+    const start = position ? seek(list, SORTS[order], position) : 0
+    const page = list.slice(start, start + limit)
+
+    return {
+      tools: page.map(entry => entry.tool),
+      nextCursor: start + limit < list.length ? encodeCursor(page[page.length - 1]) : null,
+      total: list.length
+    }
+  }
+
+  return {
+    start,
+    query,
+    refresh: runIngest,
+    updatedAt: () => updatedAt,
+    stats: () => ({ ...stats, aiTools: sorted.date.length })
+  }
+}
@@ -0,0 +1,130 @@
+import os from 'os'
+import path from 'path'
+import { createAiToolsIndex } from './ai-tools-index'
+
+// The process-wide AI tools index, ingested from Product Hunt.
+//
+// The API route and the server-rendered home page read the same index. Next
+// may load them as separate bundles, so the instance is kept on `globalThis`
+// and created by whichever loads first.
+
+const PRODUCTHUNT_API_URL = process.env.PRODUCTHUNT_API_URL || 'https://api.producthunt.com/v2/api/graphql'
+
+const PRODUCTHUNT_POSTS_QUERY = `
+  query RecentPosts($after: String, $postedAfter: DateTime) {
+    posts(first: 50, after: $after, order: NEWEST, postedAfter: $postedAfter) {
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+      edges {
+        node {
+          id
+          name
+          tagline
+          description
+          url
+          votesCount
+          createdAt
+          featuredAt
+          topics {
+            edges {
+              node {
+                name
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+`
+
+// Helper function to fetch one page of posts from Product Hunt
+async function fetchFromProductHunt({ after, postedAfter }) {
+  const response = await fetch(PRODUCTHUNT_API_URL, {
+    method: 'POST',
+    headers: {
+      'Accept': 'application/json',
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${process.env.PRODUCTHUNT_DEVELOPER_TOKEN}`,
+    },
+    body: JSON.stringify({
+      query: PRODUCTHUNT_POSTS_QUERY,
+      variables: { after, postedAfter }
+    })
+  })
+
+  if (!response.ok) {
+    throw new Error(`Product Hunt API error: ${response.status}`)
+  }
+
+  const data = await response.json()
+  
+  if (data.errors) {
+    throw new Error(data.errors[0].message)
+  }
+  
+  const { edges, pageInfo } = data.data.posts
+  return {
+    posts: edges.map(edge => edge.node),
+    endCursor: pageInfo?.endCursor,
+    hasNextPage: !!pageInfo?.hasNextPage
+  }
+}
+
+export const AI_TOOLS_REFRESH_MS = parseInt(process.env.AI_TOOLS_REFRESH_MS || '300000', 10)
+
+const INSTANCE_KEY = Symbol.for('happyaxzora.aiToolsIndex')
+
+// `observe(name, ms)`, from any caller, receives the duration of each
+// Product Hunt fetch
+export function getAiToolsIndex({ observe = null } = {}) {
+  let shared = globalThis[INSTANCE_KEY]
+  if (!shared) {
+    shared = { observe: null }
+    shared.index = createAiToolsIndex({
+      fetchPage: async (page) => {
+        const startedAt = performance.now()
+        try {
+          return await fetchFromProductHunt(page)
+        } finally {
+          shared.observe?.('producthunt.fetch', performance.now() - startedAt)
+        }
+      },
+      storeFile: process.env.AI_TOOLS_STORE_FILE || path.join(os.tmpdir(), 'happyaxzora', 'ai-tools.json'),
+      lookbackDays: parseInt(process.env.AI_TOOLS_LOOKBACK_DAYS || '14', 10),
+      retentionDays: parseInt(process.env.AI_TOOLS_RETENTION_DAYS || '90', 10),
+      maxPages: parseInt(process.env.AI_TOOLS_MAX_PAGES || '20', 10),
+      refreshIntervalMs: AI_TOOLS_REFRESH_MS,
+      fullIngestIntervalMs: parseInt(process.env.AI_TOOLS_FULL_REFRESH_MS || String(60 * 60 * 1000), 10)
+    })
+    globalThis[INSTANCE_KEY] = shared
+  }
+  if (observe) {
+    shared.observe = observe
+  }
+  return shared.index
+}
+
+const DAY_MS = 24 * 60 * 60 * 1000
+
+// Split date-sorted tools into today / this week / older. Tools without a
+// date count as older.
+export function groupByRecency(tools, now = new Date()) {
+  const todayStart = new Date(now.getFullYear(), now.getMonth(), now.getDate()).getTime()
+  const weekStart = now.getTime() - 7 * DAY_MS
+  const groups = { today: [], thisWeek: [], older: [] }
+
+  for (const tool of tools) {
+    const date = Date.parse(tool.date) || 0
+    if (date >= todayStart) {
+      groups.today.push(tool)
+    } else if (date >= weekStart) {
+      groups.thisWeek.push(tool)
+    } else {
+      groups.older.push(tool)
+    }
+  }
+  return groups
+}
@@ -0,0 +1,227 @@
+import { randomUUID } from 'crypto'
+
+// In-memory chat sessions for embedded chatbots.
+//
+// A session pins the resolved chatbot and its knowledge index (`context`), so
+// warm turns skip the chatbot lookup, and keeps a bounded conversation: the
+// last `maxMessages` messages verbatim plus a running summary of everything
+// older. Folding old messages into the summary goes through `summarize` in
+// the background; without it, or if it fails, older turns are clipped into an
+// extractive summary instead. Sessions expire after `ttlMs` of inactivity and
+// the least recently used one is evicted beyond `maxSessions`.
+//
+// Sessions can also hold open event streams (`subscribe`), so a client can
+// keep one connection for every turn instead of opening one per message.
+//
+// Sessions are per process. Where requests are spread over instances, as on
+// serverless hosts, a turn that lands elsewhere starts a new session.
+
+export function createChatSessionStore({
+  maxSessions = 10000,
+  ttlMs = 30 * 60 * 1000,
+  maxMessages = 12,
+  maxSummaryChars = 2000,
+  summarize = null,
+  now = Date.now
+} = {}) {
+  // Map iteration order is insertion order, so the first key is the LRU session
+  const sessions = new Map()
+  // Bumped when a chatbot changes so warm sessions reload it
+  const chatbotVersions = new Map()
+  const stats = { opened: 0, expired: 0, evicted: 0, summarized: 0, summaryFailures: 0 }
+
+  function close(session) {
+    sessions.delete(session.id)
+    for (const subscriber of session.subscribers) {
+      subscriber.close()
+    }
+    session.subscribers.clear()
+  }
+
+  function isExpired(session, t) {
+    // An open event stream keeps its session alive
+    return !session.subscribers.size && t - session.lastActiveAt >= ttlMs
+  }
+
+  function touch(session) {
+    session.lastActiveAt = now()
+    // A session closed mid-turn stays closed
+    if (sessions.delete(session.id)) {
+      sessions.set(session.id, session)
+    }
+  }
+
+  function sweep() {
+    const t = now()
+    for (const session of sessions.values()) {
+      if (isExpired(session, t)) {
+        close(session)
+        stats.expired++
+      }
+    }
+  }
+
+  function get(id) {
+    const session = id && sessions.get(id)
+    if (!session) {
+      return null
+    }
+    if (isExpired(session, now())) {
+      close(session)
+      stats.expired++
+      return null
+    }
+    touch(session)
+    return session
+  }
+
+  // Resume `id` if it is live and belongs to `chatbotId`, otherwise start a new session
+  function open({ id, chatbotId, userId = null }) {
+    const existing = get(id)
+    if (existing && (!chatbotId || existing.chatbotId === chatbotId)) {
+      return existing
+    }
+
+    if (sessions.size >= maxSessions) {
+      sweep()
+    }
+    if (sessions.size >= maxSessions) {
+      close(sessions.values().next().value)
+      stats.evicted++
+    }
+
+    const session = {
+      id: randomUUID(),
+      chatbotId,
+      userId,
+      context: null,
+      contextVersion: 0,
+      summary: '',
+      history: [],
+      summarizing: null,
+      busy: false,
+      turns: 0,
+      subscribers: new Set(),
+      createdAt: now(),
+      lastActiveAt: now()
+    }
+    sessions.set(session.id, session)
+    stats.opened++
+    return session
+  }
+
+  // The session's pinned chatbot context, loaded via `load(chatbotId)` when
+  // cold or after the chatbot changed
+  async function context(session, load) {
+    const version = chatbotVersions.get(session.chatbotId) || 0
+    if (!session.context || session.contextVersion !== version) {
+      session.context = await load(session.chatbotId)
+      session.contextVersion = version
+    }
+    return session.context
+  }
+
+  function invalidateChatbot(chatbotId) {
+    chatbotVersions.set(chatbotId, (chatbotVersions.get(chatbotId) || 0) + 1)
+  }
+
+  // Messages for the next turn: the system prompt, the summary of older turns,
+  // the recent history and the new user message. `content` is what is sent
+  // for the message this turn (e.g. with retrieved context); the history
+  // only keeps the message itself.
+  function messages(session, system, message, content = message) {
+    const result = [{ role: 'system', content: system }]
+    if (session.summary) {
+      result.push({ role: 'system', content: `Summary of the conversation so far:\n${session.summary}` })
+    }
+    return result.concat(session.history, [{ role: 'user', content }])
+  }
+
+  function clip(text) {
+    return text.length > maxSummaryChars ? `…${text.slice(text.length - maxSummaryChars + 1)}` : text
+  }
+
+  function extractiveSummary(summary, folded) {
+    const lines = folded.map(m => `${m.role === 'user' ? 'User' : 'Assistant'}: ${m.content.replace(/\s+/g, ' ').slice(0, 200)}`)
+    return clip([summary, ...lines].filter(Boolean).join('\n'))
+  }
+
+  function compact(session) {
+    const overflow = session.history.length - maxMessages
+    if (overflow <= 0 || session.summarizing) {
+      return
+    }
+
+    const folded = session.history.slice(0, overflow)
+    if (!summarize) {
+      session.summary = extractiveSummary(session.summary, folded)
+      session.history.splice(0, overflow)
+      return
+    }
+
+    // Folded messages stay in the history until their summary is ready;
+    // only new messages are appended meanwhile, so the prefix is unchanged
+    session.summarizing = summarize(session.summary, folded, session)
+      .then(summary => {
+        session.summary = clip(summary)
+        stats.summarized++
+      })
+      .catch(error => {
+        console.log('Chat summary failed:', error.message)
+        session.summary = extractiveSummary(session.summary, folded)
+        stats.summaryFailures++
+      })
+      .finally(() => {
+        session.history.splice(0, folded.length)
+        session.summarizing = null
+        compact(session)
+      })
+  }
+
+  function record(session, message, response) {
+    session.history.push({ role: 'user', content: message }, { role: 'assistant', content: response })
+    session.turns++
+    touch(session)
+    compact(session)
+  }
+
+  // Register an event stream; `send(event, data)` receives published events
+  // until the returned unsubscribe runs or the session closes
+  function subscribe(session, send, onClose) {
+    const subscriber = { send, close: onClose }
+    session.subscribers.add(subscriber)
+    return () => {
+      session.subscribers.delete(subscriber)
+      touch(session)
+    }
+  }
+
+  function publish(session, event, data) {
+    for (const subscriber of session.subscribers) {
+      subscriber.send(event, data)
+    }
+  }
+
+  function remove(id) {
+    const session = sessions.get(id)
+    if (session) {
+      close(session)
+    }
+    return !!session
+  }
+
+  setInterval(sweep, Math.min(ttlMs, 60 * 1000)).unref?.()
+
+  return {
+    open,
+    get,
+    remove,
+    context,
+    invalidateChatbot,
+    messages,
+    record,
+    subscribe,
+    publish,
+    stats: () => ({ ...stats, sessions: sessions.size })
+  }
+}
@@ -0,0 +1,253 @@
+import { buildIndex, serializeIndex, deserializeIndex } from './kb-index'
+
+// Chatbot repository backed by Firestore.
+//
+// Chatbots live in `chatbots/<id>` and their knowledge indexes in
+// `chatbot_indexes/<id>`. Reads go through an in-process LRU cache (misses are
+// cached too), so the chat path resolves a bot without a Firestore round trip
+// per message. Writes update the cache immediately and are persisted through
+// the write-behind queue. Listing is by `userId`, newest first, with opaque
+// cursors; cached pages for a user are dropped whenever one of their bots
+// changes. Entries expire after `ttlMs` to pick up writes from other instances.
+// The Firestore SDK is only loaded on the first cache miss.
+
+// Resolves to `[db, firestore]`, the database and the SDK module
+function firestore(getDb) {
+  return Promise.all([getDb(), import('firebase/firestore')])
+}
+
+function createLru({ maxEntries, ttlMs, now }) {
+  const entries = new Map()
+
+  return {
+    has(key) {
+      const entry = entries.get(key)
+      if (!entry) {
+        return false
+      }
+      if (now() >= entry.expiresAt) {
+        entries.delete(key)
+        return false
+      }
+      return true
+    },
+    get(key) {
+      const entry = entries.get(key)
+      // Move to the most recently used position
+      entries.delete(key)
+      entries.set(key, entry)
+      return entry.value
+    },
+    set(key, value) {
+      entries.delete(key)
+      entries.set(key, { value, expiresAt: now() + ttlMs })
+      if (entries.size > maxEntries) {
+        entries.delete(entries.keys().next().value)
+      }
+    },
+    delete(key) {
+      entries.delete(key)
+    },
+    get size() {
+      return entries.size
+    }
+  }
+}
+
+export function encodeCursor(chatbot) {
+  return Buffer.from(JSON.stringify([chatbot.createdAt, chatbot.id])).toString('base64url')
+}
+
+export function decodeCursor(cursor) {
+  try {
+    const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    return typeof createdAt === 'string' && typeof id === 'string' ? [createdAt, id] : null
+  } catch {
+    return null
+  }
+}
+
+export function createChatbotStore({
+  getDb,
+  persistence,
+  maxEntries = 1000,
+  maxIndexes = 200,
+  ttlMs = 60 * 1000,
+  maxPageSize = 100,
+  now = Date.now
+}) {
+  const chatbots = createLru({ maxEntries, ttlMs, now })
+  const indexes = createLru({ maxEntries: maxIndexes, ttlMs, now })
+  const pages = createLru({ maxEntries, ttlMs, now })
+  // Secondary index: userId -> cached page keys for that user
+  const pagesByUser = new Map()
+  // Users with writes that may still be sitting in the write-behind queue
+  const pendingUsers = new Set()
+  // Bumped on every write so lists started before it aren't cached after it
+  const generations = new Map()
+  const inFlight = new Map()
+  const stats = { hits: 0, misses: 0, listHits: 0, listMisses: 0 }
+
+  function singleFlight(key, load) {
+    if (!inFlight.has(key)) {
+      inFlight.set(key, load().finally(() => inFlight.delete(key)))
+    }
+    return inFlight.get(key)
+  }
+
+  function invalidateUser(userId) {
+    for (const key of pagesByUser.get(userId) || []) {
+      pages.delete(key)
+    }
+    pagesByUser.delete(userId)
+  }
+
+  function written(chatbot) {
+    chatbots.set(chatbot.id, chatbot)
+    invalidateUser(chatbot.userId)
+    pendingUsers.add(chatbot.userId)
+    generations.set(chatbot.userId, (generations.get(chatbot.userId) || 0) + 1)
+  }
+
+  // Cache a loaded value unless a write landed while it was loading
+  function fill(cache, key, value) {
+    if (cache.has(key)) {
+      return cache.get(key)
+    }
+    cache.set(key, value)
+    return value
+  }
+
+  async function get(id) {
+    if (chatbots.has(id)) {
+      stats.hits++
+      return chatbots.get(id)
+    }
+
+    stats.misses++
+    return singleFlight(`chatbot:${id}`, async () => {
+      const [db, { doc, getDoc }] = await firestore(getDb)
+      const snapshot = await getDoc(doc(db, 'chatbots', id))
+      return fill(chatbots, id, snapshot.exists() ? snapshot.data() : null)
+    })
+  }
+
+  async function getKnowledgeIndex(id) {
+    if (indexes.has(id)) {
+      return indexes.get(id)
+    }
+
+    const chatbot = await get(id)
+    if (!chatbot) {
+      return null
+    }
+
+    return singleFlight(`index:${id}`, async () => {
+      const [db, { doc, getDoc }] = await firestore(getDb)
+      const snapshot = await getDoc(doc(db, 'chatbot_indexes', id))
+      let index = snapshot.exists() ? deserializeIndex(snapshot.data()) : null
+
+      if (!index) {
+        // No stored index, or one built by an older version: rebuild from the KB
+        index = buildIndex(chatbot.knowledgeBase)
+        persistence.enqueue('chatbot_indexes', serializeIndex(index), { id })
+      }
+
+      return fill(indexes, id, index)
+    })
+  }
+
+  function create(chatbot, knowledgeIndex) {
+    written(chatbot)
+    persistence.enqueue('chatbots', chatbot, { id: chatbot.id })
+
+    if (knowledgeIndex) {
+      indexes.set(chatbot.id, knowledgeIndex)
+      persistence.enqueue('chatbot_indexes', serializeIndex(knowledgeIndex), { id: chatbot.id })
+    }
+    return chatbot
+  }
+
+  // Apply a partial update. Resolves to the updated chatbot, or null if it
+  // doesn't exist.
+  async function update(id, updates, knowledgeIndex) {
+    const current = await get(id)
+    if (!current) {
+      return null
+    }
+
+    const chatbot = { ...current, ...updates }
+    written(chatbot)
+    persistence.enqueue('chatbots', updates, { id, merge: true })
+
+    if (knowledgeIndex) {
+      indexes.set(id, knowledgeIndex)
+      persistence.enqueue('chatbot_indexes', serializeIndex(knowledgeIndex), { id })
+    }
+    return chatbot
+  }
+
+  // List a user's chatbots, newest first. `cursor` is the `nextCursor` of the
+  // previous page.
+  async function list({ userId, cursor = null, limit: pageSize = 20 }) {
+    pageSize = Math.max(1, Math.min(pageSize, maxPageSize))
+    const key = JSON.stringify([userId, cursor, pageSize])
+
+    if (pages.has(key)) {
+      stats.listHits++
+      return pages.get(key)
+    }
+
+    stats.listMisses++
+    const generation = generations.get(userId) || 0
+    return singleFlight(`list:${generation}:${key}`, async () => {
+      // Read our own writes: make sure queued chatbots reach Firestore first
+      if (pendingUsers.has(userId)) {
+        pendingUsers.delete(userId)
+        await persistence.flush()
+      }
+
+      const [db, { collection, getDocs, limit, orderBy, query, startAfter, where }] = await firestore(getDb)
+      const constraints = [
+        where('userId', '==', userId),
+        orderBy('createdAt', 'desc'),
+        orderBy('id', 'desc')
+      ]
+      const after = cursor && decodeCursor(cursor)
+      if (after) {
+        constraints.push(startAfter(...after))
+      }
+      // Fetch one extra document to know whether another page exists
+      constraints.push(limit(pageSize + 1))
+
+      const snapshot = await getDocs(query(collection(db, 'chatbots'), ...constraints))
+      const results = snapshot.docs.map(d => d.data())
+      const page = {
+        chatbots: results.slice(0, pageSize),
+        nextCursor: results.length > pageSize ? encodeCursor(results[pageSize - 1]) : null
+      }
+
+      if ((generations.get(userId) || 0) === generation) {
+        for (const chatbot of page.chatbots) {
+          chatbots.set(chatbot.id, chatbot)
+        }
+        pages.set(key, page)
+        if (!pagesByUser.has(userId)) {
+          pagesByUser.set(userId, new Set())
+        }
+        pagesByUser.get(userId).add(key)
+      }
+
+      return page
+    })
+  }
+
+  return {
+    get,
+    getKnowledgeIndex,
+    create,
+    update,
+    list,
+    stats: () => ({ ...stats, cached: chatbots.size, cachedIndexes: indexes.size, cachedPages: pages.size })
+  }
+}
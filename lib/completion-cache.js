@@ -0,0 +1,122 @@
+import { createHash } from 'crypto'
+import { promises as fs } from 'fs'
+import path from 'path'
+
+// Content-addressed cache for LLM completions.
+//
+// Entries live in an in-process LRU bounded by entry count and approximate
+// memory size. When `dir` is set, entries are also written to disk and read
+// back on a memory miss, so they survive restarts.
+
+export function completionCacheKey({ model, system, prompt, temperature, max_tokens }) {
+  return createHash('sha256')
+    .update(JSON.stringify([model, system, prompt, temperature, max_tokens]))
+    .digest('hex')
+}
+
+export function createCompletionCache({
+  maxEntries = 500,
+  maxBytes = 16 * 1024 * 1024,
+  ttlMs = 24 * 60 * 60 * 1000,
+  dir = null,
+  now = Date.now
+} = {}) {
+  // Map iteration order is insertion order, so the first key is the LRU entry
+  const entries = new Map()
+  let bytes = 0
+  const stats = { hits: 0, diskHits: 0, misses: 0, evictions: 0 }
+
+  function sizeOf(value) {
+    // JS strings are UTF-16 in memory
+    return value.length * 2
+  }
+
+  function remember(key, entry) {
+    if (entries.has(key)) {
+      bytes -= sizeOf(entries.get(key).value)
+      entries.delete(key)
+    }
+
+    const size = sizeOf(entry.value)
+    if (size > maxBytes) {
+      return
+    }
+
+    entries.set(key, entry)
+    bytes += size
+
+    while (entries.size > maxEntries || bytes > maxBytes) {
+      const [oldestKey, oldest] = entries.entries().next().value
+      entries.delete(oldestKey)
+      bytes -= sizeOf(oldest.value)
+      stats.evictions++
+    }
+  }
+
+  async function readFromDisk(key) {
+    if (!dir) {
+      return null
+    }
+
+    try {
+      const entry = JSON.parse(await fs.readFile(path.join(dir, `${key}.json`), 'utf8'))
+      return entry.expiresAt > now() ? entry : null
+    } catch (error) {
+      return null
+    }
+  }
+
+  async function writeToDisk(key, entry) {
+    try {
+      await fs.mkdir(dir, { recursive: true })
+      // Write then rename so concurrent readers never see a partial file
+      const file = path.join(dir, `${key}.json`)
+      const tmp = `${file}.${process.pid}.tmp`
+      await fs.writeFile(tmp, JSON.stringify(entry))
+      await fs.rename(tmp, file)
+    } catch (error) {
+      console.error('Completion cache disk write failed:', error.message)
+    }
+  }
+
+  async function get(key) {
+    const entry = entries.get(key)
+    if (entry) {
+      if (entry.expiresAt > now()) {
+        // Refresh recency
+        entries.delete(key)
+        entries.set(key, entry)
+        stats.hits++
+        return entry.value
+      }
+      entries.delete(key)
+      bytes -= sizeOf(entry.value)
+    }
+
+    const stored = await readFromDisk(key)
+    if (stored) {
+      remember(key, stored)
+      stats.diskHits++
+      return stored.value
+    }
+
+    stats.misses++
+    return undefined
+  }
+
+  function set(key, value) {
+    const entry = { value, expiresAt: now() + ttlMs }
+    remember(key, entry)
+
+    if (dir) {
+      // Fire and forget - the disk tier is best effort
+      writeToDisk(key, entry)
+    }
+  }
+
+  return {
+    get,
+    set,
+    stats: () => ({ ...stats, entries: entries.size, bytes })
+  }
+}
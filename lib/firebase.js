@@ -1,7 +1,10 @@
-import { initializeApp } from "firebase/app";
-import { getAuth } from "firebase/auth";
-import { getFirestore } from "firebase/firestore";
-import { getAnalytics } from "firebase/analytics";
+// Firebase services, initialized on first use.
+//
+// Each accessor imports only its own SDK package, so the API route loads
+// Firestore the first time it reads or writes, and the browser loads Auth and
+// Analytics when the auth UI mounts. Importing this module loads none of the
+// SDK. All accessors are async and share one app instance; a failed
+// initialization is retried on the next call.
 
 const firebaseConfig = {
   apiKey: process.env.NEXT_PUBLIC_FIREBASE_API_KEY,
@@ -11,16 +14,49 @@ const firebaseConfig = {
   messagingSenderId: process.env.NEXT_PUBLIC_FIREBASE_MESSAGING_SENDER_ID,
   appId: process.env.NEXT_PUBLIC_FIREBASE_APP_ID,
   measurementId: process.env.NEXT_PUBLIC_FIREBASE_MEASUREMENT_ID
-};
+}
 
-// Initialize Firebase
-const app = initializeApp(firebaseConfig);
+const services = new Map()
 
-// Initialize Firebase Authentication and get a reference to the service
-export const auth = getAuth(app);
+// Memoize `init()` under `name`, forgetting it if it fails
+function lazy(name, init) {
+  if (!services.has(name)) {
+    services.set(name, init().catch(error => {
+      services.delete(name)
+      throw error
+    }))
+  }
+  return services.get(name)
+}
 
-// Initialize Cloud Firestore and get a reference to the service
-export const db = getFirestore(app);
+export function getFirebaseApp() {
+  return lazy('app', async () => {
+    const { getApps, initializeApp } = await import('firebase/app')
+    return getApps()[0] || initializeApp(firebaseConfig)
+  })
+}
 
-// Initialize Analytics (only on client side)
-export const analytics = typeof window !== "undefined" ? getAnalytics(app) : null;
\ No newline at end of file
+export function getDb() {
+  return lazy('firestore', async () => {
+    const [app, { getFirestore }] = await Promise.all([getFirebaseApp(), import('firebase/firestore')])
+    return getFirestore(app)
+  })
+}
+
+export function getFirebaseAuth() {
+  return lazy('auth', async () => {
+    const [app, { getAuth }] = await Promise.all([getFirebaseApp(), import('firebase/auth')])
+    return getAuth(app)
+  })
+}
+
+// Resolves to null on the server and in browsers Analytics doesn't support
+export function getFirebaseAnalytics() {
+  if (typeof window === 'undefined') {
+    return Promise.resolve(null)
+  }
+  return lazy('analytics', async () => {
+    const [app, { getAnalytics, isSupported }] = await Promise.all([getFirebaseApp(), import('firebase/analytics')])
+    return (await isSupported()) ? getAnalytics(app) : null
+  })
+}
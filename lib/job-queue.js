@@ -0,0 +1,199 @@
+import { randomUUID } from 'crypto'
+
+// Background job queue with a bounded worker pool.
+//
+// `submit` returns a job at once; `concurrency` workers run queued jobs
+// through `run(job)` in FIFO order and at most `maxQueued` may wait. Jobs are
+// keyed: a submit whose key is already queued or running joins that job, and
+// with a `store` a finished result is saved under the key and served to later
+// submits as an already completed job. Finished jobs stay readable for
+// `ttlMs`, up to `maxJobs` of them.
+//
+// Job states: queued -> running -> completed | failed. Subscribers get a
+// `status` event on every change.
+//
+// Jobs live in this process and keep running after the request that
+// submitted them has been answered, so the queue needs a long-lived server.
+
+export function createJobQueue({
+  run,
+  store = null,
+  concurrency = 4,
+  maxQueued = 100,
+  maxJobs = 1000,
+  ttlMs = 60 * 60 * 1000,
+  now = Date.now
+}) {
+  // Map iteration order is insertion order, so the first key is the oldest job
+  const jobs = new Map()
+  const active = new Map()
+  const queue = []
+  let running = 0
+  const stats = { submitted: 0, joined: 0, stored: 0, completed: 0, failed: 0, rejected: 0 }
+
+  // The client-facing view of a job
+  function view(job) {
+    return {
+      id: job.id,
+      status: job.status,
+      createdAt: new Date(job.createdAt).toISOString(),
+      startedAt: job.startedAt ? new Date(job.startedAt).toISOString() : null,
+      finishedAt: job.finishedAt ? new Date(job.finishedAt).toISOString() : null,
+      ...(job.progress && { progress: job.progress }),
+      ...(job.status === 'completed' && { result: job.result, cached: job.cached }),
+      ...(job.status === 'failed' && { error: job.error.message })
+    }
+  }
+
+  function emit(job) {
+    for (const listener of job.listeners) {
+      listener(view(job))
+    }
+  }
+
+  function prune() {
+    const cutoff = now() - ttlMs
+    for (const job of jobs.values()) {
+      if (!job.finishedAt) {
+        continue
+      }
+      if (jobs.size <= maxJobs && job.finishedAt > cutoff) {
+        break
+      }
+      jobs.delete(job.id)
+    }
+  }
+
+  function create(key, input) {
+    prune()
+    const job = {
+      id: randomUUID(),
+      key,
+      input,
+      status: 'queued',
+      progress: null,
+      result: undefined,
+      error: null,
+      cached: false,
+      createdAt: now(),
+      startedAt: null,
+      finishedAt: null,
+      listeners: new Set()
+    }
+    job.done = new Promise(resolve => {
+      job.settle = resolve
+    })
+    jobs.set(job.id, job)
+    return job
+  }
+
+  function finish(job, error, result) {
+    job.finishedAt = now()
+    if (error) {
+      job.status = 'failed'
+      job.error = error
+      stats.failed++
+    } else {
+      job.status = 'completed'
+      job.result = result
+      stats.completed++
+    }
+    emit(job)
+    job.listeners.clear()
+    job.settle()
+  }
+
+  async function work(job) {
+    job.status = 'running'
+    job.startedAt = now()
+    emit(job)
+
+    try {
+      const result = await run(job, progress => {
+        job.progress = progress
+        emit(job)
+      })
+      if (store) {
+        await Promise.resolve(store.set(job.key, result)).catch(error => {
+          console.error('Job result could not be stored:', error.message)
+        })
+      }
+      finish(job, null, result)
+    } catch (error) {
+      finish(job, error)
+    } finally {
+      active.delete(job.key)
+      running--
+      drain()
+    }
+  }
+
+  function drain() {
+    while (running < concurrency && queue.length) {
+      running++
+      work(queue.shift())
+    }
+  }
+
+  // Resolves with the job, or null when the queue is full
+  async function submit(key, input) {
+    const existing = active.get(key)
+    if (existing) {
+      stats.joined++
+      return existing
+    }
+
+    const stored = store ? await store.get(key) : undefined
+    if (stored !== undefined) {
+      const job = create(key, input)
+      job.cached = true
+      job.startedAt = job.createdAt
+      stats.stored++
+      finish(job, null, stored)
+      return job
+    }
+
+    // A concurrent submit may have started it while the store was read
+    if (active.has(key)) {
+      stats.joined++
+      return active.get(key)
+    }
+    if (queue.length >= maxQueued) {
+      stats.rejected++
+      return null
+    }
+
+    const job = create(key, input)
+    active.set(key, job)
+    queue.push(job)
+    stats.submitted++
+    drain()
+    return job
+  }
+
+  function get(id) {
+    const job = jobs.get(id)
+    if (job && job.finishedAt && job.finishedAt <= now() - ttlMs) {
+      jobs.delete(id)
+      return null
+    }
+    return job || null
+  }
+
+  // Call `listener(view)` on every status change until the job finishes
+  function subscribe(job, listener) {
+    if (job.finishedAt) {
+      return () => {}
+    }
+    job.listeners.add(listener)
+    return () => job.listeners.delete(listener)
+  }
+
+  return {
+    submit,
+    get,
+    view,
+    subscribe,
+    stats: () => ({ ...stats, queued: queue.length, running, jobs: jobs.size })
+  }
+}
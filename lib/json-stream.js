@@ -0,0 +1,259 @@
+// Incremental JSON parser for model output.
+//
+// Text is fed in chunks as it streams. Anything before the first `{` (a
+// preamble such as "Here is the workflow:" or a code fence) is skipped, the
+// root object is built value by value, and anything after it is ignored. The
+// parse fails at the first character that can't continue valid JSON. That
+// may be long before the stream ends. `onOpen(path, kind)` runs when an object
+// or array starts and `onValue(path, value)` when any value is complete, so
+// callers can validate structure while the text is still arriving. Paths are
+// arrays of keys and indexes from the root.
+
+export class JsonStreamError extends Error {
+  constructor(message, position) {
+    super(`${message} at position ${position}`)
+    this.name = 'JsonStreamError'
+    this.position = position
+  }
+}
+
+const NUMBER_PATTERN = /^-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?$/
+const LITERALS = { true: true, false: false, null: null }
+const ESCAPES = { '"': '"', '\\': '\\', '/': '/', b: '\b', f: '\f', n: '\n', r: '\r', t: '\t' }
+
+function isWhitespace(ch) {
+  return ch === ' ' || ch === '\n' || ch === '\r' || ch === '\t'
+}
+
+export function createJsonStreamParser({ onOpen = null, onValue = null, maxLeadingChars = 4000 } = {}) {
+  // Open containers: { kind, value, key }; `key` is the pending object key
+  const stack = []
+  // leading | value | valueOrEnd | key | keyOrEnd | colon | after | string | number | literal | done
+  let state = 'leading'
+  let token = ''
+  let stringIsKey = false
+  // null outside an escape, '' right after a backslash, 'u...' inside \uXXXX
+  let escape = null
+  let root
+  let error = null
+  let position = 0
+
+  function fail(message) {
+    error = new JsonStreamError(message, position)
+  }
+
+  function path() {
+    return stack.map(frame => frame.kind === 'object' ? frame.key : frame.value.length)
+  }
+
+  function complete(value) {
+    const parent = stack[stack.length - 1]
+    if (!parent) {
+      root = value
+      state = 'done'
+      onValue?.([], value)
+      return
+    }
+
+    const valuePath = onValue && path()
+    if (parent.kind === 'array') {
+      parent.value.push(value)
+    } else if (parent.key === '__proto__') {
+      // Keep it an own property, as JSON.parse does
+      Object.defineProperty(parent.value, parent.key, { value, writable: true, enumerable: true, configurable: true })
+    } else {
+      parent.value[parent.key] = value
+    }
+    state = 'after'
+    onValue?.(valuePath, value)
+  }
+
+  function open(kind) {
+    onOpen?.(path(), kind)
+    stack.push({ kind, value: kind === 'object' ? {} : [], key: null })
+    state = kind === 'object' ? 'keyOrEnd' : 'valueOrEnd'
+  }
+
+  function close(kind) {
+    const frame = stack.pop()
+    if (frame.kind !== kind) {
+      fail(`Unexpected '${kind === 'object' ? '}' : ']'}'`)
+      return
+    }
+    complete(frame.value)
+  }
+
+  function startValue(ch) {
+    if (ch === '{') {
+      open('object')
+    } else if (ch === '[') {
+      open('array')
+    } else if (ch === '"') {
+      stringIsKey = false
+      token = ''
+      state = 'string'
+    } else if (ch === '-' || (ch >= '0' && ch <= '9')) {
+      token = ch
+      state = 'number'
+    } else if (ch === 't' || ch === 'f' || ch === 'n') {
+      token = ch
+      state = 'literal'
+    } else {
+      fail(`Unexpected '${ch}'`)
+    }
+  }
+
+  function string(ch) {
+    if (escape !== null) {
+      if (escape === '') {
+        if (ch === 'u') {
+          escape = 'u'
+        } else if (ch in ESCAPES) {
+          token += ESCAPES[ch]
+          escape = null
+        } else {
+          fail(`Bad escape '\\${ch}'`)
+        }
+        return
+      }
+      if (!/[0-9a-fA-F]/.test(ch)) {
+        fail('Bad unicode escape')
+        return
+      }
+      escape += ch
+      if (escape.length === 5) {
+        token += String.fromCharCode(parseInt(escape.slice(1), 16))
+        escape = null
+      }
+      return
+    }
+
+    if (ch === '\\') {
+      escape = ''
+    } else if (ch === '"') {
+      if (stringIsKey) {
+        stack[stack.length - 1].key = token
+        state = 'colon'
+      } else {
+        complete(token)
+      }
+    } else if (ch < ' ') {
+      fail('Unescaped control character in string')
+    } else {
+      token += ch
+    }
+  }
+
+  function step(ch) {
+    switch (state) {
+      case 'leading':
+        if (ch === '{') {
+          open('object')
+        } else if (position >= maxLeadingChars) {
+          fail('No JSON object found')
+        }
+        return
+      case 'string':
+        string(ch)
+        return
+      case 'number':
+        if ((ch >= '0' && ch <= '9') || ch === '.' || ch === 'e' || ch === 'E' || ch === '+' || ch === '-') {
+          token += ch
+          return
+        }
+        if (!NUMBER_PATTERN.test(token)) {
+          fail(`Bad number '${token}'`)
+          return
+        }
+        complete(Number(token))
+        break
+      case 'literal': {
+        token += ch
+        const literal = Object.keys(LITERALS).find(word => word.startsWith(token))
+        if (!literal) {
+          fail(`Unexpected '${token}'`)
+        } else if (literal === token) {
+          complete(LITERALS[literal])
+        }
+        return
+      }
+      case 'done':
+        return
+    }
+
+    // Structural states; a number ends on the character after it, which is
+    // handled here too
+    if (error || isWhitespace(ch)) {
+      return
+    }
+    switch (state) {
+      case 'value':
+        startValue(ch)
+        return
+      case 'valueOrEnd':
+        if (ch === ']') {
+          close('array')
+        } else {
+          startValue(ch)
+        }
+        return
+      case 'key':
+      case 'keyOrEnd':
+        if (ch === '"') {
+          stringIsKey = true
+          token = ''
+          state = 'string'
+        } else if (ch === '}' && state === 'keyOrEnd') {
+          close('object')
+        } else {
+          fail(`Expected a property name, got '${ch}'`)
+        }
+        return
+      case 'colon':
+        if (ch === ':') {
+          state = 'value'
+        } else {
+          fail(`Expected ':', got '${ch}'`)
+        }
+        return
+      case 'after':
+        if (ch === ',') {
+          state = stack[stack.length - 1].kind === 'object' ? 'key' : 'value'
+        } else if (ch === '}') {
+          close('object')
+        } else if (ch === ']') {
+          close('array')
+        } else {
+          fail(`Expected ',' or a closing bracket, got '${ch}'`)
+        }
+        return
+    }
+  }
+
+  return {
+    // Returns false once the text can't be valid JSON
+    write(chunk) {
+      for (let i = 0; i < chunk.length && !error && state !== 'done'; i++) {
+        step(chunk[i])
+        position++
+      }
+      return !error
+    },
+    // Finish the input and return the root value
+    end() {
+      if (!error && state !== 'done') {
+        fail(state === 'leading' ? 'No JSON object found' : 'Unexpected end of JSON')
+      }
+      if (error) {
+        throw error
+      }
+      return root
+    },
+    get done() {
+      return state === 'done'
+    },
+    get error() {
+      return error
+    }
+  }
+}
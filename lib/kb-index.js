@@ -0,0 +1,198 @@
+import { createHash } from 'crypto'
+
+// Lexical retrieval index over a chatbot's knowledge base.
+//
+// The knowledge base is split into paragraph-aligned chunks and scored with
+// BM25, so each chat turn only sends the few chunks relevant to the question.
+// Chunks are identified by a hash of their text; when the knowledge base is
+// edited, unchanged chunks are reused as-is and only new text is tokenized.
+
+export const INDEX_VERSION = 1
+
+const K1 = 1.2
+const B = 0.75
+
+const STOPWORDS = new Set([
+  'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'can', 'do', 'does',
+  'for', 'from', 'has', 'have', 'how', 'i', 'if', 'in', 'is', 'it', 'its', 'me',
+  'my', 'of', 'on', 'or', 'our', 'so', 'that', 'the', 'their', 'there', 'these',
+  'this', 'to', 'was', 'we', 'what', 'when', 'where', 'which', 'who', 'why',
+  'will', 'with', 'you', 'your'
+])
+
+function stem(token) {
+  if (token.length > 4 && token.endsWith('ies')) {
+    return token.slice(0, -3) + 'y'
+  }
+  if (token.length > 3 && token.endsWith('s') && !token.endsWith('ss')) {
+    return token.slice(0, -1)
+  }
+  return token
+}
+
+export function tokenize(text) {
+  const tokens = []
+  for (const [word] of text.toLowerCase().matchAll(/[\p{L}\p{N}]+/gu)) {
+    if (!STOPWORDS.has(word)) {
+      tokens.push(stem(word))
+    }
+  }
+  return tokens
+}
+
+// Split into paragraphs, then split long paragraphs on sentence boundaries so
+// no chunk exceeds `maxWords`. Boundaries depend only on the paragraph itself,
+// which keeps edits from shifting every chunk after them.
+export function chunkText(text, { maxWords = 150 } = {}) {
+  const chunks = []
+
+  for (const paragraph of (text || '').split(/\n\s*\n/)) {
+    const sentences = paragraph.replace(/\s+/g, ' ').trim().match(/[^.!?]+[.!?]*\s*/g) || []
+    let current = []
+    let words = 0
+
+    for (const sentence of sentences) {
+      const count = sentence.split(' ').filter(Boolean).length
+      if (words && words + count > maxWords) {
+        chunks.push(current.join('').trim())
+        current = []
+        words = 0
+      }
+      current.push(sentence)
+      words += count
+    }
+
+    if (words) {
+      chunks.push(current.join('').trim())
+    }
+  }
+
+  return chunks
+}
+
+function hashChunk(text) {
+  return createHash('sha256').update(text).digest('hex').slice(0, 16)
+}
+
+function indexChunk(text) {
+  const terms = {}
+  const tokens = tokenize(text)
+  for (const token of tokens) {
+    terms[token] = (terms[token] || 0) + 1
+  }
+  return { hash: hashChunk(text), text, length: tokens.length, terms }
+}
+
+function addStats(index, chunk, sign) {
+  index.totalLength += sign * chunk.length
+  for (const term of Object.keys(chunk.terms)) {
+    const df = (index.df[term] || 0) + sign
+    if (df > 0) {
+      index.df[term] = df
+    } else {
+      delete index.df[term]
+    }
+  }
+}
+
+function fromChunks(chunks) {
+  const index = { version: INDEX_VERSION, chunks, df: {}, totalLength: 0 }
+  for (const chunk of chunks) {
+    addStats(index, chunk, 1)
+  }
+  return index
+}
+
+export function buildIndex(text, options) {
+  return fromChunks(chunkText(text, options).map(indexChunk))
+}
+
+// Re-index edited text, tokenizing only chunks whose content changed.
+// Returns the new index plus counts of added, removed and reused chunks.
+export function updateIndex(previous, text, options) {
+  // A paragraph can repeat, so each hash maps to every chunk that has it
+  const existing = new Map()
+  for (const chunk of previous.chunks) {
+    existing.set(chunk.hash, [...existing.get(chunk.hash) || [], chunk])
+  }
+  const index = { version: INDEX_VERSION, chunks: [], df: { ...previous.df }, totalLength: previous.totalLength }
+  let added = 0
+  let reused = 0
+
+  for (const content of chunkText(text, options)) {
+    const hash = hashChunk(content)
+    const matches = existing.get(hash)
+    if (matches?.length) {
+      index.chunks.push(matches.shift())
+      reused++
+    } else {
+      const chunk = indexChunk(content)
+      index.chunks.push(chunk)
+      addStats(index, chunk, 1)
+      added++
+    }
+  }
+
+  // Whatever is left in `existing` no longer appears in the text
+  let removed = 0
+  for (const chunks of existing.values()) {
+    for (const chunk of chunks) {
+      addStats(index, chunk, -1)
+      removed++
+    }
+  }
+
+  return { index, added, removed, reused }
+}
+
+// Return the `k` best chunks for `query` in document order. When nothing in
+// the query matches, fall back to the opening chunks, which usually describe
+// what the knowledge base is about.
+export function searchIndex(index, query, { k = 4 } = {}) {
+  const count = index.chunks.length
+  if (!count) {
+    return []
+  }
+
+  const avgLength = index.totalLength / count || 1
+  const terms = [...new Set(tokenize(query))].filter(term => index.df[term])
+
+  const scored = index.chunks.map((chunk, position) => {
+    let score = 0
+    for (const term of terms) {
+      const tf = chunk.terms[term]
+      if (tf) {
+        const df = index.df[term]
+        const idf = Math.log(1 + (count - df + 0.5) / (df + 0.5))
+        score += idf * (tf * (K1 + 1)) / (tf + K1 * (1 - B + B * chunk.length / avgLength))
+      }
+    }
+    return { text: chunk.text, score, position }
+  })
+
+  const matches = scored.filter(result => result.score > 0)
+  const selected = matches.length
+    ? matches.sort((a, b) => b.score - a.score).slice(0, k)
+    : scored.slice(0, k)
+
+  return selected.sort((a, b) => a.position - b.position)
+}
+
+export function indexSummary(index) {
+  return { version: index.version, chunks: index.chunks.length, terms: Object.keys(index.df).length }
+}
+
+// Document frequencies are derived from the chunks, so only chunks are stored
+export function serializeIndex(index) {
+  return {
+    version: index.version,
+    chunks: index.chunks.map(({ hash, text, length, terms }) => ({ hash, text, length, terms }))
+  }
+}
+
+export function deserializeIndex(data) {
+  if (!data?.chunks || data.version !== INDEX_VERSION) {
+    return null
+  }
+  return fromChunks(data.chunks)
+}
@@ -0,0 +1,152 @@
+// Single-flight coalescing for identical in-flight LLM calls.
+//
+// Concurrent callers with the same key share one upstream call. For streams,
+// chunks are buffered and broadcast, so a caller that joins mid-stream first
+// replays what it missed and then follows along live. A caller that aborts
+// only detaches itself; the upstream call is cancelled once every caller has
+// gone. Nothing is kept after the call settles — this is not a cache.
+
+export function createCoalescer() {
+  const calls = new Map()
+  const streams = new Map()
+  const stats = { coalescedCalls: 0, coalescedStreams: 0 }
+
+  // Wait for `promise`, rejecting early if `signal` aborts
+  function follow(promise, signal) {
+    if (!signal) {
+      return promise
+    }
+    return new Promise((resolve, reject) => {
+      if (signal.aborted) {
+        reject(signal.reason)
+        return
+      }
+      const onAbort = () => reject(signal.reason)
+      signal.addEventListener('abort', onAbort, { once: true })
+      promise.then(resolve, reject).finally(() => signal.removeEventListener('abort', onAbort))
+    })
+  }
+
+  // `start(signal)` runs the upstream call and resolves with its result
+  async function call(key, start, { signal } = {}) {
+    let shared = calls.get(key)
+    if (shared) {
+      stats.coalescedCalls++
+    } else {
+      const controller = new AbortController()
+      shared = { controller, callers: 0 }
+      shared.promise = start(controller.signal).finally(() => {
+        if (calls.get(key) === shared) {
+          calls.delete(key)
+        }
+      })
+      // Callers may all abort before it settles; don't leave it unhandled
+      shared.promise.catch(() => {})
+      calls.set(key, shared)
+    }
+
+    shared.callers++
+    try {
+      return await follow(shared.promise, signal)
+    } finally {
+      shared.callers--
+      if (shared.callers === 0 && calls.get(key) === shared) {
+        calls.delete(key)
+        shared.controller.abort(new Error('All callers disconnected'))
+      }
+    }
+  }
+
+  function openStream(key, open) {
+    const controller = new AbortController()
+    const shared = { controller, chunks: [], waiters: new Set(), done: false, error: null, usage: null, consumers: 0 }
+    const notify = () => {
+      for (const wake of [...shared.waiters]) {
+        wake()
+      }
+    }
+
+    ;(async () => {
+      try {
+        const source = open(controller.signal)
+        for await (const chunk of source) {
+          shared.chunks.push(chunk)
+          notify()
+        }
+        shared.usage = source.usage ?? null
+      } catch (error) {
+        shared.error = error
+      } finally {
+        shared.done = true
+        if (streams.get(key) === shared) {
+          streams.delete(key)
+        }
+        notify()
+      }
+    })()
+
+    return shared
+  }
+
+  // `open(signal)` returns an async iterable of chunks, optionally exposing
+  // `usage` once finished. Returns an iterable with the same shape.
+  function stream(key, open, { signal } = {}) {
+    const result = { usage: null }
+
+    result[Symbol.asyncIterator] = async function* () {
+      let shared = streams.get(key)
+      if (shared) {
+        stats.coalescedStreams++
+      } else {
+        shared = openStream(key, open)
+        streams.set(key, shared)
+      }
+
+      shared.consumers++
+      try {
+        for (let next = 0; ; ) {
+          if (signal?.aborted) {
+            throw signal.reason
+          }
+          if (next < shared.chunks.length) {
+            yield shared.chunks[next++]
+            continue
+          }
+          if (shared.done) {
+            if (shared.error) {
+              throw shared.error
+            }
+            result.usage = shared.usage
+            return
+          }
+
+          await new Promise(resolve => {
+            const wake = () => {
+              shared.waiters.delete(wake)
+              signal?.removeEventListener('abort', wake)
+              resolve()
+            }
+            shared.waiters.add(wake)
+            signal?.addEventListener('abort', wake, { once: true })
+          })
+        }
+      } finally {
+        shared.consumers--
+        if (shared.consumers === 0 && !shared.done) {
+          if (streams.get(key) === shared) {
+            streams.delete(key)
+          }
+          shared.controller.abort(new Error('All consumers disconnected'))
+        }
+      }
+    }
+
+    return result
+  }
+
+  return {
+    call,
+    stream,
+    stats: () => ({ ...stats, sharedCalls: calls.size, sharedStreams: streams.size })
+  }
+}
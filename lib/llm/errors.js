@@ -0,0 +1,31 @@
+// Errors raised by the LLM layer itself (as opposed to upstream provider
+// errors). `status` is the HTTP status the API should respond with.
+export class LlmError extends Error {
+  constructor(message, status) {
+    super(message)
+    this.name = 'LlmError'
+    this.status = status
+  }
+}
+
+export class OverloadedError extends LlmError {
+  constructor(message) {
+    super(message, 503)
+    this.name = 'OverloadedError'
+  }
+}
+
+export class TimeoutError extends LlmError {
+  constructor(message) {
+    super(message, 504)
+    this.name = 'TimeoutError'
+  }
+}
+
+// The prompt plus the completion budget would not fit the model's context window
+export class PromptTooLargeError extends LlmError {
+  constructor(message) {
+    super(message, 413)
+    this.name = 'PromptTooLargeError'
+  }
+}
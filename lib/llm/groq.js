@@ -0,0 +1,59 @@
+import http from 'http'
+import https from 'https'
+
+// Groq chat completions provider. Retries and deadlines are handled by the
+// client wrapper, so the SDK's own retry loop is disabled. The SDK is imported
+// with the first call, keeping it off the cold-start path of routes that
+// never reach the LLM.
+export function createGroqProvider({
+  apiKey = process.env.GROQ_API_KEY,
+  baseURL = process.env.GROQ_BASE_URL,
+  maxSockets = 32
+} = {}) {
+  let client = null
+
+  function getClient() {
+    if (!client) {
+      client = import('groq-sdk').then(({ default: Groq }) => {
+        // GROQ_BASE_URL may point at a plain-http stand-in (see replay_server.py)
+        const Agent = baseURL?.startsWith('http:') ? http.Agent : https.Agent
+        return new Groq({
+          apiKey,
+          ...(baseURL ? { baseURL } : {}),
+          maxRetries: 0,
+          // Reuse TLS connections across requests instead of a handshake per call
+          httpAgent: new Agent({ keepAlive: true, maxSockets })
+        })
+      })
+    }
+    return client
+  }
+
+  return {
+    name: 'groq',
+
+    isConfigured() {
+      return !!apiKey && apiKey.startsWith('gsk_')
+    },
+
+    async chat(body, { signal, timeout }) {
+      const completion = await (await getClient()).chat.completions.create(body, { signal, timeout })
+      return {
+        content: completion.choices[0]?.message?.content || '',
+        usage: completion.usage || null
+      }
+    },
+
+    async *stream(body, { signal, timeout }) {
+      const stream = await (await getClient()).chat.completions.create({ ...body, stream: true }, { signal, timeout })
+      for await (const chunk of stream) {
+        const content = chunk.choices[0]?.delta?.content
+        // Groq reports usage on the final chunk
+        const usage = chunk.x_groq?.usage
+        if (content || usage) {
+          yield { content, usage }
+        }
+      }
+    }
+  }
+}
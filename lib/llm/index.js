@@ -0,0 +1,240 @@
+import { createHash } from 'crypto'
+import { createGroqProvider } from './groq'
+import { createCoalescer } from './coalesce'
+import { createMockProvider } from './mock'
+import { createSemaphore } from './semaphore'
+import { LlmError, TimeoutError } from './errors'
+
+export { LlmError, OverloadedError, PromptTooLargeError, TimeoutError } from './errors'
+
+export const DEFAULT_MODEL = 'llama3-70b-8192'
+
+// Client wrapper shared by every LLM call in the API.
+//
+// - `maxInFlight` calls run at once; the rest wait in a bounded queue.
+// - Each call has a deadline covering queueing, all attempts and, for streams,
+//   the whole stream.
+// - 429, 5xx and connection failures are retried with full-jitter backoff,
+//   honouring Retry-After when the provider sends it. Streams are only retried
+//   before the first token arrives.
+// - Identical requests already in flight share one upstream call (`coalesce`).
+
+export function createProvider(name) {
+  if (name === 'mock') {
+    return createMockProvider()
+  }
+  return createGroqProvider()
+}
+
+function isRetryable(error) {
+  if (error instanceof LlmError) {
+    return false
+  }
+  if (error.status) {
+    return error.status === 429 || error.status >= 500
+  }
+  // Connection resets and DNS failures carry no status
+  return error.name === 'APIConnectionError' || ['ECONNRESET', 'ETIMEDOUT', 'ECONNREFUSED', 'EAI_AGAIN'].includes(error.code)
+}
+
+function sleep(ms, signal) {
+  return new Promise((resolve, reject) => {
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(signal.reason)
+    }
+    const timer = setTimeout(() => {
+      signal.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+    signal.addEventListener('abort', onAbort, { once: true })
+  })
+}
+
+function aborted(signal) {
+  return new Promise((resolve, reject) => {
+    if (signal.aborted) {
+      reject(signal.reason)
+    } else {
+      signal.addEventListener('abort', () => reject(signal.reason), { once: true })
+    }
+  })
+}
+
+// Combine the caller's abort signal with a deadline
+function withDeadline(signal, timeoutMs) {
+  const controller = new AbortController()
+  const timer = setTimeout(() => {
+    controller.abort(new TimeoutError(`LLM request timed out after ${timeoutMs}ms`))
+  }, timeoutMs)
+  const onAbort = () => controller.abort(signal.reason)
+
+  if (signal) {
+    if (signal.aborted) {
+      onAbort()
+    } else {
+      signal.addEventListener('abort', onAbort, { once: true })
+    }
+  }
+
+  return {
+    signal: controller.signal,
+    clear() {
+      clearTimeout(timer)
+      signal?.removeEventListener('abort', onAbort)
+    }
+  }
+}
+
+export function createLlmClient({
+  provider,
+  model = DEFAULT_MODEL,
+  timeoutMs = 30000,
+  maxAttempts = 3,
+  baseBackoffMs = 250,
+  maxBackoffMs = 4000,
+  maxInFlight = 16,
+  maxQueue = 100,
+  queueTimeoutMs = 10000,
+  coalesce = true
+}) {
+  const semaphore = createSemaphore({ maxInFlight, maxQueue, queueTimeoutMs })
+  const coalescer = createCoalescer()
+  const stats = { calls: 0, streams: 0, retries: 0, errors: 0, timeouts: 0 }
+
+  function retryDelay(error, attempt) {
+    const retryAfter = parseFloat(error.headers?.['retry-after'])
+    if (retryAfter >= 0) {
+      return Math.min(retryAfter * 1000, maxBackoffMs)
+    }
+    return Math.random() * Math.min(baseBackoffMs * 2 ** (attempt - 1), maxBackoffMs)
+  }
+
+  // Run `attemptFn` with retries inside an already-acquired deadline
+  async function withRetries(attemptFn, deadline) {
+    for (let attempt = 1; ; attempt++) {
+      try {
+        return await attemptFn()
+      } catch (error) {
+        if (deadline.signal.aborted) {
+          throw deadline.signal.reason
+        }
+        if (attempt >= maxAttempts || !isRetryable(error)) {
+          throw error
+        }
+        stats.retries++
+        await sleep(retryDelay(error, attempt), deadline.signal)
+      }
+    }
+  }
+
+  // Wait for a slot, giving up when the deadline passes
+  async function acquire(deadline) {
+    const acquiring = semaphore.acquire()
+    try {
+      return await Promise.race([acquiring, aborted(deadline.signal)])
+    } catch (error) {
+      // Hand the slot straight back if it is granted after we stopped waiting
+      acquiring.then(release => release(), () => {})
+      throw error
+    }
+  }
+
+  function track(error) {
+    stats.errors++
+    if (error instanceof TimeoutError) {
+      stats.timeouts++
+    }
+    return error
+  }
+
+  function coalesceKey(body) {
+    return createHash('sha256').update(JSON.stringify(body)).digest('hex')
+  }
+
+  async function chat(request, { signal, timeoutMs: callTimeoutMs = timeoutMs } = {}) {
+    const body = { model, ...request }
+    stats.calls++
+
+    if (!coalesce) {
+      return upstreamChat(body, signal, callTimeoutMs)
+    }
+    return coalescer.call(coalesceKey(body), sharedSignal => upstreamChat(body, sharedSignal, callTimeoutMs), { signal })
+  }
+
+  async function upstreamChat(body, signal, callTimeoutMs) {
+    const deadline = withDeadline(signal, callTimeoutMs)
+
+    let release
+    try {
+      release = await acquire(deadline)
+      return await withRetries(() => provider.chat(body, { signal: deadline.signal }), deadline)
+    } catch (error) {
+      throw track(error)
+    } finally {
+      deadline.clear()
+      release?.()
+    }
+  }
+
+  // Returns an async iterable of text deltas. Once iteration finishes,
+  // `usage` holds the provider's token counts when available.
+  function chatStream(request, { signal, timeoutMs: callTimeoutMs = timeoutMs } = {}) {
+    const body = { model, ...request }
+    stats.streams++
+
+    if (!coalesce) {
+      return upstreamStream(body, signal, callTimeoutMs)
+    }
+    return coalescer.stream(coalesceKey(body), sharedSignal => upstreamStream(body, sharedSignal, callTimeoutMs), { signal })
+  }
+
+  function upstreamStream(body, signal, callTimeoutMs) {
+    const result = { usage: null }
+
+    result[Symbol.asyncIterator] = async function* () {
+      const deadline = withDeadline(signal, callTimeoutMs)
+      let release
+      let iterator
+
+      try {
+        release = await acquire(deadline)
+
+        // Retry only until the first chunk arrives; after that, tokens have
+        // already been forwarded to the client
+        let next = await withRetries(async () => {
+          iterator = provider.stream(body, { signal: deadline.signal })[Symbol.asyncIterator]()
+          return iterator.next()
+        }, deadline)
+
+        while (!next.done) {
+          const { content, usage } = next.value
+          if (usage) {
+            result.usage = usage
+          }
+          if (content) {
+            yield content
+          }
+          next = await iterator.next()
+        }
+      } catch (error) {
+        throw track(deadline.signal.aborted ? deadline.signal.reason : error)
+      } finally {
+        deadline.clear()
+        release?.()
+        await iterator?.return?.()
+      }
+    }
+
+    return result
+  }
+
+  return {
+    name: provider.name,
+    model,
+    isConfigured: () => provider.isConfigured(),
+    chat,
+    chatStream,
+    stats: () => ({ ...stats, ...semaphore.stats(), ...coalescer.stats() })
+  }
+}
@@ -0,0 +1,135 @@
+import { createHash } from 'crypto'
+
+// Deterministic local provider for offline development and load testing.
+//
+// The same messages always produce the same output. Latency is simulated with
+// a fixed time-to-first-token plus a steady token rate, so benchmarks against
+// the mock measure our own overhead rather than upstream variance.
+
+const WORDS = [
+  'streamlined', 'reliable', 'customer', 'workflow', 'insight', 'automated',
+  'practical', 'growth', 'simple', 'team', 'launch', 'support', 'daily',
+  'clear', 'secure', 'modern', 'focused', 'quality', 'plan', 'result'
+]
+
+function sleep(ms, signal) {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(signal.reason || new Error('Aborted'))
+      return
+    }
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(signal.reason || new Error('Aborted'))
+    }
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+    signal?.addEventListener('abort', onAbort, { once: true })
+  })
+}
+
+// A workflow prompt containing this gets output whose first node breaks the
+// schema, followed by more nodes, until the model is asked to repair it. It
+// lets tests see invalid output rejected before the stream ends.
+export const INVALID_WORKFLOW_MARKER = '[invalid workflow]'
+
+function mockInvalidWorkflow(seed) {
+  return JSON.stringify({
+    name: `Mock workflow ${seed.slice(0, 8)}`,
+    nodes: [
+      { name: 'Trigger', typeVersion: 1, position: [250, 300], parameters: {} },
+      ...Array.from({ length: 20 }, (_, i) => ({
+        name: `Unreached ${i + 1}`, type: 'n8n-nodes-base.noOp', typeVersion: 1, position: [450 + i * 200, 300], parameters: {}
+      }))
+    ],
+    connections: {}
+  }, null, 2)
+}
+
+function mockWorkflow(system, seed) {
+  if (system.includes('n8n')) {
+    return JSON.stringify({
+      name: `Mock workflow ${seed.slice(0, 8)}`,
+      nodes: [
+        { name: 'Trigger', type: 'n8n-nodes-base.webhook', typeVersion: 1, position: [250, 300], parameters: { path: seed.slice(0, 12) } },
+        { name: 'Action', type: 'n8n-nodes-base.httpRequest', typeVersion: 1, position: [450, 300], parameters: { url: 'https://example.com' } }
+      ],
+      connections: {
+        Trigger: { main: [[{ node: 'Action', type: 'main', index: 0 }]] }
+      }
+    }, null, 2)
+  }
+
+  return JSON.stringify({
+    name: `Mock scenario ${seed.slice(0, 8)}`,
+    flow: [
+      { id: 1, module: 'gateway:CustomWebHook', version: 1, parameters: {}, mapper: {} },
+      { id: 2, module: 'http:ActionSendData', version: 3, parameters: {}, mapper: { url: 'https://example.com' } }
+    ],
+    metadata: { version: 1 }
+  }, null, 2)
+}
+
+function mockText(seed, maxTokens) {
+  const count = Math.min(maxTokens || 200, 40 + (parseInt(seed.slice(0, 4), 16) % 80))
+  const words = []
+  let bytes = seed
+  for (let i = 0; i < count; i++) {
+    if (i > 0 && i % 32 === 0) {
+      bytes = createHash('sha256').update(bytes).digest('hex')
+    }
+    words.push(WORDS[parseInt(bytes.slice((i % 32) * 2, (i % 32) * 2 + 2), 16) % WORDS.length])
+  }
+  return `Mock response: ${words.join(' ')}.`
+}
+
+export function createMockProvider({
+  firstTokenMs = parseInt(process.env.LLM_MOCK_FIRST_TOKEN_MS || '50', 10),
+  tokensPerSecond = parseInt(process.env.LLM_MOCK_TOKENS_PER_SEC || '500', 10)
+} = {}) {
+  function generate(body) {
+    const system = body.messages.find(m => m.role === 'system')?.content || ''
+    const seed = createHash('sha256').update(JSON.stringify(body.messages)).digest('hex')
+    const isWorkflow = /workflow/i.test(system) && /JSON/.test(system)
+    const invalid = isWorkflow && !body.messages.some(m => m.role === 'assistant') &&
+      body.messages.some(m => m.role === 'user' && m.content.includes(INVALID_WORKFLOW_MARKER))
+    const content = invalid
+      ? mockInvalidWorkflow(seed)
+      : isWorkflow ? mockWorkflow(system, seed) : mockText(seed, body.max_tokens)
+    const promptTokens = Math.ceil(JSON.stringify(body.messages).length / 4)
+    const completionTokens = Math.ceil(content.length / 4)
+    return {
+      content,
+      usage: { prompt_tokens: promptTokens, completion_tokens: completionTokens, total_tokens: promptTokens + completionTokens }
+    }
+  }
+
+  return {
+    name: 'mock',
+
+    isConfigured() {
+      return true
+    },
+
+    async chat(body, { signal }) {
+      const result = generate(body)
+      await sleep(firstTokenMs + (result.usage.completion_tokens / tokensPerSecond) * 1000, signal)
+      return result
+    },
+
+    async *stream(body, { signal }) {
+      const { content, usage } = generate(body)
+      const pieces = content.match(/\S+\s*|\s+/g) || []
+      const delay = 1000 / tokensPerSecond
+
+      await sleep(firstTokenMs, signal)
+      for (const piece of pieces) {
+        yield { content: piece }
+        await sleep(delay, signal)
+      }
+      yield { usage }
+    }
+  }
+}
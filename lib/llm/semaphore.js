@@ -0,0 +1,64 @@
+import { OverloadedError } from './errors'
+
+// Counting semaphore with a bounded FIFO wait queue.
+//
+// `acquire()` resolves with a release function once a slot is free. Waiters
+// beyond `maxQueue`, or waiting longer than `queueTimeoutMs`, are rejected
+// with an OverloadedError (503) so callers can shed load instead of piling up.
+
+export function createSemaphore({ maxInFlight, maxQueue = Infinity, queueTimeoutMs = Infinity }) {
+  let inFlight = 0
+  const waiters = []
+  const stats = { acquired: 0, queued: 0, rejected: 0 }
+
+  function release() {
+    const next = waiters.shift()
+    if (next) {
+      clearTimeout(next.timer)
+      next.resolve(once())
+    } else {
+      inFlight--
+    }
+  }
+
+  function once() {
+    let released = false
+    stats.acquired++
+    return () => {
+      if (!released) {
+        released = true
+        release()
+      }
+    }
+  }
+
+  function acquire() {
+    if (inFlight < maxInFlight) {
+      inFlight++
+      return Promise.resolve(once())
+    }
+
+    if (waiters.length >= maxQueue) {
+      stats.rejected++
+      return Promise.reject(new OverloadedError('Too many concurrent LLM requests'))
+    }
+
+    stats.queued++
+    return new Promise((resolve, reject) => {
+      const waiter = { resolve, timer: null }
+      if (Number.isFinite(queueTimeoutMs)) {
+        waiter.timer = setTimeout(() => {
+          waiters.splice(waiters.indexOf(waiter), 1)
+          stats.rejected++
+          reject(new OverloadedError('Timed out waiting for an LLM slot'))
+        }, queueTimeoutMs)
+      }
+      waiters.push(waiter)
+    })
+  }
+
+  return {
+    acquire,
+    stats: () => ({ ...stats, inFlight, waiting: waiters.length })
+  }
+}
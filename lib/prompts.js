@@ -0,0 +1,168 @@
+import { PromptTooLargeError } from './llm/errors'
+
+// Compiled prompt templates.
+//
+// Every prompt the API sends is defined here once, with a version that goes
+// into cache keys, and compiled at module load into static segments and
+// `{{variable}}` slots. Token counts for the static segments are precomputed,
+// so a request's size is known before anything is sent.
+//
+// Templates keep everything that doesn't change per request in the system
+// message and put the request-specific text last. Providers that cache
+// prompt prefixes then reuse the whole system message across requests for
+// the same agent or chatbot.
+
+const ASSISTANT = 'You are a helpful AI assistant. Provide clear, actionable, and professional responses.'
+
+const agent = (task) => ({ version: 2, system: `${ASSISTANT}\n\n${task}`, user: '{{input}}' })
+
+export const PROMPT_TEMPLATES = {
+  'agent.resume': agent("Create a professional resume based on the information in the user's message. Format it properly with sections for Contact Information, Professional Summary, Experience, Education, and Skills."),
+  'agent.product': agent("Create a compelling product description for the product in the user's message. Include key features, benefits, and a call-to-action."),
+  'agent.email': agent("Summarize the email content in the user's message. Provide key points and action items."),
+  'agent.pdf': agent("Explain the PDF content in the user's message. Break it down into key concepts and main points."),
+  'agent.instagram': agent("Create engaging Instagram captions for the subject in the user's message. Include relevant hashtags and emojis."),
+  'agent.social': agent("Create a social media content calendar for the subject in the user's message. Suggest post ideas, timing, and platforms."),
+  'agent.business': agent("Generate creative business names for the idea in the user's message. Provide 10 options with brief explanations."),
+  'agent.support': agent("Provide a customer support response to the user's message. Be helpful, professional, and solution-oriented."),
+  'agent.medical': agent("Explain the medical symptoms in the user's message. Provide general information only, not medical advice."),
+  'agent.travel': agent("Create a travel itinerary for the trip in the user's message. Include attractions, accommodations, and logistics."),
+  'agent.chatbot': agent("Create a custom chatbot script for the use case in the user's message. Define conversation flows and responses."),
+  'agent.legal': agent("Simplify the legal document in the user's message. Explain it in plain language."),
+  'agent.linkedin': agent("Create a professional LinkedIn bio for the person in the user's message. Highlight achievements and skills."),
+  'agent.whatsapp': agent("Format the user's message for WhatsApp. Make it clear and engaging."),
+  'agent.planner': agent("Create a daily planner for the user's message. Include tasks, priorities, and time blocks."),
+  'agent.default': agent("Process the request in the user's message."),
+
+  'chatbot': {
+    version: 2,
+    system: 'You are a helpful chatbot assistant. Answer questions using the knowledge base excerpts sent with each question. If the question is not covered in the knowledge base, provide a helpful general response and suggest contacting support for specific inquiries.\n\nYour name is {{name}}.',
+    user: 'Knowledge base excerpts:\n\n{{knowledge}}\n\nQuestion: {{message}}'
+  },
+  'chatbot.summary': {
+    version: 1,
+    system: 'Summarize this support chat in a few sentences. Keep names, facts, requests and open questions the assistant may need later.',
+    user: '{{transcript}}'
+  },
+
+  // The shapes described here are what lib/workflow-schema.js accepts
+  'workflow.n8n': {
+    version: 2,
+    system: 'You are an expert n8n workflow generator. Create a complete n8n workflow JSON configuration based on the user\'s request. Include all necessary nodes, connections, and configurations. Return only valid JSON in n8n\'s import format: an object with a "name", a "nodes" array and a "connections" object. Every node needs a unique "name", a "type" such as "n8n-nodes-base.httpRequest", a numeric "typeVersion", a "position" of [x, y] and a "parameters" object. "connections" maps a source node\'s name to {"main": [[{"node": "<target node name>", "type": "main", "index": 0}]]}, and only uses names of nodes in "nodes".',
+    user: 'Create a {{type}} workflow for: {{prompt}}'
+  },
+  'workflow.make': {
+    version: 2,
+    system: 'You are an expert Make.com workflow generator. Create a complete Make.com scenario JSON configuration based on the user\'s request. Include all necessary modules, connections, and configurations. Return only valid JSON in Make\'s blueprint format: an object with a "name", a "flow" array of modules and a "metadata" object. Modules run in the order listed. Each module needs a unique integer "id", a "module" such as "google-sheets:watchRows", and "parameters" and "mapper" objects. To branch, use a "builtin:BasicRouter" module whose "routes" array holds objects with their own "flow" array of modules.',
+    user: 'Create a {{type}} workflow for: {{prompt}}'
+  },
+  // Follow-up turn asking the model to fix output that didn't parse
+  'workflow.repair': {
+    version: 1,
+    system: '',
+    user: 'That response was not valid workflow JSON ({{error}}). Reply with only the complete, corrected JSON.'
+  }
+}
+
+// Chat formats add a few tokens of framing per message
+const MESSAGE_OVERHEAD_TOKENS = 4
+
+// Conservative estimate without a tokenizer: a token per 4 characters of each
+// word, plus one per punctuation mark or symbol
+export function estimateTokens(text) {
+  let tokens = 0
+  for (const [match] of String(text).matchAll(/\w+|[^\w\s]/g)) {
+    tokens += Math.ceil(match.length / 4)
+  }
+  return tokens
+}
+
+export function estimateMessageTokens(messages) {
+  return messages.reduce((sum, message) => sum + MESSAGE_OVERHEAD_TOKENS + estimateTokens(message.content), 0)
+}
+
+export function compileTemplate(source) {
+  const parts = source.split(/\{\{(\w+)\}\}/)
+  // Even indexes are static text, odd indexes are variable names
+  const statics = parts.filter((_, i) => i % 2 === 0)
+  const variables = parts.filter((_, i) => i % 2 === 1)
+  const staticTokens = statics.reduce((sum, text) => sum + estimateTokens(text), 0)
+
+  return {
+    source,
+    variables,
+    staticTokens,
+    render(values = {}) {
+      let text = statics[0]
+      let tokens = staticTokens
+      for (let i = 0; i < variables.length; i++) {
+        const value = String(values[variables[i]] ?? '')
+        text += value + statics[i + 1]
+        tokens += estimateTokens(value)
+      }
+      return { text, tokens }
+    }
+  }
+}
+
+// Context window of a model, from a size suffix such as `llama3-70b-8192`
+export function contextWindowFor(model, fallback = 8192) {
+  const match = /-(\d{4,7})$/.exec(model || '')
+  return match ? parseInt(match[1], 10) : fallback
+}
+
+export function createPromptRegistry({ templates = PROMPT_TEMPLATES, contextWindow = 8192 } = {}) {
+  const compiled = new Map()
+  for (const [id, template] of Object.entries(templates)) {
+    compiled.set(id, {
+      id,
+      version: template.version,
+      key: `${id}@${template.version}`,
+      system: compileTemplate(template.system),
+      user: compileTemplate(template.user)
+    })
+  }
+
+  function get(id) {
+    const template = compiled.get(id)
+    if (!template) {
+      throw new Error(`Unknown prompt template: ${id}`)
+    }
+    return template
+  }
+
+  // Render a template's system and user messages. `tokens` estimates the
+  // prompt size including message framing.
+  function render(id, values) {
+    const template = get(id)
+    const system = template.system.render(values)
+    const user = template.user.render(values)
+    return {
+      key: template.key,
+      system: system.text,
+      user: user.text,
+      messages: [
+        { role: 'system', content: system.text },
+        { role: 'user', content: user.text }
+      ],
+      tokens: system.tokens + user.tokens + 2 * MESSAGE_OVERHEAD_TOKENS
+    }
+  }
+
+  // Reject a request whose prompt plus completion budget can't fit the model
+  function assertFits(promptTokens, maxTokens) {
+    if (promptTokens + maxTokens > contextWindow) {
+      throw new PromptTooLargeError(
+        `Request is too long: about ${promptTokens} prompt tokens plus ${maxTokens} for the reply exceeds the ${contextWindow}-token context window`
+      )
+    }
+  }
+
+  return {
+    has: (id) => compiled.has(id),
+    get,
+    render,
+    assertFits,
+    contextWindow
+  }
+}
@@ -0,0 +1,197 @@
+// Token-bucket rate limiting for the API edge.
+//
+// Each subject (e.g. `user:<id>`, `chatbot:<id>`, `ip:<addr>`) gets a bucket
+// that holds up to `capacity` tokens and refills continuously at
+// `refillPerSec`. A check is a few Map operations and never awaits, so it adds
+// microseconds to a request. Idle buckets are evicted least recently used
+// first once `maxKeys` is reached.
+//
+// With a shared `backend`, each instance periodically pushes what it consumed
+// and subtracts what other instances consumed from its local buckets, so the
+// limit holds across instances up to one sync interval of slack.
+
+export function rateLimit(count, windowMs) {
+  return count > 0 ? { capacity: count, refillPerSec: count / (windowMs / 1000) } : null
+}
+
+export function createRateLimiter({
+  name = 'requests',
+  limits,
+  maxKeys = 100000,
+  backend = null,
+  syncIntervalMs = 1000,
+  now = Date.now
+}) {
+  // Map iteration order is insertion order, so the first key is the LRU bucket
+  const buckets = new Map()
+  const stats = { allowed: 0, limited: 0, syncErrors: 0 }
+
+  function bucket(key, limit, t) {
+    let b = buckets.get(key)
+    if (b) {
+      buckets.delete(key)
+      b.tokens = Math.min(limit.capacity, b.tokens + (t - b.updatedAt) / 1000 * limit.refillPerSec)
+      b.updatedAt = t
+    } else {
+      b = { tokens: limit.capacity, capacity: limit.capacity, updatedAt: t, pending: 0, syncedTotal: null }
+      if (buckets.size >= maxKeys) {
+        buckets.delete(buckets.keys().next().value)
+      }
+    }
+    buckets.set(key, b)
+    return b
+  }
+
+  function resolve(subjects, t) {
+    const resolved = []
+    for (const scope in subjects) {
+      const limit = limits[scope]
+      const id = subjects[scope]
+      if (limit && id != null && id !== '') {
+        resolved.push({ scope, limit, bucket: bucket(`${scope}:${id}`, limit, t) })
+      }
+    }
+    return resolved
+  }
+
+  function debit(resolved, cost) {
+    for (const { bucket: b } of resolved) {
+      b.tokens -= cost
+      b.pending += cost
+    }
+  }
+
+  // Take `cost` tokens from every subject's bucket, or none if any of them is
+  // short. A cost of 0 only checks that no bucket is in debt.
+  function check(subjects, cost = 1) {
+    const resolved = resolve(subjects, now())
+    let retryAfterMs = 0
+    let limitedBy = null
+
+    for (const { scope, limit, bucket: b } of resolved) {
+      if (b.tokens < cost) {
+        const wait = (cost - b.tokens) / limit.refillPerSec * 1000
+        if (wait > retryAfterMs) {
+          retryAfterMs = wait
+          limitedBy = scope
+        }
+      }
+    }
+
+    if (limitedBy) {
+      stats.limited++
+      return { allowed: false, scope: limitedBy, retryAfterMs: Math.ceil(retryAfterMs) }
+    }
+
+    debit(resolved, cost)
+    stats.allowed++
+    return { allowed: true }
+  }
+
+  // Take `cost` tokens unconditionally; buckets may go into debt
+  function charge(subjects, cost) {
+    if (cost > 0) {
+      debit(resolve(subjects, now()), cost)
+    }
+  }
+
+  async function sync() {
+    // Full buckets with nothing to push can't be limited yet, so skip them
+    const active = [...buckets].filter(([, b]) => b.pending > 0 || b.tokens < b.capacity)
+    if (!active.length) {
+      return
+    }
+
+    const deltas = active.map(([key, b]) => {
+      const delta = b.pending
+      b.pending = 0
+      return { key: `${name}:${key}`, delta }
+    })
+
+    let totals
+    try {
+      totals = await backend.sync(deltas)
+    } catch (error) {
+      stats.syncErrors++
+      // Put the deltas back so they are pushed on the next attempt
+      active.forEach(([, b], i) => {
+        b.pending += deltas[i].delta
+      })
+      console.log('Rate limit sync failed:', error.message)
+      return
+    }
+
+    active.forEach(([, b], i) => {
+      const total = totals.get(deltas[i].key)
+      if (total === undefined) {
+        return
+      }
+      if (b.syncedTotal !== null) {
+        // Whatever the total grew by beyond our own delta was used elsewhere
+        b.tokens -= Math.max(0, total - b.syncedTotal - deltas[i].delta)
+      }
+      b.syncedTotal = total
+    })
+  }
+
+  if (backend) {
+    let syncing = null
+    setInterval(() => {
+      if (!syncing) {
+        syncing = sync().finally(() => {
+          syncing = null
+        })
+      }
+    }, syncIntervalMs).unref?.()
+  }
+
+  return {
+    check,
+    charge,
+    stats: () => ({ ...stats, buckets: buckets.size })
+  }
+}
+
+// Shared backend storing a running consumption total per key in MongoDB.
+// Documents expire after `ttlMs` without activity.
+export function createMongoRateLimitBackend({ url, collectionName = 'rate_limits', ttlMs = 60 * 60 * 1000 }) {
+  let collectionPromise = null
+
+  function getCollection() {
+    if (!collectionPromise) {
+      collectionPromise = (async () => {
+        const { MongoClient } = await import('mongodb')
+        const client = new MongoClient(url, { maxPoolSize: 2 })
+        await client.connect()
+        const collection = client.db().collection(collectionName)
+        await collection.createIndex({ expiresAt: 1 }, { expireAfterSeconds: 0 })
+        return collection
+      })().catch(error => {
+        collectionPromise = null
+        throw error
+      })
+    }
+    return collectionPromise
+  }
+
+  return {
+    async sync(deltas) {
+      const collection = await getCollection()
+      const expiresAt = new Date(Date.now() + ttlMs)
+
+      const writes = deltas.filter(({ delta }) => delta > 0).map(({ key, delta }) => ({
+        updateOne: {
+          filter: { _id: key },
+          update: { $inc: { consumed: delta }, $set: { expiresAt } },
+          upsert: true
+        }
+      }))
+      if (writes.length) {
+        await collection.bulkWrite(writes, { ordered: false })
+      }
+
+      const docs = await collection.find({ _id: { $in: deltas.map(d => d.key) } }).toArray()
+      return new Map(docs.map(d => [d._id, d.consumed]))
+    }
+  }
+}
@@ -0,0 +1,196 @@
+// Table-driven request router.
+//
+// Routes are compiled once: fully static paths go into a map, the others into
+// a segment tree where `:name` segments capture a parameter and a trailing
+// `*` matches the rest of the path, including none. Static segments win over
+// parameters, so route order doesn't matter. Each route lists handlers per
+// method; a matched path with no handler for the method gets 405 with an
+// `Allow` header, and an unknown path gets 404. Neither reads the request
+// body.
+//
+// Handlers receive `{ request, params, searchParams, body, ...context }`.
+// `body()` reads and parses the JSON object body on first call, refusing
+// bodies over the route's `maxBodyBytes`.
+
+export class HttpError extends Error {
+  constructor(status, message) {
+    super(message)
+    this.name = 'HttpError'
+    this.status = status
+  }
+}
+
+const METHODS = ['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+function jsonResponse(data, status, headers = {}) {
+  return Response.json(data, { status, headers })
+}
+
+function createNode() {
+  return { children: new Map(), param: null, rest: null, route: null }
+}
+
+function splitPath(pathname) {
+  return pathname.split('/').filter(Boolean)
+}
+
+function decode(segment) {
+  try {
+    return decodeURIComponent(segment)
+  } catch {
+    return segment
+  }
+}
+
+// Read at most `limit` bytes of the body; anything longer is rejected
+// without buffering the rest
+async function readBody(request, limit) {
+  const declared = parseInt(request.headers.get('content-length') || '', 10)
+  if (declared > limit) {
+    throw new HttpError(413, `Request body exceeds ${limit} bytes`)
+  }
+  if (!request.body) {
+    return ''
+  }
+
+  const reader = request.body.getReader()
+  const chunks = []
+  let size = 0
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) {
+      break
+    }
+    size += value.byteLength
+    if (size > limit) {
+      reader.cancel().catch(() => {})
+      throw new HttpError(413, `Request body exceeds ${limit} bytes`)
+    }
+    chunks.push(value)
+  }
+  return Buffer.concat(chunks, size).toString('utf8')
+}
+
+export function createRouter(routes, { maxBodyBytes = 1024 * 1024, onError = null } = {}) {
+  const exact = new Map()
+  const root = createNode()
+
+  for (const route of routes) {
+    const methods = METHODS.filter(method => route[method])
+    // HEAD is served by the GET handler
+    if (route.GET && !route.HEAD) {
+      methods.push('HEAD')
+    }
+    const compiled = { ...route, allow: methods.join(', '), maxBodyBytes: route.maxBodyBytes ?? maxBodyBytes }
+
+    if (!route.path.includes(':') && !route.path.endsWith('*')) {
+      exact.set(splitPath(route.path).join('/'), compiled)
+      continue
+    }
+
+    let node = root
+    const segments = splitPath(route.path)
+    for (const [i, segment] of segments.entries()) {
+      if (segment === '*') {
+        if (i !== segments.length - 1) {
+          throw new Error(`'*' must end the route: ${route.path}`)
+        }
+        node.rest = compiled
+        node = null
+        break
+      }
+      if (segment.startsWith(':')) {
+        node.param = node.param || { name: segment.slice(1), node: createNode() }
+        if (node.param.name !== segment.slice(1)) {
+          throw new Error(`Conflicting parameter names at ${route.path}`)
+        }
+        node = node.param.node
+      } else {
+        if (!node.children.has(segment)) {
+          node.children.set(segment, createNode())
+        }
+        node = node.children.get(segment)
+      }
+    }
+    if (node) {
+      node.route = compiled
+    }
+  }
+
+  function find(node, segments, i, params) {
+    if (i === segments.length && node.route) {
+      return node.route
+    }
+    const child = i < segments.length && node.children.get(segments[i])
+    const route = child && find(child, segments, i + 1, params)
+    if (route) {
+      return route
+    }
+    if (node.param && i < segments.length) {
+      const found = find(node.param.node, segments, i + 1, params)
+      if (found) {
+        params[node.param.name] = decode(segments[i])
+        return found
+      }
+    }
+    if (node.rest) {
+      params.rest = segments.slice(i).map(decode).join('/')
+      return node.rest
+    }
+    return null
+  }
+
+  function match(pathname) {
+    const segments = splitPath(pathname)
+    const route = exact.get(segments.join('/'))
+    if (route) {
+      return { route, params: {} }
+    }
+    const params = {}
+    const found = find(root, segments, 0, params)
+    return found ? { route: found, params } : null
+  }
+
+  // `context` is passed through to the handler
+  async function handle(request, context = {}) {
+    const url = new URL(request.url)
+    const matched = match(url.pathname)
+    if (!matched) {
+      return jsonResponse({ error: 'Not found' }, 404)
+    }
+
+    const { route, params } = matched
+    const handler = route[request.method] || (request.method === 'HEAD' && route.GET)
+    if (!handler) {
+      return jsonResponse({ error: 'Method not allowed' }, 405, { Allow: route.allow })
+    }
+
+    let parsed
+    const body = () => {
+      parsed = parsed || readBody(request, route.maxBodyBytes).then(text => {
+        let value
+        try {
+          value = JSON.parse(text)
+        } catch {
+          throw new HttpError(400, 'Request body must be valid JSON')
+        }
+        if (!value || typeof value !== 'object' || Array.isArray(value)) {
+          throw new HttpError(400, 'Request body must be a JSON object')
+        }
+        return value
+      })
+      return parsed
+    }
+
+    try {
+      return await handler({ ...context, request, params, searchParams: url.searchParams, body })
+    } catch (error) {
+      if (onError) {
+        return onError(error)
+      }
+      throw error
+    }
+  }
+
+  return { match, handle }
+}
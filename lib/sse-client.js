@@ -0,0 +1,47 @@
+// Read a Server-Sent Events response body, calling onEvent(event, data) for
+// each complete event. Resolves once the stream ends.
+export async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  const dispatch = (raw) => {
+    let event = 'message'
+    let data = ''
+
+    for (const line of raw.split('\n')) {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim()
+      } else if (line.startsWith('data:')) {
+        data += line.slice(5).trim()
+      }
+    }
+
+    if (data) {
+      onEvent(event, JSON.parse(data))
+    }
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) {
+      break
+    }
+
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      dispatch(buffer.slice(0, boundary))
+      buffer = buffer.slice(boundary + 2)
+    }
+  }
+
+  if (buffer.trim()) {
+    dispatch(buffer)
+  }
+}
+
+export function isEventStream(response) {
+  return (response.headers.get('content-type') || '').includes('text/event-stream')
+}
@@ -0,0 +1,74 @@
+// Server-Sent Events helpers for streaming LLM completions.
+//
+// Streams emit `token` events with `{ content }` deltas as they arrive, then a
+// single `done` event carrying the same payload the JSON endpoint would have
+// returned, or an `error` event with `{ error }`.
+
+const encoder = new TextEncoder()
+
+export function wantsEventStream(request) {
+  return (request.headers.get('accept') || '').includes('text/event-stream')
+}
+
+export function formatEvent(event, data) {
+  return `event: ${event}\ndata: ${JSON.stringify(data)}\n\n`
+}
+
+// Build a streaming Response. `producer(send, signal)` writes events via
+// `send(event, data)`; `signal` aborts when the client disconnects. `onClose`
+// runs once the producer has finished.
+export function createEventStreamResponse(producer, { headers = {}, onClose = null } = {}) {
+  const abortController = new AbortController()
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      const send = (event, data) => {
+        if (!abortController.signal.aborted) {
+          controller.enqueue(encoder.encode(formatEvent(event, data)))
+        }
+      }
+
+      try {
+        await producer(send, abortController.signal)
+      } catch (error) {
+        if (!abortController.signal.aborted) {
+          console.error('Stream Error:', error)
+          send('error', { error: error.message })
+        }
+      } finally {
+        if (!abortController.signal.aborted) {
+          controller.close()
+        }
+        onClose?.()
+      }
+    },
+    cancel() {
+      abortController.abort()
+    }
+  })
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      // Disable proxy buffering (nginx) so tokens are flushed immediately
+      'X-Accel-Buffering': 'no',
+      ...headers
+    }
+  })
+}
+
+// Forward text deltas as `token` events and return the full text. Reading
+// stops early, cancelling the completion, when `onDelta` returns false.
+export async function pipeCompletion(completionStream, send, onDelta = null) {
+  let content = ''
+  for await (const delta of completionStream) {
+    content += delta
+    send('token', { content: delta })
+    if (onDelta && onDelta(delta) === false) {
+      break
+    }
+  }
+  return content
+}
@@ -0,0 +1,63 @@
+// Startup profiling and deferred initialization for route modules.
+//
+// `measure(name, init)` runs an initializer while the module loads and
+// records how long it took. `defer(name, init)` returns a getter that runs
+// the initializer on its first call instead, so a cold start only builds what
+// the endpoint being served uses; `getter.peek()` returns the instance, or
+// undefined, without creating it. A deferred initializer that throws runs
+// again on the next call.
+//
+// `snapshot()` lists every initializer that has run with its duration and
+// start offset, the deferred ones still pending, and the module timeline:
+// `startedAt` and `readyAt` are ms since process start, so `startedAt` covers
+// runtime boot and the module's imports, and `readyAt - startedAt` its own
+// top-level code.
+
+const round = ms => Math.round(ms * 1000) / 1000
+
+export function createStartupProfile({ now = () => performance.now() } = {}) {
+  const startedAt = now()
+  let readyAt = null
+  const initializers = []
+  const pending = new Set()
+
+  function measure(name, init, { deferred = false } = {}) {
+    const begin = now()
+    const value = init()
+    initializers.push({ name, deferred, at: round(begin - startedAt), ms: round(now() - begin) })
+    return value
+  }
+
+  function defer(name, init) {
+    let created = false
+    let instance
+    pending.add(name)
+
+    function get() {
+      if (!created) {
+        instance = measure(name, init, { deferred: true })
+        created = true
+        pending.delete(name)
+      }
+      return instance
+    }
+    get.peek = () => instance
+    return get
+  }
+
+  // Marks the end of the module's top-level code
+  function ready() {
+    readyAt = readyAt ?? now()
+  }
+
+  function snapshot() {
+    return {
+      startedAt: round(startedAt),
+      readyAt: readyAt === null ? null : round(readyAt),
+      initializers: [...initializers],
+      pending: [...pending]
+    }
+  }
+
+  return { measure, defer, ready, snapshot }
+}
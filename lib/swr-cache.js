@@ -0,0 +1,19 @@
+// Returns true when the request's conditional headers match the cached entry.
+export function isNotModified(request, entry) {
+  const ifNoneMatch = request.headers.get('if-none-match')
+  if (ifNoneMatch) {
+    return ifNoneMatch.split(',').some(tag => {
+      const value = tag.trim()
+      return value === '*' || value.replace(/^W\//, '') === entry.etag
+    })
+  }
+
+  const ifModifiedSince = request.headers.get('if-modified-since')
+  if (ifModifiedSince) {
+    const since = Date.parse(ifModifiedSince)
+    // HTTP dates have second precision
+    return !Number.isNaN(since) && Math.floor(entry.lastModified / 1000) * 1000 <= since
+  }
+
+  return false
+}
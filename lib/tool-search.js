@@ -0,0 +1,82 @@
+// In-browser search index over AI tools.
+//
+// Tool names and descriptions are tokenized once, when the list arrives:
+// accents are stripped, text is lowercased and split into words, and each
+// distinct word maps to the ascending positions of the tools that contain it.
+// The words are kept sorted, so every query word is looked up as a prefix
+// with a binary search instead of scanning every tool's text. A tool matches
+// when every query word prefixes one of its words.
+
+const WORD_PATTERN = /[\p{L}\p{N}]+/gu
+// Match counts per tool are kept in bytes
+const MAX_QUERY_WORDS = 16
+
+export function searchWords(text) {
+  return (text || '')
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .match(WORD_PATTERN) || []
+}
+
+export function buildToolSearchIndex(tools) {
+  const postings = new Map()
+  tools.forEach((tool, position) => {
+    for (const word of new Set(searchWords(`${tool.name} ${tool.description}`))) {
+      const list = postings.get(word)
+      if (list) {
+        list.push(position)
+      } else {
+        postings.set(word, [position])
+      }
+    }
+  })
+
+  const words = [...postings.keys()].sort()
+  return { size: tools.length, words, postings: words.map(word => postings.get(word)) }
+}
+
+// First index in the sorted word list that is >= `prefix`
+function lowerBound(words, prefix) {
+  let low = 0
+  let high = words.length
+  while (low < high) {
+    const mid = (low + high) >>> 1
+    if (words[mid] < prefix) {
+      low = mid + 1
+    } else {
+      high = mid
+    }
+  }
+  return low
+}
+
+// Positions of the tools matching every word of `query`, in list order, or
+// null for an empty query
+export function searchTools(index, query) {
+  const queryWords = [...new Set(searchWords(query))].slice(0, MAX_QUERY_WORDS)
+  if (!queryWords.length) {
+    return null
+  }
+
+  // Count, per tool, how many query words it matched
+  const hits = new Uint8Array(index.size)
+  for (const [round, prefix] of queryWords.entries()) {
+    for (let i = lowerBound(index.words, prefix); i < index.words.length && index.words[i].startsWith(prefix); i++) {
+      for (const position of index.postings[i]) {
+        // Several words of one tool can share the prefix; count the tool once
+        if (hits[position] === round) {
+          hits[position] = round + 1
+        }
+      }
+    }
+  }
+
+  const matches = []
+  for (let position = 0; position < hits.length; position++) {
+    if (hits[position] === queryWords.length) {
+      matches.push(position)
+    }
+  }
+  return matches
+}
@@ -0,0 +1,253 @@
+// Request tracing and latency histograms.
+//
+// A sampled request gets a trace that collects spans: named durations such as
+// the LLM call, a Firestore read or a cache lookup. When the request finishes
+// its spans are sent back in a `Server-Timing` header and added to in-process
+// histograms, which `snapshot` reports. Background work (Product Hunt
+// ingestion, Firestore batch writes) records durations straight into the
+// histograms with `record` / `time`.
+//
+// With a sample rate of 0 nothing is measured: unsampled requests get a shared
+// no-op trace and every method just runs the wrapped work.
+
+// Upper bounds of the histogram buckets, in ms (or tokens/s for rates)
+const BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, Infinity]
+
+// Unknown paths fold into one series so scanners can't grow the histograms
+const MAX_SERIES = 200
+
+const now = () => performance.now()
+
+function createHistogram() {
+  return { counts: new Array(BUCKETS.length).fill(0), count: 0, sum: 0, min: Infinity, max: 0 }
+}
+
+function observe(histogram, value) {
+  let i = 0
+  while (value > BUCKETS[i]) {
+    i++
+  }
+  histogram.counts[i]++
+  histogram.count++
+  histogram.sum += value
+  histogram.min = Math.min(histogram.min, value)
+  histogram.max = Math.max(histogram.max, value)
+}
+
+// The bucket bound below which `q` of the observations fall
+function quantile(histogram, q) {
+  let seen = 0
+  for (let i = 0; i < BUCKETS.length; i++) {
+    seen += histogram.counts[i]
+    if (seen >= q * histogram.count) {
+      return Math.max(histogram.min, Math.min(BUCKETS[i], histogram.max))
+    }
+  }
+  return histogram.max
+}
+
+const round = (value) => Math.round(value * 10) / 10
+
+// Metric label for a path: ids and other non-word segments become `:id`
+export function routeLabel(pathname) {
+  return pathname
+    .split('/')
+    .map(segment => /^[a-z-]*$/.test(segment) ? segment : ':id')
+    .join('/')
+}
+
+const NOOP_TRACE = {
+  sampled: false,
+  span: () => () => 0,
+  time: (name, fn) => fn(),
+  completion: (name, fn) => fn(),
+  stream: (name, iterable) => iterable,
+  hold: () => undefined,
+  serverTiming: () => '',
+  end: () => {}
+}
+
+export function createTracer({ sampleRate = 0, random = Math.random } = {}) {
+  const histograms = new Map()
+  const startedAt = Date.now()
+  const enabled = sampleRate > 0
+
+  function record(name, value) {
+    let histogram = histograms.get(name)
+    if (!histogram) {
+      if (histograms.size >= MAX_SERIES) {
+        name = 'other'
+        histogram = histograms.get(name)
+      }
+      if (!histogram) {
+        histogram = createHistogram()
+        histograms.set(name, histogram)
+      }
+    }
+    observe(histogram, value)
+  }
+
+  // Time background work into the histograms
+  async function time(name, fn) {
+    if (!enabled) {
+      return fn()
+    }
+    const start = now()
+    try {
+      return await fn()
+    } finally {
+      record(name, now() - start)
+    }
+  }
+
+  function start(name) {
+    const spans = []
+    const begin = now()
+    let ended = false
+    let held = false
+
+    function add(spanName, ms, desc) {
+      spans.push({ name: spanName, ms, desc })
+      record(spanName, ms)
+    }
+
+    const trace = {
+      sampled: true,
+      name,
+      // Start a span; call the returned function to end it
+      span(spanName) {
+        const spanStart = now()
+        return (desc) => {
+          const ms = now() - spanStart
+          add(spanName, ms, desc)
+          return ms
+        }
+      },
+      async time(spanName, fn) {
+        const end = trace.span(spanName)
+        try {
+          return await fn()
+        } finally {
+          end()
+        }
+      },
+      // Time a non-streaming completion and record its output rate
+      async completion(spanName, fn) {
+        const end = trace.span(spanName)
+        let result
+        try {
+          result = await fn()
+          return result
+        } finally {
+          const tokens = result?.usage?.completion_tokens
+          const ms = end(tokens ? `${tokens} tokens` : undefined)
+          if (tokens && ms > 0) {
+            record(`${spanName}.tokens_per_s`, tokens / (ms / 1000))
+          }
+        }
+      },
+      // Wrap a completion stream to record the call, the time to first token
+      // and the output rate. `usage` is passed through.
+      stream(spanName, iterable) {
+        return {
+          get usage() {
+            return iterable.usage
+          },
+          async *[Symbol.asyncIterator]() {
+            const streamStart = now()
+            let first = 0
+            let chunks = 0
+            try {
+              for await (const chunk of iterable) {
+                if (!chunks++) {
+                  first = now()
+                  add(`${spanName}.ttft`, first - streamStart)
+                }
+                yield chunk
+              }
+            } finally {
+              const ms = now() - streamStart
+              const tokens = iterable.usage?.completion_tokens ?? chunks
+              const rate = chunks > 1 ? tokens / ((now() - first) / 1000) : 0
+              add(spanName, ms, rate ? `${Math.round(rate)} tok/s` : undefined)
+              if (rate) {
+                record(`${spanName}.tokens_per_s`, rate)
+              }
+            }
+          }
+        }
+      },
+      // Keep the trace open past the response headers, e.g. for a stream;
+      // returns the function that ends it
+      hold() {
+        held = true
+        return () => trace.end()
+      },
+      serverTiming() {
+        const entries = spans.map(span =>
+          `${span.name};dur=${round(span.ms)}${span.desc ? `;desc="${span.desc}"` : ''}`
+        )
+        entries.push(`total;dur=${round(now() - begin)}`)
+        return entries.join(', ')
+      },
+      end(status) {
+        if (ended || (held && status !== undefined)) {
+          return
+        }
+        ended = true
+        record(name, now() - begin)
+        if (status >= 500) {
+          record(`${name} 5xx`, now() - begin)
+        }
+      }
+    }
+    return trace
+  }
+
+  // Wrap a route handler: sampled requests get a trace as the second argument
+  // and a Server-Timing header on the response
+  function wrap(handler) {
+    return async (request, context) => {
+      if (!enabled || random() >= sampleRate) {
+        return handler(request, NOOP_TRACE, context)
+      }
+
+      const trace = start(`${request.method} ${routeLabel(new URL(request.url).pathname)}`)
+      let response
+      try {
+        response = await handler(request, trace, context)
+        response.headers.set('Server-Timing', trace.serverTiming())
+        return response
+      } finally {
+        trace.end(response?.status ?? 500)
+      }
+    }
+  }
+
+  function snapshot() {
+    const result = {}
+    for (const [name, histogram] of [...histograms].sort(([a], [b]) => a.localeCompare(b))) {
+      result[name] = {
+        count: histogram.count,
+        mean: round(histogram.sum / histogram.count),
+        min: round(histogram.min),
+        max: round(histogram.max),
+        p50: round(quantile(histogram, 0.5)),
+        p90: round(quantile(histogram, 0.9)),
+        p99: round(quantile(histogram, 0.99)),
+        buckets: Object.fromEntries(
+          BUCKETS.map((bound, i) => [bound === Infinity ? '+Inf' : String(bound), histogram.counts[i]]).filter(([, count]) => count)
+        )
+      }
+    }
+    return { sampleRate, since: new Date(startedAt).toISOString(), histograms: result }
+  }
+
+  return {
+    enabled,
+    record: enabled ? record : () => {},
+    time,
+    wrap,
+    snapshot
+  }
+}
@@ -0,0 +1,251 @@
+import { createJsonStreamParser } from './json-stream'
+
+// Streaming reader for generated n8n / Make.com workflows.
+//
+// Completion text is parsed as it arrives (see json-stream.js) and each node,
+// connection or module is checked against the platform's schema as soon as
+// it is complete. A syntax error or a schema violation makes the output
+// unrecoverable, and `write` returns false so the caller can stop the
+// generation there. `finish` returns the parsed workflow, or an error object
+// in the same shape the API has always returned for unparseable output.
+
+const isObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value)
+const isNonEmptyString = (value) => typeof value === 'string' && value.length > 0
+
+const KIND_NAMES = { object: 'an object', array: 'an array' }
+
+function expectKind(expected, kind, label) {
+  return kind === expected ? null : `${label} must be ${KIND_NAMES[expected]}`
+}
+
+function checkN8nNode(node, index) {
+  const label = `nodes[${index}]`
+  if (!isObject(node)) {
+    return `${label} must be an object`
+  }
+  if (!isNonEmptyString(node.name)) {
+    return `${label} needs a name`
+  }
+  if (!isNonEmptyString(node.type)) {
+    return `${label} (${node.name}) needs a type`
+  }
+  if (node.parameters !== undefined && !isObject(node.parameters)) {
+    return `${label} (${node.name}) parameters must be an object`
+  }
+  if (node.position !== undefined && !(Array.isArray(node.position) && node.position.length === 2 && node.position.every(Number.isFinite))) {
+    return `${label} (${node.name}) position must be [x, y]`
+  }
+  if (node.typeVersion !== undefined && !Number.isFinite(node.typeVersion)) {
+    return `${label} (${node.name}) typeVersion must be a number`
+  }
+  return null
+}
+
+function checkN8nConnection(outputs, source) {
+  const label = `connections.${source}`
+  if (!isObject(outputs)) {
+    return `${label} must be an object`
+  }
+  for (const [output, branches] of Object.entries(outputs)) {
+    if (!Array.isArray(branches)) {
+      return `${label}.${output} must be an array`
+    }
+    for (const targets of branches) {
+      if (targets === null) {
+        continue
+      }
+      if (!Array.isArray(targets)) {
+        return `${label}.${output} must be an array of arrays`
+      }
+      for (const target of targets) {
+        if (!isObject(target) || !isNonEmptyString(target.node)) {
+          return `${label}.${output} targets need a node name`
+        }
+        if (target.index !== undefined && !Number.isInteger(target.index)) {
+          return `${label}.${output} target index must be an integer`
+        }
+      }
+    }
+  }
+  return null
+}
+
+const n8n = {
+  label: 'n8n',
+  open(path, kind) {
+    if (path.length === 1 && path[0] === 'nodes') {
+      return expectKind('array', kind, 'nodes')
+    }
+    if (path.length === 1 && path[0] === 'connections') {
+      return expectKind('object', kind, 'connections')
+    }
+    if (path.length === 2 && path[0] === 'nodes') {
+      return expectKind('object', kind, `nodes[${path[1]}]`)
+    }
+    return null
+  },
+  value(path, value) {
+    if (path.length === 1 && path[0] === 'nodes' && !Array.isArray(value)) {
+      return 'nodes must be an array'
+    }
+    if (path.length === 1 && path[0] === 'connections' && !isObject(value)) {
+      return 'connections must be an object'
+    }
+    if (path.length === 2 && path[0] === 'nodes') {
+      return checkN8nNode(value, path[1])
+    }
+    if (path.length === 2 && path[0] === 'connections') {
+      return checkN8nConnection(value, path[1])
+    }
+    return null
+  },
+  finish(workflow) {
+    if (!Array.isArray(workflow.nodes) || !workflow.nodes.length) {
+      return 'nodes must list at least one node'
+    }
+    const names = new Set()
+    for (const node of workflow.nodes) {
+      if (names.has(node.name)) {
+        return `Duplicate node name ${node.name}`
+      }
+      names.add(node.name)
+    }
+    for (const [source, outputs] of Object.entries(workflow.connections || {})) {
+      if (!names.has(source)) {
+        return `connections.${source} refers to a node that doesn't exist`
+      }
+      for (const branches of Object.values(outputs)) {
+        for (const target of branches.flat()) {
+          if (target && !names.has(target.node)) {
+            return `connections.${source} targets ${target.node}, which doesn't exist`
+          }
+        }
+      }
+    }
+    return null
+  }
+}
+
+function checkMakeModule(module, label) {
+  if (!isObject(module)) {
+    return `${label} must be an object`
+  }
+  if (!Number.isInteger(module.id)) {
+    return `${label} needs an integer id`
+  }
+  if (!isNonEmptyString(module.module)) {
+    return `${label} (id ${module.id}) needs a module name`
+  }
+  for (const field of ['parameters', 'mapper', 'metadata']) {
+    if (module[field] !== undefined && !isObject(module[field])) {
+      return `${label} (id ${module.id}) ${field} must be an object`
+    }
+  }
+  if (module.routes !== undefined) {
+    if (!Array.isArray(module.routes)) {
+      return `${label} (id ${module.id}) routes must be an array`
+    }
+    for (const [r, route] of module.routes.entries()) {
+      if (!isObject(route) || !Array.isArray(route.flow)) {
+        return `${label}.routes[${r}] needs a flow array`
+      }
+      for (const [m, nested] of route.flow.entries()) {
+        const problem = checkMakeModule(nested, `${label}.routes[${r}].flow[${m}]`)
+        if (problem) {
+          return problem
+        }
+      }
+    }
+  }
+  return null
+}
+
+const make = {
+  label: 'Make.com',
+  open(path, kind) {
+    if (path.length === 1 && path[0] === 'flow') {
+      return expectKind('array', kind, 'flow')
+    }
+    if (path.length === 1 && path[0] === 'metadata') {
+      return expectKind('object', kind, 'metadata')
+    }
+    if (path.length === 2 && path[0] === 'flow') {
+      return expectKind('object', kind, `flow[${path[1]}]`)
+    }
+    return null
+  },
+  value(path, value) {
+    if (path.length === 1 && path[0] === 'flow' && !Array.isArray(value)) {
+      return 'flow must be an array'
+    }
+    if (path.length === 1 && path[0] === 'metadata' && !isObject(value)) {
+      return 'metadata must be an object'
+    }
+    if (path.length === 2 && path[0] === 'flow') {
+      return checkMakeModule(value, `flow[${path[1]}]`)
+    }
+    return null
+  },
+  finish(workflow) {
+    if (!Array.isArray(workflow.flow) || !workflow.flow.length) {
+      return 'flow must list at least one module'
+    }
+    return null
+  }
+}
+
+export const WORKFLOW_SCHEMAS = { n8n, make }
+
+export function createWorkflowReader(type) {
+  const schema = type === 'n8n' ? n8n : make
+  let problem = null
+  let text = ''
+
+  const mismatch = (details) => ({
+    error: `Workflow does not match the ${schema.label} schema`,
+    details,
+    raw_response: text
+  })
+
+  const parser = createJsonStreamParser({
+    onOpen: (path, kind) => {
+      problem = problem || schema.open(path, kind)
+    },
+    onValue: (path, value) => {
+      problem = problem || schema.value(path, value)
+    }
+  })
+
+  return {
+    // Feed the next chunk; false once the output can't become a valid workflow
+    write(chunk) {
+      text += chunk
+      if (!problem && !parser.done) {
+        parser.write(chunk)
+      }
+      return !problem && !parser.error
+    },
+    // True once the root object has closed; the rest of the output is unused
+    get complete() {
+      return parser.done
+    },
+    finish() {
+      // A schema violation stops parsing, so it is reported first
+      if (problem) {
+        return mismatch(problem)
+      }
+      let workflow
+      try {
+        workflow = parser.end()
+      } catch (error) {
+        if (!text.includes('{')) {
+          return { error: 'Invalid JSON generated' }
+        }
+        return { error: 'Failed to parse workflow JSON', details: error.message, raw_response: text }
+      }
+
+      const details = schema.finish(workflow)
+      return details ? mismatch(details) : workflow
+    }
+  }
+}
@@ -0,0 +1,298 @@
+import { randomUUID } from 'crypto'
+import { promises as fs, appendFileSync, mkdirSync } from 'fs'
+import path from 'path'
+
+// Write-behind persistence for Firestore.
+//
+// Records are queued in memory and the caller returns immediately. The queue
+// is flushed with `writeBatch` once `batchSize` records are waiting or
+// `flushIntervalMs` has passed. Failed batches are retried with jittered
+// exponential backoff. When the queue is full, or the backend keeps failing
+// after `maxAttempts`, records are appended to `spillFile` (one JSON record per
+// line) and replayed after the next successful write or on the next start.
+//
+// Records with an `id` are written to that document, others get an id when
+// they are queued, so retrying a batch never duplicates a document. `merge`
+// updates only the given fields instead of replacing the document. Undefined
+// fields are dropped, as Firestore rejects them.
+//
+// A batch Firestore rejects as invalid is split in halves and retried until
+// the offending records are isolated; those, and records too large for a
+// document, go to `deadLetterFile` and are never retried, so one bad record
+// can't hold back the rest. `observe(name, ms)`, when given, receives the
+// duration of every batch commit. The Firestore SDK is only loaded with the
+// first commit.
+
+// Firestore rejects batches with more than 500 writes
+const FIRESTORE_BATCH_LIMIT = 500
+// Firestore documents are capped at 1 MiB; the JSON size is a close estimate,
+// so leave some room for field overhead
+export const MAX_DOCUMENT_BYTES = 1000 * 1000
+// Errors caused by the records themselves rather than the backend
+const PERMANENT_ERRORS = new Set(['invalid-argument', 'out-of-range'])
+
+function serialize(record) {
+  return JSON.stringify(record, function (key, value) {
+    const raw = this[key]
+    return raw instanceof Date ? { $date: raw.toISOString() } : value
+  })
+}
+
+// Drop undefined fields, and turn undefined array items into null
+function compact(value) {
+  if (Array.isArray(value)) {
+    return value.map(item => item === undefined ? null : compact(item))
+  }
+  if (value && typeof value === 'object' && [Object.prototype, null].includes(Object.getPrototypeOf(value))) {
+    return Object.fromEntries(
+      Object.entries(value).filter(([, item]) => item !== undefined).map(([key, item]) => [key, compact(item)])
+    )
+  }
+  return value
+}
+
+function deserialize(line) {
+  return JSON.parse(line, (key, value) =>
+    value && typeof value === 'object' && typeof value.$date === 'string' ? new Date(value.$date) : value
+  )
+}
+
+export function createWriteBehindQueue({
+  getDb,
+  batchSize = 100,
+  flushIntervalMs = 1000,
+  maxQueueSize = 5000,
+  maxAttempts = 5,
+  baseBackoffMs = 500,
+  maxBackoffMs = 30000,
+  spillFile = null,
+  deadLetterFile = null,
+  observe = null
+}) {
+  const queue = []
+  const stats = { enqueued: 0, written: 0, failedBatches: 0, spilled: 0, replayed: 0, deadLettered: 0 }
+  let timer = null
+  let timerDueAt = Infinity
+  let flushing = null
+  let attempts = 0
+  let hasSpill = !!spillFile
+  const size = Math.min(batchSize, FIRESTORE_BATCH_LIMIT)
+
+  function schedule(delay) {
+    const dueAt = Date.now() + delay
+    if (timer && timerDueAt <= dueAt) {
+      return
+    }
+
+    clearTimeout(timer)
+    timerDueAt = dueAt
+    timer = setTimeout(() => {
+      timer = null
+      timerDueAt = Infinity
+      flush().catch(error => {
+        console.error('Write-behind flush failed:', error.message)
+      })
+    }, delay)
+    // Don't keep the process alive just for a pending flush
+    timer.unref?.()
+  }
+
+  async function spill(records) {
+    if (!records.length) {
+      return
+    }
+
+    if (!spillFile) {
+      console.error(`Write-behind queue dropped ${records.length} records (no spill file configured)`)
+      return
+    }
+
+    try {
+      await fs.mkdir(path.dirname(spillFile), { recursive: true })
+      await fs.appendFile(spillFile, records.map(serialize).join('\n') + '\n')
+      stats.spilled += records.length
+      hasSpill = true
+    } catch (error) {
+      console.error('Write-behind spill failed:', error.message)
+    }
+  }
+
+  // Keep records Firestore will never accept out of the queue and the spill
+  async function deadLetter(rejected) {
+    stats.deadLettered += rejected.length
+    for (const { record, reason } of rejected) {
+      console.error(`Write-behind dropped a ${record.collection} record: ${reason}`)
+    }
+    if (!deadLetterFile) {
+      return
+    }
+
+    try {
+      await fs.mkdir(path.dirname(deadLetterFile), { recursive: true })
+      await fs.appendFile(deadLetterFile, rejected.map(({ record, reason }) => serialize({ ...record, reason })).join('\n') + '\n')
+    } catch (error) {
+      console.error('Write-behind dead letter failed:', error.message)
+    }
+  }
+
+  async function replaySpill() {
+    if (!spillFile || !hasSpill) {
+      return
+    }
+    hasSpill = false
+
+    // Move the file aside first so records spilled during replay aren't lost
+    const replayFile = `${spillFile}.${process.pid}.replay`
+    let content
+    try {
+      await fs.rename(spillFile, replayFile)
+      content = await fs.readFile(replayFile, 'utf8')
+    } catch (error) {
+      return
+    }
+
+    const records = content.split('\n').filter(Boolean).map(deserialize)
+    const room = Math.max(maxQueueSize - queue.length, 0)
+    queue.push(...records.slice(0, room))
+    stats.replayed += Math.min(records.length, room)
+    await spill(records.slice(room))
+    await fs.unlink(replayFile).catch(() => {})
+
+    if (queue.length) {
+      schedule(0)
+    }
+  }
+
+  async function commit(records) {
+    const [db, { collection, doc, writeBatch }] = await Promise.all([getDb(), import('firebase/firestore')])
+    const batch = writeBatch(db)
+
+    for (const record of records) {
+      const ref = record.id
+        ? doc(db, record.collection, record.id)
+        : doc(collection(db, record.collection))
+      batch.set(ref, record.data, { merge: !!record.merge })
+    }
+
+    await batch.commit()
+  }
+
+  // Commit `records`, splitting the batch when Firestore rejects it as invalid.
+  // Resolves to the records that are rejected on their own; backend errors
+  // are thrown.
+  async function commitIsolating(records) {
+    try {
+      await commit(records)
+      return []
+    } catch (error) {
+      if (!PERMANENT_ERRORS.has(error.code)) {
+        throw error
+      }
+      if (records.length === 1) {
+        return [{ record: records[0], reason: error.message }]
+      }
+      const middle = Math.ceil(records.length / 2)
+      return [
+        ...await commitIsolating(records.slice(0, middle)),
+        ...await commitIsolating(records.slice(middle))
+      ]
+    }
+  }
+
+  function backoff() {
+    const delay = Math.min(baseBackoffMs * 2 ** (attempts - 1), maxBackoffMs)
+    // Full jitter keeps retrying instances from synchronizing
+    return Math.round(delay / 2 + Math.random() * delay / 2)
+  }
+
+  async function drain() {
+    while (queue.length) {
+      const records = queue.slice(0, size)
+
+      try {
+        const startedAt = performance.now()
+        const rejected = await commitIsolating(records)
+        observe?.('firestore.batch', performance.now() - startedAt)
+        queue.splice(0, records.length)
+        attempts = 0
+        stats.written += records.length - rejected.length
+        await deadLetter(rejected)
+      } catch (error) {
+        attempts++
+        stats.failedBatches++
+        console.log(`Firestore batch write failed (attempt ${attempts}):`, error.message)
+
+        if (attempts >= maxAttempts) {
+          // Treat the backend as down and move everything queued to disk
+          attempts = 0
+          await spill(queue.splice(0, queue.length))
+        } else {
+          schedule(backoff())
+        }
+        return
+      }
+    }
+
+    await replaySpill()
+  }
+
+  function flush() {
+    if (!flushing) {
+      flushing = drain().finally(() => {
+        flushing = null
+      })
+    }
+    return flushing
+  }
+
+  function enqueue(collectionName, data, { id, merge = false } = {}) {
+    // Like Firestore's auto ids, but fixed before the first attempt
+    const record = { collection: collectionName, id: id || randomUUID().replace(/-/g, ''), data: compact(data), merge }
+    stats.enqueued++
+
+    const bytes = Buffer.byteLength(serialize(record))
+    if (bytes > MAX_DOCUMENT_BYTES) {
+      deadLetter([{ record, reason: `document is ${bytes} bytes, over the ${MAX_DOCUMENT_BYTES} byte limit` }])
+      return
+    }
+
+    if (queue.length >= maxQueueSize) {
+      spill([record])
+      return
+    }
+
+    queue.push(record)
+    // While backing off, the pending retry timer picks up new records
+    if (attempts === 0) {
+      schedule(queue.length >= size ? 0 : flushIntervalMs)
+    }
+  }
+
+  // Spill synchronously on shutdown so queued records survive a restart
+  function spillOnExit() {
+    if (!queue.length || !spillFile) {
+      return
+    }
+
+    try {
+      mkdirSync(path.dirname(spillFile), { recursive: true })
+      appendFileSync(spillFile, queue.splice(0, queue.length).map(serialize).join('\n') + '\n')
+    } catch (error) {
+      console.error('Write-behind spill on exit failed:', error.message)
+    }
+  }
+
+  // Next's server turns SIGINT/SIGTERM into process.exit, which fires this
+  process.once('exit', spillOnExit)
+
+  // Pick up records spilled by a previous process
+  if (spillFile) {
+    schedule(0)
+  }
+
+  return {
+    enqueue,
+    flush,
+    stats: () => ({ ...stats, queued: queue.length })
+  }
+}
@@ -7,6 +7,10 @@ const nextConfig = {
   },
   experimental: {
     optimizeCss: true,
+    // The widget route reads the built files from disk
+    outputFileTracingIncludes: {
+      '/embed/[file]': ['./embed/dist/**/*'],
+    },
   },
   images: {
     domains: ['api.producthunt.com', 'ph-files.imgix.net'],
@@ -31,6 +35,38 @@ const nextConfig = {
           },
         ],
       },
+      {
+        // The embed widget chats from third-party pages
+        source: '/api/chatbots/test',
+        headers: [
+          {
+            key: 'Access-Control-Allow-Origin',
+            value: '*',
+          },
+          {
+            key: 'Access-Control-Allow-Methods',
+            value: 'POST, OPTIONS',
+          },
+          {
+            key: 'Access-Control-Allow-Headers',
+            value: 'Content-Type, Accept',
+          },
+        ],
+      },
+      {
+        // The widget holds an event stream per session and ends it on unload
+        source: '/api/chatbots/sessions/:path*',
+        headers: [
+          {
+            key: 'Access-Control-Allow-Origin',
+            value: '*',
+          },
+          {
+            key: 'Access-Control-Allow-Methods',
+            value: 'GET, DELETE, OPTIONS',
+          },
+        ],
+      },
     ]
   },
   webpack: (config, { isServer }) => {
@@ -44,4 +80,25 @@ const nextConfig = {
   },
 }
 
-module.exports = nextConfig
\ No newline at end of file
+// ANALYZE=true (`yarn analyze`) writes treemaps of the client, server and
+// edge bundles to .next/analyze/. It needs @next/bundle-analyzer, which isn't
+// installed by default: `yarn add -D @next/bundle-analyzer@14.2.3`. Without
+// it the build goes ahead without treemaps.
+function bundleAnalyzer() {
+  if (process.env.ANALYZE !== 'true') {
+    return config => config
+  }
+  try {
+    return require('@next/bundle-analyzer')({ enabled: true })
+  } catch (error) {
+    if (error.code !== 'MODULE_NOT_FOUND') {
+      throw error
+    }
+    console.warn('ANALYZE=true needs @next/bundle-analyzer: yarn add -D @next/bundle-analyzer@14.2.3')
+    return config => config
+  }
+}
+
+const withBundleAnalyzer = bundleAnalyzer()
+
+module.exports = withBundleAnalyzer(nextConfig)
\ No newline at end of file
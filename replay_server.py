@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+HappyAxzora Upstream Record/Replay Server
+Stands in for Groq and Product Hunt so the backend tests run offline.
+Firestore is not stood in for; backend_test.py skips the checks that read it.
+
+Point the app at it with:
+    GROQ_BASE_URL=http://127.0.0.1:4010/groq
+    PRODUCTHUNT_API_URL=http://127.0.0.1:4010/producthunt/v2/api/graphql
+
+In replay mode (the default) each request is answered from a fixture in
+tests/fixtures/upstream/<service>/<key>.json. Requests without a fixture get a
+deterministic synthesized response in the upstream's format, so new prompts
+work without recording. In record mode requests are forwarded to the real
+upstream and the exchanges are saved as fixtures; credentials are never
+written to disk.
+
+Latency is injected deterministically: a fixed delay before the first byte per
+service, plus a delay between streamed chunks.
+
+Examples:
+    python replay_server.py
+    python replay_server.py --latency groq=800 --latency producthunt=300 --chunk-delay-ms 20
+    python replay_server.py --mode record
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'upstream')
+DEFAULT_PORT = 4010
+DEFAULT_APP_COMMAND = 'npx next dev --hostname 127.0.0.1 --port {port}'
+
+UPSTREAMS = {
+    'groq': 'https://api.groq.com',
+    'producthunt': 'https://api.producthunt.com'
+}
+
+WORDS = [
+    'streamlined', 'reliable', 'customer', 'workflow', 'insight', 'automated',
+    'practical', 'growth', 'simple', 'team', 'launch', 'support', 'daily',
+    'clear', 'secure', 'modern', 'focused', 'quality', 'plan', 'result'
+]
+
+# A workflow prompt containing this gets output whose first node breaks the
+# schema, followed by more nodes, until the model is asked to repair it
+# (the same marker as lib/llm/mock.js)
+INVALID_WORKFLOW_MARKER = '[invalid workflow]'
+
+PRODUCTHUNT_PAGE_SIZE = 20
+PRODUCTHUNT_PAGES = 5
+TOPICS = ['Artificial Intelligence', 'Productivity', 'Automation', 'Developer Tools', 'Chatbots', 'Design Tools']
+
+
+def normalize_body(service, body):
+    """Canonical request body used for fixture keys"""
+    if service == 'producthunt':
+        # Requests carry a rolling "posted after" timestamp; ignore it for matching
+        text = re.sub(r'\d{4}-\d{2}-\d{2}(T[\d:.]+Z)?', 'DATE', body.decode('utf-8', 'replace'))
+        return re.sub(r'\s+', ' ', text).strip()
+    try:
+        return json.dumps(json.loads(body or b'{}'), sort_keys=True)
+    except ValueError:
+        return body.decode('utf-8', 'replace')
+
+
+def fixture_key(service, method, path, body):
+    digest = hashlib.sha256(f"{method} {path}\n{normalize_body(service, body)}".encode()).hexdigest()
+    return digest[:24]
+
+
+def synth_words(seed, count):
+    words = []
+    block = seed
+    for i in range(count):
+        if i and i % 32 == 0:
+            block = hashlib.sha256(block.encode()).hexdigest()
+        words.append(WORDS[int(block[(i % 32) * 2:(i % 32) * 2 + 2], 16) % len(WORDS)])
+    return words
+
+
+def synth_groq(request):
+    """OpenAI-style chat completion derived from a hash of the request"""
+    messages = request.get('messages', [])
+    seed = hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+    system = next((m.get('content', '') for m in messages if m.get('role') == 'system'), '')
+
+    invalid = (
+        not any(m.get('role') == 'assistant' for m in messages)
+        and any(m.get('role') == 'user' and INVALID_WORKFLOW_MARKER in m.get('content', '') for m in messages)
+    )
+
+    if re.search(r'workflow', system, re.I) and 'JSON' in system and invalid:
+        workflow = {
+            'name': f"Replay workflow {seed[:8]}",
+            'nodes': [{'name': 'Trigger', 'typeVersion': 1, 'position': [250, 300], 'parameters': {}}] + [
+                {'name': f"Unreached {i + 1}", 'type': 'n8n-nodes-base.noOp', 'typeVersion': 1, 'position': [450 + i * 200, 300], 'parameters': {}}
+                for i in range(20)
+            ],
+            'connections': {}
+        }
+        content = json.dumps(workflow, indent=2)
+    elif re.search(r'workflow', system, re.I) and 'JSON' in system:
+        if 'n8n' in system:
+            workflow = {
+                'name': f"Replay workflow {seed[:8]}",
+                'nodes': [
+                    {'name': 'Trigger', 'type': 'n8n-nodes-base.webhook', 'typeVersion': 1, 'position': [250, 300], 'parameters': {'path': seed[:12]}},
+                    {'name': 'Action', 'type': 'n8n-nodes-base.httpRequest', 'typeVersion': 1, 'position': [450, 300], 'parameters': {'url': 'https://example.com'}}
+                ],
+                'connections': {'Trigger': {'main': [[{'node': 'Action', 'type': 'main', 'index': 0}]]}}
+            }
+        else:
+            workflow = {
+                'name': f"Replay scenario {seed[:8]}",
+                'flow': [
+                    {'id': 1, 'module': 'gateway:CustomWebHook', 'version': 1, 'parameters': {}, 'mapper': {}},
+                    {'id': 2, 'module': 'http:ActionSendData', 'version': 3, 'parameters': {}, 'mapper': {'url': 'https://example.com'}}
+                ],
+                'metadata': {'version': 1}
+            }
+        content = json.dumps(workflow, indent=2)
+    else:
+        count = min(request.get('max_tokens') or 200, 40 + int(seed[:4], 16) % 80)
+        content = f"Replay response: {' '.join(synth_words(seed, count))}."
+
+    prompt_tokens = len(json.dumps(messages)) // 4
+    completion_tokens = len(content) // 4
+    return {
+        'id': f"chatcmpl-{seed[:24]}",
+        'object': 'chat.completion',
+        'created': 1700000000,
+        'model': request.get('model', 'llama3-70b-8192'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+    }
+
+
+def groq_stream_events(completion):
+    """Split a chat completion into the SSE chunks Groq would stream"""
+    content = completion['choices'][0]['message']['content']
+    base = {'id': completion['id'], 'object': 'chat.completion.chunk', 'created': completion['created'], 'model': completion['model']}
+    events = [
+        {**base, 'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+        for piece in re.findall(r'\S+\s*|\s+', content)
+    ]
+    events.append({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'x_groq': {'usage': completion['usage']}})
+    return [f"data: {json.dumps(event)}\n\n" for event in events] + ['data: [DONE]\n\n']
+
+
+def synth_producthunt(body):
+    """Pages of posts dated after the query's postedAfter date, following the after cursor"""
+    try:
+        variables = json.loads(body).get('variables') or {}
+    except ValueError:
+        variables = {}
+    posted_after = variables.get('postedAfter')
+    if not posted_after:
+        match = re.search(r'postedAfter: \\?"(\d{4}-\d{2}-\d{2})', body.decode('utf-8', 'replace'))
+        posted_after = match.group(1) if match else None
+    start = datetime.fromisoformat(posted_after[:10]) if posted_after else datetime(2024, 1, 1)
+    page = int(variables.get('after') or 0)
+    edges = []
+    for i in range(page * PRODUCTHUNT_PAGE_SIZE, (page + 1) * PRODUCTHUNT_PAGE_SIZE):
+        seed = hashlib.sha256(f"post-{i}".encode()).hexdigest()
+        name = ' '.join(word.capitalize() for word in synth_words(seed, 2))
+        created = start + timedelta(hours=2 * (i + 1))
+        edges.append({'node': {
+            'id': str(100000 + i),
+            'name': f"{name} {i}",
+            'tagline': f"{' '.join(synth_words(seed[8:], 6)).capitalize()}",
+            'description': f"{' '.join(synth_words(seed[16:], 20)).capitalize()}.",
+            'url': f"https://www.producthunt.com/posts/replay-{i}",
+            'votesCount': 50 + int(seed[:4], 16) % 900,
+            'createdAt': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'featuredAt': created.strftime('%Y-%m-%dT%H:%M:%SZ') if i % 3 else None,
+            'topics': {'edges': [{'node': {'name': TOPICS[(i + j) % len(TOPICS)]}} for j in range(2)]}
+        }})
+    has_next = page + 1 < PRODUCTHUNT_PAGES
+    return {'data': {'posts': {
+        'pageInfo': {'endCursor': str(page + 1) if has_next else None, 'hasNextPage': has_next},
+        'edges': edges
+    }}}
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mode='replay', fixtures_dir=FIXTURES_DIR, latency_ms=None, chunk_delay_ms=0):
+        super().__init__(address, ReplayHandler)
+        self.mode = mode
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms or {}
+        self.chunk_delay_ms = chunk_delay_ms
+        self.stats = {'replayed': 0, 'synthesized': 0, 'recorded': 0}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def fixture_path(self, service, key):
+        return os.path.join(self.fixtures_dir, service, f"{key}.json")
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_upstream()
+
+    def do_POST(self):
+        self.handle_upstream()
+
+    def handle_upstream(self):
+        service, _, path = self.path.lstrip('/').partition('/')
+        path = '/' + path
+        if service not in UPSTREAMS:
+            self.send_json(404, {'error': f"Unknown upstream '{service}'"})
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        key = fixture_key(service, self.command, path, body)
+        fixture_path = self.server.fixture_path(service, key)
+
+        if self.server.mode == 'record':
+            fixture = self.record(service, path, body, fixture_path)
+            self.server.count('recorded')
+        elif os.path.exists(fixture_path):
+            with open(fixture_path) as f:
+                fixture = json.load(f)
+            self.server.count('replayed')
+        else:
+            fixture = self.synthesize(service, body)
+            self.server.count('synthesized')
+
+        # Simulated upstream latency before the first byte
+        time.sleep(self.server.latency_ms.get(service, 0) / 1000)
+        self.send_fixture(fixture)
+
+    def synthesize(self, service, body):
+        if service == 'producthunt':
+            return {'status': 200, 'content_type': 'application/json', 'body': json.dumps(synth_producthunt(body))}
+
+        request = json.loads(body or b'{}')
+        completion = synth_groq(request)
+        if request.get('stream'):
+            return {'status': 200, 'content_type': 'text/event-stream', 'chunks': groq_stream_events(completion)}
+        return {'status': 200, 'content_type': 'application/json', 'body': json.dumps(completion)}
+
+    def record(self, service, path, body, fixture_path):
+        headers = {
+            name: self.headers[name]
+            for name in ('Authorization', 'Content-Type', 'Accept')
+            if self.headers.get(name)
+        }
+        request = urllib.request.Request(UPSTREAMS[service] + path, data=body or None, headers=headers, method=self.command)
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                status, content_type, raw = response.status, response.headers.get('Content-Type', ''), response.read()
+        except urllib.error.HTTPError as error:
+            status, content_type, raw = error.code, error.headers.get('Content-Type', ''), error.read()
+
+        text = raw.decode('utf-8', 'replace')
+        fixture = {'status': status, 'content_type': content_type}
+        if 'text/event-stream' in content_type:
+            fixture['chunks'] = [event + '\n\n' for event in text.split('\n\n') if event.strip()]
+        else:
+            fixture['body'] = text
+
+        # Only successful exchanges are worth replaying
+        if status < 400:
+            os.makedirs(os.path.dirname(fixture_path), exist_ok=True)
+            with open(fixture_path, 'w') as f:
+                json.dump({'request': {'method': self.command, 'path': path, 'body': normalize_body(service, body)}, **fixture}, f, indent=2)
+        return fixture
+
+    def send_fixture(self, fixture):
+        if 'chunks' in fixture:
+            self.send_response(fixture['status'])
+            self.send_header('Content-Type', fixture['content_type'])
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for index, chunk in enumerate(fixture['chunks']):
+                if index and self.server.chunk_delay_ms:
+                    time.sleep(self.server.chunk_delay_ms / 1000)
+                data = chunk.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        data = fixture['body'].encode()
+        self.send_response(fixture['status'])
+        self.send_header('Content-Type', fixture['content_type'] or 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, payload):
+        self.send_fixture({'status': status, 'content_type': 'application/json', 'body': json.dumps(payload)})
+
+
+def start_server(port=0, **options):
+    """Start a replay server on a background thread and return it"""
+    server = ReplayServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def app_environment(server):
+    """Environment variables that point the Next.js app at `server`"""
+    return {
+        'GROQ_BASE_URL': f"{server.url}/groq",
+        'GROQ_API_KEY': os.environ.get('GROQ_API_KEY', 'gsk_replay') if server.mode == 'record' else 'gsk_replay',
+        'PRODUCTHUNT_API_URL': f"{server.url}/producthunt/v2/api/graphql",
+        'PRODUCTHUNT_DEVELOPER_TOKEN': os.environ.get('PRODUCTHUNT_DEVELOPER_TOKEN', 'replay') if server.mode == 'record' else 'replay',
+        'LLM_PROVIDER': 'groq'
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def launch_app(server, command=DEFAULT_APP_COMMAND, extra_env=None, log_path='.data/replay-app.log', timeout_s=180):
+    """Start the Next.js app pointed at `server` and wait until it answers.
+
+    Returns (process, base_url). Stop it with stop_app(process).
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, **app_environment(server), **(extra_env or {})}
+
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    log = open(log_path, 'w')
+    # Own process group, so npx and the node processes it spawns stop together
+    process = subprocess.Popen(command.format(port=port), shell=True, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    process.log = log
+
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode}, see {log_path}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/chatbots", timeout=30):
+                return process, base_url
+        except urllib.error.HTTPError:
+            # Any HTTP response means the route compiled and is serving
+            return process, base_url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+
+    stop_app(process)
+    raise RuntimeError(f"App did not start within {timeout_s}s, see {log_path}")
+
+
+def stop_app(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    finally:
+        process.log.close()
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values or []:
+        service, _, ms = value.partition('=')
+        if service not in UPSTREAMS or not ms:
+            raise argparse.ArgumentTypeError(f"Expected SERVICE=MS with SERVICE in {', '.join(UPSTREAMS)}, got '{value}'")
+        latency[service] = float(ms)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--mode', choices=['replay', 'record'], default='replay', help='Serve fixtures or record new ones')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Fixture directory')
+    parser.add_argument('--latency', action='append', metavar='SERVICE=MS', help='Delay before the first byte, per service')
+    parser.add_argument('--chunk-delay-ms', type=float, default=0, help='Delay between streamed chunks')
+    args = parser.parse_args()
+
+    try:
+        latency = parse_latency(args.latency)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    server = ReplayServer(('127.0.0.1', args.port), mode=args.mode, fixtures_dir=args.fixtures,
+                          latency_ms=latency, chunk_delay_ms=args.chunk_delay_ms)
+    print(f"Upstream {args.mode} server listening on {server.url}")
+    for name, value in app_environment(server).items():
+        print(f"    {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{server.stats}")
+
+
+if __name__ == "__main__":
+    main()
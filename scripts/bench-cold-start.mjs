@@ -0,0 +1,93 @@
+// Cold versus warm first-request latency per API endpoint.
+//
+// For each endpoint a fresh `next start` server is launched, and readiness is
+// checked on a page that doesn't load the API route. The first request to the
+// endpoint is then timed (cold: it loads and initializes the route), followed
+// by `--warm` more (warm median). Run `next build` first. The LLM is mocked
+// unless LLM_PROVIDER is set, so no Groq key is needed. Endpoints that need
+// Firestore or Product Hunt report whatever status they get without them.
+//
+//   node scripts/bench-cold-start.mjs [--warm 20] [--port 3100] [--only /api/metrics]
+
+import { spawn } from 'node:child_process'
+import { fileURLToPath } from 'node:url'
+import path from 'node:path'
+
+const ROOT = fileURLToPath(new URL('../', import.meta.url))
+const NEXT_BIN = path.join(ROOT, 'node_modules', '.bin', 'next')
+
+const ENDPOINTS = [
+  // Served as a 404 unless METRICS_TOKEN is set
+  { method: 'GET', path: '/api/metrics', headers: { Authorization: `Bearer ${process.env.METRICS_TOKEN}` } },
+  { method: 'GET', path: '/api/ai-tools?limit=20' },
+  { method: 'GET', path: '/api/chatbots?userId=bench' },
+  { method: 'POST', path: '/api/chatbots/test', body: { message: 'What can you help with?' } },
+  { method: 'POST', path: '/api/ai-agents', body: { agentId: 'content', input: 'A tagline for a bakery', userId: 'bench' } },
+  { method: 'POST', path: '/api/workflows', body: { type: 'n8n', prompt: 'Email me new form submissions', userId: 'bench' } }
+]
+
+function option(name, fallback) {
+  const i = process.argv.indexOf(`--${name}`)
+  return i === -1 ? fallback : process.argv[i + 1]
+}
+
+const warmRuns = Math.max(1, parseInt(option('warm', '20'), 10))
+const port = parseInt(option('port', '3100'), 10)
+const only = option('only', null)
+const base = `http://127.0.0.1:${port}`
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms))
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b)
+  return sorted[Math.floor(sorted.length / 2)]
+}
+
+async function startServer() {
+  const server = spawn(NEXT_BIN, ['start', '--port', String(port)], {
+    cwd: ROOT,
+    env: { LLM_PROVIDER: 'mock', ...process.env, NODE_ENV: 'production' },
+    stdio: 'ignore'
+  })
+  const exited = new Promise(resolve => server.once('exit', resolve))
+
+  // A missing page is served by the app router without loading the API route
+  for (const deadline = Date.now() + 30000; Date.now() < deadline;) {
+    try {
+      await fetch(`${base}/__bench-ready`)
+      return { stop: () => (server.kill('SIGTERM'), exited) }
+    } catch {
+      await sleep(100)
+    }
+  }
+  server.kill('SIGKILL')
+  throw new Error('next start did not come up within 30s')
+}
+
+// Time one request, including reading the whole response body
+async function timeRequest({ method, path: url, headers = {}, body }) {
+  const startedAt = performance.now()
+  const response = await fetch(base + url, {
+    method,
+    headers: body ? { ...headers, 'Content-Type': 'application/json' } : headers,
+    body: body ? JSON.stringify(body) : undefined
+  })
+  await response.arrayBuffer()
+  return { ms: performance.now() - startedAt, status: response.status }
+}
+
+console.log(`${'endpoint'.padEnd(36)} ${'cold'.padStart(9)} ${'warm p50'.padStart(9)} status`)
+for (const endpoint of ENDPOINTS.filter(e => !only || e.path.startsWith(only))) {
+  const server = await startServer()
+  try {
+    const cold = await timeRequest(endpoint)
+    const warm = []
+    for (let i = 0; i < warmRuns; i++) {
+      warm.push((await timeRequest(endpoint)).ms)
+    }
+    const label = `${endpoint.method} ${endpoint.path}`
+    console.log(`${label.padEnd(36)} ${cold.ms.toFixed(1).padStart(9)} ${median(warm).toFixed(1).padStart(9)} ${cold.status}`)
+  } finally {
+    await server.stop()
+  }
+}
@@ -0,0 +1,86 @@
+// Build the embeddable chatbot widget into embed/dist.
+//
+// The chat window is minified and written under a content-hashed name, so it
+// can be cached forever. The loader keeps the stable name host pages embed
+// (chatbot-widget.js) and has the hashed name baked in. Every file gets
+// precompressed .br and .gz siblings, and manifest.json lists what
+// app/embed/[file]/route.js may serve.
+//
+//   node scripts/build-widget.js
+
+const crypto = require('crypto')
+const fs = require('fs')
+const path = require('path')
+const zlib = require('zlib')
+
+const SRC_DIR = path.join(__dirname, '..', 'embed', 'src')
+const OUT_DIR = path.join(__dirname, '..', 'embed', 'dist')
+
+const LOADER_FILE = 'chatbot-widget.js'
+const CHAT_WINDOW_PLACEHOLDER = '__CHAT_WINDOW_FILE__'
+
+// Use terser if installed, otherwise the copy bundled with Next.js
+function loadTerser() {
+  try {
+    return require('terser')
+  } catch {
+    return require('next/dist/compiled/terser')
+  }
+}
+
+function contentHash(content) {
+  return crypto.createHash('sha256').update(content).digest('hex').slice(0, 10)
+}
+
+async function minify(code) {
+  const result = await loadTerser().minify(code, {
+    ecma: 2017,
+    compress: { passes: 2 },
+    mangle: true,
+    format: { comments: false }
+  })
+  return result.code
+}
+
+function emit(name, code, immutable) {
+  const content = Buffer.from(code)
+  const brotli = zlib.brotliCompressSync(content, {
+    params: {
+      [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: content.length
+    }
+  })
+  const gzip = zlib.gzipSync(content, { level: zlib.constants.Z_BEST_COMPRESSION })
+
+  fs.writeFileSync(path.join(OUT_DIR, name), content)
+  fs.writeFileSync(path.join(OUT_DIR, `${name}.br`), brotli)
+  fs.writeFileSync(path.join(OUT_DIR, `${name}.gz`), gzip)
+
+  console.log(`${name.padEnd(32)} ${String(content.length).padStart(7)} B  br ${String(brotli.length).padStart(6)} B  gz ${String(gzip.length).padStart(6)} B`)
+  return { hash: contentHash(content), immutable }
+}
+
+async function main() {
+  const chatWindow = await minify(fs.readFileSync(path.join(SRC_DIR, 'chat-window.js'), 'utf8'))
+  const chatWindowFile = `chat-window.${contentHash(chatWindow)}.js`
+
+  const loaderSource = fs.readFileSync(path.join(SRC_DIR, 'loader.js'), 'utf8')
+  if (!loaderSource.includes(CHAT_WINDOW_PLACEHOLDER)) {
+    throw new Error(`loader.js must reference ${CHAT_WINDOW_PLACEHOLDER}`)
+  }
+  const loader = await minify(loaderSource.replace(CHAT_WINDOW_PLACEHOLDER, chatWindowFile))
+
+  fs.rmSync(OUT_DIR, { recursive: true, force: true })
+  fs.mkdirSync(OUT_DIR, { recursive: true })
+
+  const files = {
+    [LOADER_FILE]: emit(LOADER_FILE, loader, false),
+    [chatWindowFile]: emit(chatWindowFile, chatWindow, true)
+  }
+  fs.writeFileSync(path.join(OUT_DIR, 'manifest.json'), JSON.stringify({ builtAt: Date.now(), files }, null, 2))
+}
+
+main().catch(error => {
+  console.error('Widget build failed:', error)
+  process.exit(1)
+})
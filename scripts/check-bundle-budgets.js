@@ -0,0 +1,204 @@
+// Check each app route's initial JS against bundle-budgets.json.
+//
+// Runs after `next build` (postbuild). A route's initial JS is every script
+// its page and enclosing layouts load up front, counted once and gzipped;
+// chunks loaded later through next/dynamic or import() are not included.
+// The report is printed and written to .next/analyze/route-sizes.json, and the
+// build fails if a route exceeds its budget (or the "*" default).
+//
+// The build also fails if a page or layout statically imports one of the
+// LAZY_ONLY modules, directly or through other project files. Those are only
+// allowed behind next/dynamic or import(), so the library stays out of the
+// route's initial JS.
+//
+//   node scripts/check-bundle-budgets.js            check
+//   node scripts/check-bundle-budgets.js --update   set budgets to current sizes plus headroom
+//
+// For a treemap of what is inside each chunk, run `yarn analyze`.
+
+const fs = require('fs')
+const path = require('path')
+const zlib = require('zlib')
+
+const ROOT = path.join(__dirname, '..')
+const NEXT_DIR = path.join(ROOT, '.next')
+const BUDGETS_FILE = path.join(ROOT, 'bundle-budgets.json')
+const REPORT_FILE = path.join(NEXT_DIR, 'analyze', 'route-sizes.json')
+
+// Room left above the current size when budgets are updated
+const UPDATE_HEADROOM = 1.1
+
+// Heavy ui components and the libraries behind them
+const LAZY_ONLY = [
+  'components/ui/calendar',
+  'components/ui/carousel',
+  'components/ui/chart',
+  'components/ui/command',
+  'react-day-picker',
+  'date-fns',
+  'embla-carousel-react',
+  'recharts',
+  'cmdk',
+  '@tanstack/react-table'
+]
+
+const SOURCE_EXTENSIONS = ['', '.js', '.jsx', '/index.js', '/index.jsx']
+const STATIC_IMPORT = /^\s*(?:import|export)\s+(?:[\w*{}\s,]+?\s+from\s+)?['"]([^'"]+)['"]/gm
+
+const kb = bytes => Math.round(bytes / 1024 * 10) / 10
+
+// "/chat/[chatbotId]/page" -> "/chat/[chatbotId]"
+function routeName(entry) {
+  return entry.replace(/\/page$/, '') || '/'
+}
+
+// Layout entries enclosing a page entry, outermost first
+function layoutsFor(entry, entries) {
+  const segments = entry.split('/').slice(1, -1)
+  const layouts = []
+  for (let i = 0; i <= segments.length; i++) {
+    const layout = `/${[...segments.slice(0, i), 'layout'].join('/')}`
+    if (entries[layout]) {
+      layouts.push(layout)
+    }
+  }
+  return layouts
+}
+
+function measureRoutes() {
+  const manifestFile = path.join(NEXT_DIR, 'app-build-manifest.json')
+  if (!fs.existsSync(manifestFile)) {
+    throw new Error('No app build found in .next; run `next build` first')
+  }
+
+  const { pages: entries } = JSON.parse(fs.readFileSync(manifestFile, 'utf8'))
+  const gzipped = new Map()
+  const sizeOf = file => {
+    if (!gzipped.has(file)) {
+      gzipped.set(file, zlib.gzipSync(fs.readFileSync(path.join(NEXT_DIR, file))).length)
+    }
+    return gzipped.get(file)
+  }
+
+  return Object.keys(entries)
+    .filter(entry => entry.endsWith('/page'))
+    .map(entry => {
+      const files = new Set(
+        [...layoutsFor(entry, entries), entry]
+          .flatMap(key => entries[key])
+          .filter(file => file.endsWith('.js'))
+      )
+      const bytes = [...files].reduce((total, file) => total + sizeOf(file), 0)
+      return { route: routeName(entry), files: files.size, kb: kb(bytes) }
+    })
+    .sort((a, b) => a.route.localeCompare(b.route))
+}
+
+function readBudgets() {
+  return fs.existsSync(BUDGETS_FILE) ? JSON.parse(fs.readFileSync(BUDGETS_FILE, 'utf8')) : { routes: {} }
+}
+
+// Project file a specifier points at, or null for a package
+function resolveLocal(specifier, from) {
+  let base
+  if (specifier.startsWith('@/')) {
+    base = path.join(ROOT, specifier.slice(2))
+  } else if (specifier.startsWith('.')) {
+    base = path.resolve(path.dirname(from), specifier)
+  } else {
+    return null
+  }
+  const file = SOURCE_EXTENSIONS.map(ext => base + ext).find(candidate => fs.existsSync(candidate) && fs.statSync(candidate).isFile())
+  return file || null
+}
+
+function lazyOnlyName(specifier, file) {
+  if (file) {
+    const relative = path.relative(ROOT, file).replace(/\\/g, '/').replace(/(\/index)?\.jsx?$/, '')
+    return LAZY_ONLY.includes(relative) ? relative : null
+  }
+  const parts = specifier.split('/')
+  const name = specifier.startsWith('@') ? parts.slice(0, 2).join('/') : parts[0]
+  return LAZY_ONLY.includes(name) ? name : null
+}
+
+// Import chains from app pages and layouts to LAZY_ONLY modules, following
+// static imports only
+function findEagerHeavyImports() {
+  const entries = []
+  const walkApp = dir => {
+    for (const item of fs.readdirSync(dir, { withFileTypes: true })) {
+      const file = path.join(dir, item.name)
+      if (item.isDirectory()) {
+        walkApp(file)
+      } else if (/^(page|layout)\.jsx?$/.test(item.name)) {
+        entries.push(file)
+      }
+    }
+  }
+  walkApp(path.join(ROOT, 'app'))
+
+  const found = []
+  for (const entry of entries) {
+    const seen = new Set([entry])
+    const queue = [[entry]]
+    while (queue.length) {
+      const chain = queue.shift()
+      const file = chain[chain.length - 1]
+      for (const [, specifier] of fs.readFileSync(file, 'utf8').matchAll(STATIC_IMPORT)) {
+        const target = resolveLocal(specifier, file)
+        const heavy = lazyOnlyName(specifier, target)
+        if (heavy) {
+          found.push([...chain, heavy].map(step => path.isAbsolute(step) ? path.relative(ROOT, step) : step).join(' -> '))
+        } else if (target && !seen.has(target)) {
+          seen.add(target)
+          queue.push([...chain, target])
+        }
+      }
+    }
+  }
+  return found
+}
+
+function main() {
+  const eager = findEagerHeavyImports()
+  const routes = measureRoutes()
+  const budgets = readBudgets()
+
+  fs.mkdirSync(path.dirname(REPORT_FILE), { recursive: true })
+  fs.writeFileSync(REPORT_FILE, JSON.stringify({ generatedAt: new Date().toISOString(), routes }, null, 2) + '\n')
+
+  if (process.argv.includes('--update')) {
+    for (const { route, kb: size } of routes) {
+      budgets.routes[route] = Math.ceil(size * UPDATE_HEADROOM)
+    }
+    fs.writeFileSync(BUDGETS_FILE, JSON.stringify(budgets, null, 2) + '\n')
+    console.log(`Updated ${path.relative(ROOT, BUDGETS_FILE)}`)
+  }
+
+  const over = []
+  console.log('Initial JS per route (gzipped)')
+  for (const { route, files, kb: size } of routes) {
+    const budget = budgets.routes[route] ?? budgets.routes['*']
+    const status = budget === undefined ? 'no budget' : size > budget ? 'OVER' : 'ok'
+    if (status === 'OVER') {
+      over.push(route)
+    }
+    const limit = budget === undefined ? '' : `/ ${budget} kB`
+    console.log(`  ${route.padEnd(32)} ${`${size} kB`.padStart(10)} ${limit.padEnd(10)} ${String(files).padStart(3)} files  ${status}`)
+  }
+
+  if (eager.length) {
+    console.error('\nHeavy modules in initial JS; load the component that renders them with next/dynamic:')
+    eager.forEach(chain => console.error(`  ${chain}`))
+  }
+  if (over.length) {
+    console.error(`\nJS budget exceeded for ${over.join(', ')}. Split the new code out with next/dynamic, ` +
+      'or raise the budget in bundle-budgets.json if the growth is intended.')
+  }
+  if (eager.length || over.length) {
+    process.exit(1)
+  }
+}
+
+main()
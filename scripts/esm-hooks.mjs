@@ -0,0 +1,44 @@
+// Module hooks that let plain Node load the app's server modules the way
+// Next's bundler does: `@/` resolves to the project root, extensionless
+// imports try `.js` and `/index.js`, and the project's `.js` files load as ES
+// modules. scripts/profile-startup.mjs starts its Node processes with
+// `--import ./scripts/esm-hooks.mjs`.
+
+import { register } from 'node:module'
+import { isMainThread } from 'node:worker_threads'
+
+const ROOT = new URL('../', import.meta.url).href
+
+// Hooks run on their own thread; registering happens once, from --import
+if (isMainThread) {
+  register(import.meta.url)
+}
+
+function isLocal(specifier) {
+  return specifier.startsWith('.') || specifier.startsWith('/') || specifier.startsWith('file:')
+}
+
+export async function resolve(specifier, context, next) {
+  if (specifier.startsWith('@/')) {
+    specifier = ROOT + specifier.slice(2)
+  }
+  try {
+    return await next(specifier, context)
+  } catch (error) {
+    if (!isLocal(specifier)) {
+      throw error
+    }
+    try {
+      return await next(`${specifier}.js`, context)
+    } catch {
+      return next(`${specifier}/index.js`, context)
+    }
+  }
+}
+
+export async function load(url, context, next) {
+  if (url.startsWith(ROOT) && !url.includes('/node_modules/') && url.endsWith('.js')) {
+    return next(url, { ...context, format: 'module' })
+  }
+  return next(url, context)
+}
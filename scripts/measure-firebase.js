@@ -0,0 +1,101 @@
+// Measure what Firebase costs a cold start and the browser bundle.
+//
+// Cold start: each scenario imports its Firebase packages in a fresh Node
+// process, `--runs` times, and reports the median import time and heap
+// growth. `eager` is what importing lib/firebase.js used to load; the API
+// route now loads nothing at startup and `firestore` on its first read or
+// write.
+//
+// Bundle: after `next build`, lists the gzipped JS each app route loads up
+// front, and the lazily loaded chunks that contain Firebase.
+//
+//   node scripts/measure-firebase.js [--runs 7]
+
+const { execFileSync } = require('child_process')
+const fs = require('fs')
+const path = require('path')
+const zlib = require('zlib')
+
+const ROOT = path.join(__dirname, '..')
+const NEXT_DIR = path.join(ROOT, '.next')
+
+const SCENARIOS = {
+  eager: ['firebase/app', 'firebase/auth', 'firebase/firestore'],
+  firestore: ['firebase/app', 'firebase/firestore'],
+  auth: ['firebase/app', 'firebase/auth']
+}
+
+function option(name, fallback) {
+  const i = process.argv.indexOf(`--${name}`)
+  return i === -1 ? fallback : process.argv[i + 1]
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b)
+  return sorted[Math.floor(sorted.length / 2)]
+}
+
+function kb(bytes) {
+  return `${(bytes / 1024).toFixed(1)} kB`
+}
+
+// One cold import of `modules`, in a new process
+function coldImport(modules) {
+  const script = `
+    const heap = process.memoryUsage().heapUsed
+    const startedAt = performance.now()
+    Promise.all(${JSON.stringify(modules)}.map(m => import(m))).then(() => {
+      console.log(JSON.stringify({ ms: performance.now() - startedAt, heap: process.memoryUsage().heapUsed - heap }))
+    })
+  `
+  return JSON.parse(execFileSync(process.execPath, ['-e', script], { cwd: ROOT, encoding: 'utf8' }))
+}
+
+function measureColdStart(runs) {
+  console.log(`Cold import, median of ${runs} runs`)
+  for (const [name, modules] of Object.entries(SCENARIOS)) {
+    const samples = Array.from({ length: runs }, () => coldImport(modules))
+    const ms = median(samples.map(s => s.ms))
+    const heap = median(samples.map(s => s.heap))
+    console.log(`  ${name.padEnd(10)} ${ms.toFixed(1).padStart(8)} ms ${kb(heap).padStart(12)} heap  (${modules.join(', ')})`)
+  }
+}
+
+function gzipSize(file) {
+  return zlib.gzipSync(fs.readFileSync(path.join(NEXT_DIR, file))).length
+}
+
+function measureBundle() {
+  const manifestFile = path.join(NEXT_DIR, 'app-build-manifest.json')
+  if (!fs.existsSync(manifestFile)) {
+    console.log('\nNo build found; run `next build` for bundle sizes')
+    return
+  }
+
+  const { pages } = JSON.parse(fs.readFileSync(manifestFile, 'utf8'))
+  const initial = new Set()
+  console.log('\nInitial JS per route (gzipped)')
+  for (const [route, files] of Object.entries(pages)) {
+    const scripts = files.filter(file => file.endsWith('.js'))
+    scripts.forEach(file => initial.add(file))
+    const size = scripts.reduce((total, file) => total + gzipSize(file), 0)
+    console.log(`  ${route.padEnd(40)} ${kb(size).padStart(10)}`)
+  }
+
+  const chunksDir = path.join(NEXT_DIR, 'static', 'chunks')
+  const lazy = fs.readdirSync(chunksDir, { recursive: true })
+    .map(file => path.join('static', 'chunks', String(file)))
+    .filter(file => file.endsWith('.js') && !initial.has(file))
+    .filter(file => /firebase|identitytoolkit|firestore\.googleapis/.test(fs.readFileSync(path.join(NEXT_DIR, file), 'utf8')))
+
+  console.log('\nLazily loaded chunks containing Firebase (gzipped)')
+  for (const file of lazy) {
+    console.log(`  ${file.padEnd(60)} ${kb(gzipSize(file)).padStart(10)}`)
+  }
+  if (!lazy.length) {
+    console.log('  none')
+  }
+}
+
+measureColdStart(Math.max(1, parseInt(option('runs', '7'), 10)))
+measureBundle()
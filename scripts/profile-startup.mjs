@@ -0,0 +1,78 @@
+// Profile what the API route costs at startup.
+//
+// Imports: each module the route imports is loaded alone in a fresh Node
+// process, `--runs` times. The median load time is reported, less that of an
+// empty module. Modules share dependencies, so the figures overlap; the
+// `(whole route)` row is the real total.
+//
+// Initializers: the route is then loaded in one more process and its
+// `startup` profile is read from /api/metrics. It lists what ran at module
+// load, with durations, and which components are deferred to first use.
+//
+//   node scripts/profile-startup.mjs [--runs 5] [--route app/api/[[...path]]/route.js]
+
+import { execFileSync } from 'node:child_process'
+import { readFileSync } from 'node:fs'
+import { fileURLToPath, pathToFileURL } from 'node:url'
+import path from 'node:path'
+
+const ROOT = fileURLToPath(new URL('../', import.meta.url))
+const HOOKS = fileURLToPath(new URL('./esm-hooks.mjs', import.meta.url))
+
+function option(name, fallback) {
+  const i = process.argv.indexOf(`--${name}`)
+  return i === -1 ? fallback : process.argv[i + 1]
+}
+
+const runs = Math.max(1, parseInt(option('runs', '5'), 10))
+const routeFile = path.resolve(ROOT, option('route', 'app/api/[[...path]]/route.js'))
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b)
+  return sorted[Math.floor(sorted.length / 2)]
+}
+
+// Run `script` as an ES module in a fresh process and parse the JSON it prints
+function inFreshProcess(script) {
+  const output = execFileSync(process.execPath, ['--no-warnings', '--import', pathToFileURL(HOOKS).href, '--input-type=module', '-e', script], {
+    cwd: ROOT,
+    encoding: 'utf8',
+    // Metrics are only open outside production; the mock LLM needs no key
+    env: { LLM_PROVIDER: 'mock', ...process.env, NODE_ENV: 'development' }
+  })
+  return JSON.parse(output.trim().split('\n').pop())
+}
+
+function importTime(specifier) {
+  return inFreshProcess(`
+    const startedAt = performance.now()
+    await import(${JSON.stringify(specifier)})
+    console.log(JSON.stringify(performance.now() - startedAt))
+  `)
+}
+
+const source = readFileSync(routeFile, 'utf8')
+const specifiers = [...source.matchAll(/^import\s[^'"]*['"]([^'"]+)['"]/gm)].map(match => match[1])
+const routeUrl = pathToFileURL(routeFile).href
+
+const coldImport = specifier => median(Array.from({ length: runs }, () => importTime(specifier)))
+const baseline = coldImport('data:text/javascript,')
+
+console.log(`Imports of ${path.relative(ROOT, routeFile)}, median of ${runs} cold loads`)
+const rows = specifiers.map(specifier => ({ specifier, ms: coldImport(specifier) - baseline }))
+rows.push({ specifier: '(whole route)', ms: coldImport(routeUrl) - baseline })
+for (const { specifier, ms } of rows.sort((a, b) => b.ms - a.ms)) {
+  console.log(`  ${specifier.padEnd(32)} ${ms.toFixed(1).padStart(8)} ms`)
+}
+
+const { startup } = inFreshProcess(`
+  const { GET } = await import(${JSON.stringify(routeUrl)})
+  const response = await GET(new Request('http://localhost/api/metrics'))
+  console.log(JSON.stringify(await response.json()))
+`)
+
+console.log(`\nModule top-level code: ${(startup.readyAt - startup.startedAt).toFixed(1)} ms, starting ${startup.startedAt.toFixed(1)} ms after process start`)
+for (const { name, ms } of startup.initializers) {
+  console.log(`  ${name.padEnd(32)} ${ms.toFixed(2).padStart(8)} ms`)
+}
+console.log(`Deferred to first use: ${startup.pending.join(', ') || 'none'}`)
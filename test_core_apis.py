@@ -1,91 +1,13 @@
 #!/usr/bin/env python3
 """
 Focused backend test - testing core API functionality without Firebase persistence
-"""
-
-import requests
-import json
-import os
 
-BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')
-API_BASE = f"{BASE_URL}/api"
-
-def test_ai_agents_without_firebase():
-    """Test AI agents by temporarily modifying the code to skip Firebase"""
-    print("=== Testing AI Agents Core Functionality ===")
-    
-    # Test different agent types
-    test_agents = [
-        {
-            'agentId': 'resume',
-            'input': 'Software Engineer with 5 years experience in Python and React',
-            'userId': 'test_user_123'
-        }
-    ]
-    
-    for agent_test in test_agents:
-        try:
-            response = requests.post(
-                f"{API_BASE}/ai-agents",
-                json=agent_test,
-                headers={'Content-Type': 'application/json'},
-                timeout=45
-            )
-            
-            print(f"Status: {response.status_code}")
-            print(f"Response: {response.text}")
-            
-            if response.status_code == 500:
-                error_data = response.json()
-                error_msg = error_data.get('error', '')
-                
-                if 'PERMISSION_DENIED' in error_msg:
-                    print("❌ Firebase permission issue - this is expected")
-                    print("✅ But Groq API integration appears to be working (no API key errors)")
-                elif 'Invalid API Key' in error_msg:
-                    print("❌ Groq API key issue")
-                else:
-                    print(f"❌ Other error: {error_msg}")
-            
-        except Exception as e:
-            print(f"Error: {e}")
+The checks live in backend_test.BackendTester so they share its HTTP session;
+`python backend_test.py --diagnostics` runs them together with the suite.
+"""
 
-def test_workflows_without_firebase():
-    """Test workflows by temporarily modifying the code to skip Firebase"""
-    print("\n=== Testing Workflows Core Functionality ===")
-    
-    test_workflow = {
-        'prompt': 'Create a workflow that sends a Slack notification when a new email arrives in Gmail',
-        'type': 'n8n',
-        'userId': 'test_user_123'
-    }
-    
-    try:
-        response = requests.post(
-            f"{API_BASE}/workflows",
-            json=test_workflow,
-            headers={'Content-Type': 'application/json'},
-            timeout=60
-        )
-        
-        print(f"Status: {response.status_code}")
-        print(f"Response: {response.text}")
-        
-        if response.status_code == 500:
-            error_data = response.json()
-            error_msg = error_data.get('error', '')
-            
-            if 'PERMISSION_DENIED' in error_msg:
-                print("❌ Firebase permission issue - this is expected")
-                print("✅ But Groq API integration appears to be working (no API key errors)")
-            elif 'Invalid API Key' in error_msg:
-                print("❌ Groq API key issue")
-            else:
-                print(f"❌ Other error: {error_msg}")
-        
-    except Exception as e:
-        print(f"Error: {e}")
+from backend_test import BackendTester
 
 if __name__ == "__main__":
-    test_ai_agents_without_firebase()
-    test_workflows_without_firebase()
\ No newline at end of file
+    tester = BackendTester()
+    tester.run_groups([[tester.diagnose_core_apis]])